@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Отладочные данные обхода elit.ro (HTML-код и скриншоты страниц).
+Запись на диск выполняет фоновый поток с ограниченной очередью, поэтому она
+не задерживает обход. Политика определяет, какие страницы сохраняются:
+'off' - никакие, 'on-error' - страницы с ошибкой загрузки или пустым
+результатом разбора, 'sample' - дополнительно доля успешных страниц,
+'always' - все страницы в прежнем виде (name.html и name.png в debug_output).
+Для политик 'on-error' и 'sample' HTML хранится в сжатом виде по SHA-256
+содержимого, поэтому одинаковые страницы записываются один раз.
+"""
+
+import gzip
+import hashlib
+import json
+import queue
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Union
+
+ARTIFACT_POLICIES = ("off", "on-error", "sample", "always")
+
+
+class Artifact(NamedTuple):
+    """Отладочные данные одной страницы"""
+    name: str
+    reason: str
+    html: Optional[str]
+    screenshot: Optional[bytes]
+    error: Optional[str]
+    created_at: float
+
+
+class ArtifactSink:
+    """Фоновая запись отладочных данных по выбранной политике"""
+
+    def __init__(self, debug_dir: Union[str, Path] = "debug_output", policy: str = "on-error",
+                 sample_rate: float = 0.05, screenshots: bool = True, queue_size: int = 64):
+        """Инициализация приемника
+
+        Args:
+            debug_dir (Union[str, Path]): Каталог отладочных данных
+            policy (str): Политика сохранения: 'off', 'on-error', 'sample', 'always'
+            sample_rate (float): Доля сохраняемых успешных страниц для политики 'sample'
+            screenshots (bool): Сохранять скриншоты страниц браузера
+            queue_size (int): Размер очереди записи
+        """
+        if policy not in ARTIFACT_POLICIES:
+            raise ValueError(f"Неизвестная политика отладочных данных: {policy}")
+
+        self.debug_dir = Path(debug_dir)
+        self.policy = policy
+        self.enabled = policy != "off"
+        self.sample_rate = sample_rate
+        self.screenshots = screenshots and self.enabled
+        self.queue_size = max(1, queue_size)
+        # Прежний формат (отдельные несжатые файлы) сохраняется только для политики 'always'
+        self.compressed = policy != "always"
+        self.artifacts_dir = self.debug_dir / "artifacts"
+        self.stats = {"saved": 0, "deduplicated": 0, "dropped": 0, "failed": 0, "bytes_written": 0}
+
+        self._queue: "queue.Queue[Optional[Artifact]]" = queue.Queue(maxsize=self.queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._digests = set()
+
+    def decide(self, name: str) -> Optional[str]:
+        """Определяет, нужно ли сохранить успешно загруженную страницу
+
+        Выборка для политики 'sample' детерминирована по имени страницы, поэтому
+        при повторных запусках сохраняются одни и те же страницы.
+
+        Args:
+            name (str): Имя отладочных данных страницы
+
+        Returns:
+            Optional[str]: Причина сохранения ('always', 'sample') или None
+        """
+        if self.policy == "always":
+            return "always"
+        if self.policy == "sample" and zlib.crc32(name.encode("utf-8")) / 2 ** 32 < self.sample_rate:
+            return "sample"
+        return None
+
+    def submit(self, name: str, reason: str, html: Optional[str] = None, screenshot: Optional[bytes] = None,
+               error: Optional[str] = None) -> bool:
+        """Ставит отладочные данные в очередь записи
+
+        При переполненной очереди выборочные данные отбрасываются, чтобы не
+        задерживать обход; данные политики 'always' и ошибок ждут места в очереди.
+
+        Args:
+            name (str): Имя отладочных данных страницы
+            reason (str): Причина сохранения
+            html (Optional[str]): HTML-код страницы
+            screenshot (Optional[bytes]): Скриншот страницы в формате PNG
+            error (Optional[str]): Описание ошибки
+
+        Returns:
+            bool: True, если данные поставлены в очередь
+        """
+        if not self.enabled or (html is None and screenshot is None and error is None):
+            return False
+
+        self._ensure_worker()
+        artifact = Artifact(name, reason, html, screenshot, error, time.time())
+        if reason == "sample":
+            try:
+                self._queue.put_nowait(artifact)
+            except queue.Full:
+                with self._lock:
+                    self.stats["dropped"] += 1
+                return False
+        else:
+            self._queue.put(artifact)
+        return True
+
+    def error(self, name: str, error: Union[str, BaseException], html: Optional[str] = None,
+              screenshot: Optional[bytes] = None, reason: str = "error") -> bool:
+        """Сохраняет отладочные данные страницы с ошибкой
+
+        Args:
+            name (str): Имя отладочных данных страницы
+            error (Union[str, BaseException]): Ошибка или ее описание
+            html (Optional[str]): HTML-код страницы, если он был получен
+            screenshot (Optional[bytes]): Скриншот страницы в формате PNG
+            reason (str): Причина сохранения ('error' или 'empty' - пустой результат разбора)
+
+        Returns:
+            bool: True, если данные поставлены в очередь
+        """
+        if reason == "empty" and self.policy == "always":
+            # При политике 'always' страница уже сохранена при загрузке
+            return False
+        return self.submit(name, reason, html=html, screenshot=screenshot, error=str(error))
+
+    def _ensure_worker(self) -> None:
+        """Запускает фоновый поток записи при первой необходимости"""
+        with self._lock:
+            if self._thread is None:
+                self.debug_dir.mkdir(parents=True, exist_ok=True)
+                if self.compressed:
+                    # index.jsonl пишется и для ошибок без HTML и скриншота, когда блобов еще нет
+                    self.artifacts_dir.mkdir(parents=True, exist_ok=True)
+                self._thread = threading.Thread(target=self._work, name="elit-artifacts", daemon=True)
+                self._thread.start()
+
+    def _work(self) -> None:
+        """Цикл фонового потока: записывает данные из очереди до получения None"""
+        while True:
+            artifact = self._queue.get()
+            if artifact is None:
+                break
+            try:
+                if self.compressed:
+                    self._write_compressed(artifact)
+                else:
+                    self._write_plain(artifact)
+            except OSError as e:
+                with self._lock:
+                    self.stats["failed"] += 1
+                print(f"Ошибка при сохранении отладочных данных {artifact.name}: {e}")
+
+    def _count_written(self, size: int) -> None:
+        with self._lock:
+            self.stats["bytes_written"] += size
+
+    def _write_plain(self, artifact: Artifact) -> None:
+        """Записывает данные в прежнем формате: name.png и name.html"""
+        if artifact.screenshot is not None:
+            output_path = self.debug_dir / f"{artifact.name}.png"
+            output_path.write_bytes(artifact.screenshot)
+            self._count_written(len(artifact.screenshot))
+            print(f"Сохранен скриншот страницы: {output_path}")
+
+        if artifact.html is not None:
+            output_path = self.debug_dir / f"{artifact.name}.html"
+            data = artifact.html.encode("utf-8")
+            output_path.write_bytes(data)
+            self._count_written(len(data))
+            print(f"Сохранен HTML-код страницы: {output_path}")
+
+        with self._lock:
+            self.stats["saved"] += 1
+
+    def _store_blob(self, data: bytes, suffix: str, compress: bool) -> str:
+        """Записывает содержимое по SHA-256, если такого еще нет
+
+        Args:
+            data (bytes): Содержимое
+            suffix (str): Расширение файла
+            compress (bool): Сжимать содержимое gzip
+
+        Returns:
+            str: Путь к файлу относительно каталога artifacts
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        relative = f"{digest[:2]}/{digest}{suffix}"
+        path = self.artifacts_dir / relative
+
+        with self._lock:
+            known = digest in self._digests
+            self._digests.add(digest)
+
+        if known or path.exists():
+            with self._lock:
+                self.stats["deduplicated"] += 1
+            return relative
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = gzip.compress(data) if compress else data
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(payload)
+        tmp_path.replace(path)
+        self._count_written(len(payload))
+        return relative
+
+    def _write_compressed(self, artifact: Artifact) -> None:
+        """Записывает данные с адресацией по содержимому и строку в index.jsonl"""
+        record: Dict[str, Any] = {
+            "time": round(artifact.created_at, 3),
+            "name": artifact.name,
+            "reason": artifact.reason
+        }
+        if artifact.error is not None:
+            record["error"] = artifact.error
+        if artifact.html is not None:
+            record["html"] = self._store_blob(artifact.html.encode("utf-8"), ".html.gz", compress=True)
+        if artifact.screenshot is not None:
+            # PNG уже сжат, поэтому хранится как есть
+            record["screenshot"] = self._store_blob(artifact.screenshot, ".png", compress=False)
+
+        with open(self.artifacts_dir / "index.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        with self._lock:
+            self.stats["saved"] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Возвращает статистику записи"""
+        with self._lock:
+            return dict(self.stats, policy=self.policy)
+
+    def close(self) -> None:
+        """Дожидается записи всех данных из очереди и останавливает фоновый поток"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    @staticmethod
+    def load(debug_dir: Union[str, Path], relative: str) -> bytes:
+        """Читает сохраненные данные по пути из index.jsonl
+
+        Args:
+            debug_dir (Union[str, Path]): Каталог отладочных данных
+            relative (str): Путь к файлу относительно каталога artifacts
+
+        Returns:
+            bytes: Содержимое (HTML распаковывается)
+        """
+        data = (Path(debug_dir) / "artifacts" / relative).read_bytes()
+        return gzip.decompress(data) if relative.endswith(".gz") else data
@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Асинхронный обход сайта elit.ro для режима 'full'.
+Страницы моделей и двигателей загружаются параллельно пулом контекстов браузера
+с ограничением частоты и количества запросов к одному хосту.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+from urllib.parse import urlparse
+
+from elit_fetch import FetchError, HttpFetcher, PageIncomplete
+from elit_memory import JS_HEAP_SCRIPT
+from elit_throttle import AdaptiveThrottle, HostBudgetExceeded
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+    from elit_parser import ElitRoParser
+
+
+class HostBudget:
+    """Бюджет запросов к хостам: минимальный интервал между запросами и общий лимит"""
+
+    def __init__(self, rate: float = 1.0, max_requests: Optional[int] = None,
+                 throttle: Optional[AdaptiveThrottle] = None):
+        """Инициализация бюджета
+
+        Args:
+            rate (float): Допустимое число запросов в секунду к одному хосту (0 - без ограничения)
+            max_requests (Optional[int]): Максимальное число запросов к одному хосту (None - без ограничения)
+            throttle (Optional[AdaptiveThrottle]): Регулятор частоты; если задан, интервал между
+                запросами берется из него, а rate не используется
+        """
+        self.rate = rate
+        self.max_requests = max_requests
+        self.throttle = throttle
+        self.counts: Dict[str, int] = {}
+        self._next_slot: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    def _interval(self) -> float:
+        """Минимальный интервал между запросами к одному хосту в секундах"""
+        if self.throttle is not None:
+            return self.throttle.interval()
+        return 1.0 / self.rate if self.rate > 0 else 0.0
+
+    async def acquire(self, url: str) -> None:
+        """Резервирует слот для запроса к хосту и ждет его наступления
+
+        Args:
+            url (str): URL запроса
+
+        Raises:
+            HostBudgetExceeded: Если лимит запросов к хосту исчерпан
+        """
+        host = urlparse(url).netloc
+        loop = asyncio.get_running_loop()
+
+        async with self._lock:
+            count = self.counts.get(host, 0)
+            if self.max_requests is not None and count >= self.max_requests:
+                raise HostBudgetExceeded(f"Исчерпан лимит запросов к хосту {host}: {self.max_requests}")
+            self.counts[host] = count + 1
+
+            now = loop.time()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self._interval()
+
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class AsyncElitCrawler:
+    """Асинхронный обход брендов, моделей и двигателей пулом страниц браузера"""
+
+    def __init__(self, parser: "ElitRoParser", concurrency: int = 4, host_rate: float = 1.0,
+                 host_max_requests: Optional[int] = None):
+        """Инициализация обходчика
+
+        Args:
+            parser (ElitRoParser): Парсер, предоставляющий URL, разбор HTML и лимиты
+            concurrency (int): Количество одновременно открытых страниц браузера
+            host_rate (float): Допустимое число запросов в секунду к одному хосту
+            host_max_requests (Optional[int]): Максимальное число запросов к одному хосту
+        """
+        self.parser = parser
+        self.concurrency = max(1, concurrency)
+        self.host_rate = host_rate
+        self.host_max_requests = host_max_requests
+        self.budget: Optional[HostBudget] = None
+        self.http: Optional[HttpFetcher] = None
+        self._playwright = None
+        self._browser = None
+        self._pages: Optional[asyncio.Queue] = None
+        self._pool_lock: Optional[asyncio.Lock] = None
+        self._shared: Dict[int, asyncio.Future] = {}
+        # Переходы каждой страницы пула с момента ее создания и всего
+        self._page_navigations: Dict[int, int] = {}
+        self._navigations = 0
+
+    def run(self, brands_filter: Optional[List[str]] = None,
+            brands: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """Синхронная обертка над crawl()
+
+        Args:
+            brands_filter (Optional[List[str]]): Список брендов для фильтрации
+            brands (Optional[List[Dict[str, str]]]): Готовый список брендов (страница брендов не загружается)
+
+        Returns:
+            Dict[str, Any]: Результат в формате бренд -> модели -> двигатели
+        """
+        return asyncio.run(self.crawl(brands_filter, brands))
+
+    async def crawl(self, brands_filter: Optional[List[str]] = None,
+                    brands_preset: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """Выполняет полный обход сайта
+
+        Args:
+            brands_filter (Optional[List[str]]): Список брендов для фильтрации
+            brands_preset (Optional[List[Dict[str, str]]]): Готовый список брендов
+
+        Returns:
+            Dict[str, Any]: Результат в формате бренд -> модели -> двигатели
+        """
+        self.budget = HostBudget(self.host_rate, self.host_max_requests, throttle=self.parser.throttle)
+        self._pool_lock = asyncio.Lock()
+        self._pages = None
+        self._shared = {}
+        self._page_navigations = {}
+        self._navigations = 0
+
+        # Для бэкендов 'http' и 'auto' страницы сначала запрашиваются HTTP-клиентом,
+        # а браузер запускается только при первой необходимости
+        if self.parser.fetch_backend != "browser":
+            user_agent = self.parser.CONTEXT_OPTIONS["user_agent"]
+            self.http = HttpFetcher(user_agent, self.parser.CONTEXT_OPTIONS["locale"],
+                                    pool_size=self.concurrency,
+                                    validate=self.parser.fetch_backend == "auto")
+
+        from playwright.async_api import async_playwright
+
+        async with async_playwright() as playwright:
+            self._playwright = playwright
+            try:
+                journal = self.parser.journal
+                brands = journal.get_brands() if journal is not None else None
+                if brands is None:
+                    if brands_preset is None:
+                        print("Начинаем получение брендов...")
+                        content = await self._fetch(self.parser.brands_url(), "brands", "brands_page")
+                        brands = await asyncio.to_thread(self.parser.extract_brands, content, "brands_page")
+                    else:
+                        brands = brands_preset
+                    brands = self.parser.filter_brands(brands, brands_filter)
+                    if journal is not None:
+                        journal.record_brands(brands)
+
+                # Бренды передаются в поток сразу, в исходном порядке
+                stream = self.parser.stream
+                if stream is not None:
+                    for brand in brands:
+                        stream.add_brand(brand)
+
+                brand_results = await asyncio.gather(*(self._crawl_brand(brand) for brand in brands))
+            finally:
+                if self._browser is not None:
+                    await asyncio.to_thread(self.parser.memory.sample)
+                    await self._browser.close()
+                self._browser = None
+                if self.http is not None:
+                    self.http.close()
+
+        if stream is not None:
+            # Результат уже записан в поток и в памяти не хранится
+            return {}
+        if journal is not None:
+            # Итоговый результат собирается из журнала, включая единицы прошлых запусков
+            return journal.build_result(self.parser.brand_entry, self.parser.model_entry)
+        return self.parser.assemble_result(brands, brand_results)
+
+    async def _ensure_pool(self) -> None:
+        """Запускает браузер и открывает пул контекстов, по одной странице в каждом"""
+        async with self._pool_lock:
+            if self._pages is not None:
+                return
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            pages = asyncio.Queue()
+            for _ in range(self.concurrency):
+                pages.put_nowait(await self._new_page())
+            self._pages = pages
+
+    async def _new_page(self, storage_state: Optional[Dict[str, Any]] = None) -> "Page":
+        """Открывает страницу в новом контексте браузера (с cookies прежнего контекста)"""
+        options = dict(self.parser.CONTEXT_OPTIONS)
+        if storage_state:
+            options["storage_state"] = storage_state
+        context = await self._browser.new_context(**options)
+        page = await context.new_page()
+        await self.parser.load_profile.attach_async(page)
+        self._page_navigations[id(page)] = 0
+        return page
+
+    async def _recycle_if_needed(self, page: "Page") -> "Page":
+        """Учитывает переход страницы и пересоздает ее контекст по правилам переработки парсера
+
+        Страницы пула заняты параллельными загрузками, поэтому при превышении порога
+        памяти браузер не перезапускается, а пересоздается контекст возвращаемой
+        страницы (это освобождает ее процесс рендеринга).
+        """
+        policy = self.parser.recycle
+        memory = self.parser.memory
+        self._navigations += 1
+        navigations = self._page_navigations.get(id(page), 0) + 1
+        self._page_navigations[id(page)] = navigations
+
+        over_limit = False
+        if policy.should_check_memory(self._navigations):
+            try:
+                memory.record_js_heap(await page.evaluate(JS_HEAP_SCRIPT))
+            except Exception:
+                pass
+            over_limit = policy.over_limit(await asyncio.to_thread(memory.sample))
+        if not (over_limit or policy.page_expired(navigations)):
+            return page
+
+        try:
+            context = page.context
+            state = await context.storage_state()
+            self._page_navigations.pop(id(page), None)
+            await context.close()
+            page = await self._new_page(state)
+        except Exception as e:
+            print(f"Не удалось пересоздать страницу браузера: {e}")
+            if page.is_closed():
+                page = await self._new_page()
+            return page
+        self.parser.metrics.count("page_recycles")
+        return page
+
+    @asynccontextmanager
+    async def _page(self) -> AsyncIterator["Page"]:
+        """Берет свободную страницу из пула и возвращает ее после использования (при необходимости новую)"""
+        await self._ensure_pool()
+        page = await self._pages.get()
+        try:
+            yield page
+        finally:
+            page = await self._recycle_if_needed(page)
+            self._pages.put_nowait(page)
+
+    async def _fetch(self, url: str, kind: str, debug_name: str, **context: Any) -> str:
+        """Загружает страницу с учетом бюджета хоста и возвращает ее HTML-код
+
+        Args:
+            url (str): URL страницы
+            kind (str): Тип страницы ('brands', 'models', 'engines')
+            debug_name (str): Имя файлов отладочных данных
+            **context: Данные для проверки полноты страницы (например, brand_id)
+
+        Returns:
+            str: HTML-код страницы
+        """
+        metrics = self.parser.metrics
+        attempt = 0
+        while True:
+            attempt += 1
+            self.parser.retry.record_request()
+            try:
+                with metrics.stage(f"load_{kind}"):
+                    content = await self._fetch_page(url, kind, debug_name, **context)
+            except Exception as e:
+                delay = self.parser.retry_after_error(url, attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+
+            metrics.count("pages")
+            return content
+
+    async def _fetch_page(self, url: str, kind: str, debug_name: str, **context: Any) -> str:
+        """Загружает страницу для _fetch(): кэш, HTTP-клиент или пул страниц браузера
+
+        Время ответа сайта (без ожидания слота бюджета) передается регулятору частоты.
+        """
+        metrics = self.parser.metrics
+        throttle = self.parser.throttle
+        cache = self.parser.cache
+        artifacts = self.parser.artifacts
+        entry = None
+        if cache is not None:
+            entry = await asyncio.to_thread(cache.get, url)
+            if entry is not None and entry.fresh:
+                return entry.content
+
+        if self.http is not None:
+            await self.budget.acquire(url)
+            try:
+                started = time.perf_counter()
+                with metrics.stage("fetch"):
+                    if entry is not None:
+                        result = await asyncio.to_thread(self.http.fetch_conditional, url, kind,
+                                                         entry.etag, entry.last_modified, **context)
+                    else:
+                        result = await asyncio.to_thread(self.http.fetch_conditional, url, kind, **context)
+                throttle.on_success(time.perf_counter() - started)
+
+                if result.not_modified:
+                    cache.touch(url)
+                    return entry.content
+
+                if cache is not None:
+                    await asyncio.to_thread(cache.put, url, result.content, result.etag, result.last_modified)
+                reason = artifacts.decide(debug_name)
+                if reason:
+                    artifacts.submit(debug_name, reason, html=result.content)
+                return result.content
+            except FetchError as e:
+                if self.parser.fetch_backend == "http" or not isinstance(e, PageIncomplete):
+                    artifacts.error(debug_name, e)
+                    raise
+                print(f"{e}; переход на загрузчик 'browser'")
+                metrics.count("retries")
+
+        screenshot = None
+        async with self._page() as page:
+            await self.budget.acquire(url)
+            print(f"Переходим на URL: {url}")
+            started = time.perf_counter()
+            try:
+                await self.parser.load_profile.navigate_async(page, url, kind, **context)
+                throttle.on_success(time.perf_counter() - started)
+            except Exception as e:
+                if artifacts.enabled:
+                    html, screenshot = await self._page_snapshot(page)
+                    artifacts.error(debug_name, e, html=html, screenshot=screenshot)
+                raise
+
+            with metrics.stage("content"):
+                content = await page.content()
+            reason = artifacts.decide(debug_name)
+            if reason and artifacts.screenshots:
+                _, screenshot = await self._page_snapshot(page, content=content)
+
+        if cache is not None:
+            await asyncio.to_thread(cache.put, url, content)
+        if reason:
+            artifacts.submit(debug_name, reason, html=content, screenshot=screenshot)
+        return content
+
+    async def _page_snapshot(self, page: "Page", content: Optional[str] = None) -> Tuple[Optional[str], Optional[bytes]]:
+        """Получает HTML-код и скриншот страницы для отладочных данных, не прерывая обход при ошибке
+
+        Args:
+            page (Page): Объект страницы Playwright
+            content (Optional[str]): Уже полученный HTML-код страницы
+
+        Returns:
+            Tuple[Optional[str], Optional[bytes]]: HTML-код и скриншот в формате PNG
+        """
+        screenshot = None
+        try:
+            if content is None:
+                content = await page.content()
+            if self.parser.artifacts.screenshots:
+                with self.parser.metrics.stage("screenshot"):
+                    screenshot = await page.screenshot()
+        except Exception as e:
+            print(f"Не удалось получить отладочные данные страницы: {e}")
+        return content, screenshot
+
+    async def _crawl_brand(self, brand: Dict[str, str]) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Загружает модели бренда и параллельно двигатели каждой модели
+
+        Args:
+            brand (Dict[str, str]): Информация о бренде
+
+        Returns:
+            List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]: Пары (модель, двигатели)
+        """
+        brand_id = brand["id"]
+        brand_name = brand["name"]
+
+        journal = self.parser.journal
+        models = journal.get_models(brand_id) if journal is not None else None
+        if models is None:
+            models_url = self.parser.models_url(brand_id)
+
+            async def load_models() -> List[Dict[str, Any]]:
+                print(f"Получение моделей для бренда {brand_name} ({brand_id})...")
+                content = await self._fetch(models_url, "models", f"models_{brand_id}", brand_id=brand_id)
+                return await asyncio.to_thread(self.parser.extract_models, content, brand_id, brand_name,
+                                               f"models_{brand_id}")
+
+            try:
+                models, _ = await self._fetch_once(models_url, "models", load_models)
+            except Exception as e:
+                # Бренд без моделей остается в результате, остальные бренды обходятся дальше
+                print(f"Ошибка при получении моделей бренда {brand_name}: {e}")
+                self.parser.failures.add("models", models_url, e, brand=brand_name)
+                return []
+            models = models[:self.parser.max_models]
+            if journal is not None:
+                journal.record_models(brand_id, models)
+
+        stream = self.parser.stream
+        if stream is not None:
+            for model in models:
+                stream.add_model(brand, model)
+
+        prefetched: Dict[str, str] = {}
+        if self.parser.batch is not None and self.http is None and self.parser.cache is None:
+            prefetched = await self._prefetch_engines(brand_id, models)
+
+        engines = await asyncio.gather(*(self._crawl_engines(brand, model, prefetched) for model in models))
+        return list(zip(models, engines))
+
+    async def _prefetch_engines(self, brand_id: str, models: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Загружает страницы двигателей моделей бренда пакетом через fetch() на странице пула
+
+        Args:
+            brand_id (str): ID бренда
+            models (List[Dict[str, Any]]): Модели бренда
+
+        Returns:
+            Dict[str, str]: URL -> HTML-код полученных страниц (остальные загружаются переходом)
+        """
+        urls = self.parser.engine_batch_urls(brand_id, models)
+        if not urls:
+            return {}
+
+        batch = self.parser.batch
+        metrics = self.parser.metrics
+        prefetched: Dict[str, str] = {}
+        try:
+            async with self._page() as page:
+                if not batch.usable(page.url, self.parser.BASE_URL):
+                    await self.budget.acquire(self.parser.BASE_URL)
+                    await page.goto(self.parser.BASE_URL, wait_until="domcontentloaded")
+
+                pending = list(urls)
+                for start in range(0, len(pending), batch.concurrency):
+                    chunk = pending[start:start + batch.concurrency]
+                    for url in chunk:
+                        await self.budget.acquire(url)
+                        self.parser.retry.record_request()
+                    with metrics.stage("batch_fetch"):
+                        results = await batch.fetch_async(page, chunk)
+                    for result in results:
+                        content = self.parser.accept_batch_result(result, urls[result.url])
+                        if content is not None:
+                            prefetched[result.url] = content
+        except Exception as e:
+            metrics.count("errors")
+            print(f"Пакетная загрузка двигателей прервана, остальные страницы загружаются переходом: {e}")
+
+        print(f"Пакетом получено страниц двигателей: {len(prefetched)} из {len(urls)}")
+        return prefetched
+
+    async def _crawl_engines(self, brand: Dict[str, str], model: Dict[str, Any],
+                             prefetched: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """Загружает двигатели модели; при ошибке возвращает пустой список
+
+        Args:
+            brand (Dict[str, str]): Информация о бренде
+            model (Dict[str, Any]): Информация о модели
+            prefetched (Optional[Dict[str, str]]): Страницы двигателей, полученные пакетной загрузкой
+
+        Returns:
+            List[Dict[str, Any]]: Список двигателей
+        """
+        brand_name = brand["name"]
+        model_id = model["id"]
+        model_name = model["name"]
+
+        journal = self.parser.journal
+        if journal is not None:
+            engines = journal.get_engines(brand["id"], model_id)
+            if engines is not None:
+                return self._emit_engines(brand, model, engines)
+
+        async def load_engines() -> List[Dict[str, Any]]:
+            print(f"Получение двигателей для модели {model_name} бренда {brand_name}...")
+            url = self.parser.engines_url(model_id)
+            content = prefetched.pop(url, None) if prefetched else None
+            if content is None:
+                content = await self._fetch(url, "engines", f"engines_{model_id}")
+            return await asyncio.to_thread(self.parser.extract_engines, content, model_name,
+                                           f"engines_{model_id}")
+
+        try:
+            engines, fetched = await self._fetch_once(self.parser.engines_url(model_id), "engines", load_engines)
+            engines = engines[:self.parser.max_engines]
+            if journal is not None:
+                journal.record_engines(brand["id"], model_id, engines)
+            if fetched:
+                print(f"    {brand_name} / {model_name}: получено двигателей: {len(engines)}")
+            else:
+                print(f"    {brand_name} / {model_name}: двигатели взяты из уже загруженной страницы: {len(engines)}")
+            return self._emit_engines(brand, model, engines)
+        except Exception as e:
+            print(f"    {brand_name} / {model_name}: ошибка при получении двигателей: {e}")
+            self.parser.failures.add("engines", self.parser.engines_url(model_id), e,
+                                     brand=brand_name, model=model_name)
+            return []
+
+    async def _fetch_once(self, url: str, kind: str,
+                          load: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> Tuple[List[Dict[str, Any]], bool]:
+        """Загружает страницу один раз за запуск; повторы URL ждут первой загрузки
+
+        Args:
+            url (str): URL страницы
+            kind (str): Тип страницы ('models', 'engines')
+            load (Callable[[], Awaitable[List[Dict[str, Any]]]]): Загрузка и разбор страницы
+
+        Returns:
+            Tuple[List[Dict[str, Any]], bool]: Записи и признак того, что страница была загружена
+        """
+        frontier = self.parser.frontier
+        if frontier is None:
+            return await load(), True
+
+        key = frontier.key(url)
+        if not frontier.claim(url):
+            # Ошибка первой загрузки передается и повторам
+            return list(await asyncio.shield(self._shared[key])), False
+
+        future = asyncio.ensure_future(load())
+        self._shared[key] = future
+        records = await future
+        frontier.complete(url, kind, records)
+        return records, True
+
+    def _emit_engines(self, brand: Dict[str, str], model: Dict[str, Any],
+                      engines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Передает двигатели в поток NDJSON, если он включен
+
+        Args:
+            brand (Dict[str, str]): Информация о бренде
+            model (Dict[str, Any]): Информация о модели
+            engines (List[Dict[str, Any]]): Список двигателей
+
+        Returns:
+            List[Dict[str, Any]]: Двигатели для сборки результата в памяти (пустой список при потоковом выводе)
+        """
+        stream = self.parser.stream
+        if stream is None:
+            return engines
+        stream.add_engines(brand, model, engines)
+        return []
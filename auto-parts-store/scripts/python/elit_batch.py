@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Пакетная загрузка страниц elit.ro изнутри уже открытой страницы браузера.
+Вместо перехода page.goto() на каждую страницу двигателей страница сайта
+выполняет fetch() для списка URL с ограничением числа одновременных
+запросов. Запросы идут с cookies и сессией браузера, а HTML возвращается
+без отрисовки, раскладки и выполнения скриптов. Ответы без таблицы
+двигателей парсер загружает обычным переходом.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional, TYPE_CHECKING
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page as AsyncPage
+    from playwright.sync_api import Page
+
+# Пул из concurrency асинхронных обработчиков забирает URL по очереди;
+# каждый запрос ограничен таймаутом через AbortController
+BATCH_FETCH_SCRIPT = """
+async ({urls, concurrency, timeout}) => {
+    const results = new Array(urls.length);
+    let next = 0;
+    async function worker() {
+        while (next < urls.length) {
+            const index = next++;
+            const url = urls[index];
+            const started = performance.now();
+            const controller = new AbortController();
+            const timer = setTimeout(() => controller.abort(), timeout);
+            try {
+                const response = await fetch(url, {credentials: "include", signal: controller.signal});
+                const text = await response.text();
+                results[index] = {url, status: response.status, text,
+                                  retryAfter: response.headers.get("Retry-After"),
+                                  elapsed: performance.now() - started};
+            } catch (error) {
+                results[index] = {url, status: null, text: null, error: String(error),
+                                  elapsed: performance.now() - started};
+            } finally {
+                clearTimeout(timer);
+            }
+        }
+    }
+    await Promise.all(Array.from({length: Math.min(concurrency, urls.length)}, worker));
+    return results;
+}
+"""
+
+
+class BatchResult(NamedTuple):
+    """Результат загрузки одного URL пакета"""
+    url: str
+    status: Optional[int]
+    content: Optional[str]
+    error: Optional[str]
+    elapsed: float
+    retry_after: Optional[float]
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class InPageBatch:
+    """Пакетная загрузка URL через fetch() на странице браузера"""
+
+    def __init__(self, concurrency: int = 8, timeout: float = 30.0):
+        """Инициализация пакетной загрузки
+
+        Args:
+            concurrency (int): Число одновременных запросов на странице
+            timeout (float): Таймаут одного запроса в секундах
+        """
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+
+    @staticmethod
+    def usable(page_url: Optional[str], base_url: str) -> bool:
+        """Проверяет, что страница открыта на сайте (иначе fetch() блокируется политикой CORS)
+
+        Args:
+            page_url (Optional[str]): Текущий URL страницы браузера
+            base_url (str): Базовый URL сайта
+
+        Returns:
+            bool: True, если с этой страницы можно загружать страницы сайта
+        """
+        return bool(page_url) and _origin(page_url) == _origin(base_url)
+
+    def _arguments(self, urls: List[str]) -> Dict[str, Any]:
+        return {"urls": urls, "concurrency": self.concurrency, "timeout": int(self.timeout * 1000)}
+
+    @staticmethod
+    def _results(urls: List[str], raw: Optional[List[Dict[str, Any]]]) -> List[BatchResult]:
+        results = []
+        for url, item in zip(urls, raw or []):
+            item = item or {}
+            results.append(BatchResult(url, item.get("status"), item.get("text"), item.get("error"),
+                                       (item.get("elapsed") or 0.0) / 1000, _retry_after(item.get("retryAfter"))))
+        return results
+
+    def fetch(self, page: "Page", urls: List[str]) -> List[BatchResult]:
+        """Загружает URL со страницы браузера
+
+        Args:
+            page (Page): Страница Playwright, открытая на сайте
+            urls (List[str]): URL страниц
+
+        Returns:
+            List[BatchResult]: Результаты в порядке URL
+        """
+        if not urls:
+            return []
+        return self._results(urls, page.evaluate(BATCH_FETCH_SCRIPT, self._arguments(urls)))
+
+    async def fetch_async(self, page: "AsyncPage", urls: List[str]) -> List[BatchResult]:
+        """Асинхронный вариант fetch()"""
+        if not urls:
+            return []
+        return self._results(urls, await page.evaluate(BATCH_FETCH_SCRIPT, self._arguments(urls)))
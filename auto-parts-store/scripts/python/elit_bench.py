@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Офлайн-бенчмарк разбора страниц elit.ro.
+parse_brands, parse_models и parse_engines вызываются на сохраненных и
+синтетических страницах через заглушку страницы, без Playwright и сети.
+Выводятся страницы в секунду, время на одну запись и пиковая память; при
+падении пропускной способности ниже сохраненной базовой линии код выхода 1.
+Также проверяется холодный импорт elit_parser: он должен укладываться в
+бюджет времени и не загружать Playwright, BeautifulSoup, requests и другие
+тяжелые модули, которые нужны только при обходе. Результаты разбора
+фикстур и проверки регрессий без замеров времени проверяются тестами
+(tests/test_bench.py, tests/test_import_budget.py).
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List
+
+from elit_fixtures import SCRIPT_DIR, Fixture, fixture_page, load_fixtures, parse_fixture, synthetic_fixtures
+from elit_parser import ElitRoParser
+from elit_parsers import PARSER_BACKENDS
+
+DEFAULT_BASELINE = SCRIPT_DIR / "bench_baseline.json"
+
+# Модули, которые не должны загружаться при импорте парсера (только в путях, где нужны)
+HEAVY_MODULES = ("playwright", "bs4", "lxml", "requests", "asyncio", "pandas", "http.client")
+
+# Бюджет времени холодного импорта elit_parser в миллисекундах
+IMPORT_BUDGET_MS = 100.0
+
+# Замер импорта в новом интерпретаторе: время самого import и загруженные тяжелые модули
+_IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def bench_fixture(backend: str, fixture: Fixture, repeat: int, debug_dir: str) -> Dict[str, Any]:
+    """Измеряет разбор одной фикстуры
+
+    Args:
+        backend (str): Бэкенд разбора HTML
+        fixture (Fixture): Фикстура
+        repeat (int): Количество повторов для замера времени (берется лучший)
+        debug_dir (str): Временный каталог для выходного файла парсера
+
+    Returns:
+        Dict[str, Any]: Результаты замера
+    """
+    limit = 10 ** 9
+    parser = ElitRoParser(str(Path(debug_dir) / "bench.json"), max_brands=limit, max_models=limit,
+                          max_engines=limit, parser_backend=backend, artifacts="off")
+    page = fixture_page(parser, fixture)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Прогрев и подсчет записей
+        records = len(parse_fixture(parser, page, fixture))
+
+        # Берется лучший из повторов: он меньше всего зависит от фоновой нагрузки.
+        # Сборщик мусора на время замера отключается, как в timeit
+        elapsed = float("inf")
+        gc.disable()
+        try:
+            for _ in range(max(1, repeat)):
+                started = time.perf_counter()
+                parse_fixture(parser, page, fixture)
+                elapsed = min(elapsed, time.perf_counter() - started)
+        finally:
+            gc.enable()
+
+        # Пиковая память измеряется отдельным прогоном: tracemalloc замедляет разбор
+        tracemalloc.start()
+        parse_fixture(parser, page, fixture)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "backend": backend,
+        "fixture": fixture.name,
+        "kind": fixture.kind,
+        "bytes": len(fixture.content.encode("utf-8")),
+        "records": records,
+        "seconds_per_page": elapsed,
+        "pages_per_sec": 1.0 / elapsed if elapsed > 0 else float("inf"),
+        "ms_per_record": elapsed * 1000 / records if records else None,
+        "peak_memory_kb": peak // 1024
+    }
+
+
+def aggregate(results: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Сводит замеры в пропускную способность по бэкенду и типу страниц
+
+    Отдельные небольшие страницы разбираются за доли миллисекунды и слишком
+    зависят от фоновой нагрузки, поэтому с базовой линией сравнивается суммарное
+    время разбора всех фикстур одного типа.
+
+    Args:
+        results (List[Dict[str, Any]]): Результаты замеров
+
+    Returns:
+        Dict[str, float]: Страниц в секунду по ключу 'бэкенд/тип'
+    """
+    seconds: Dict[str, float] = {}
+    pages: Dict[str, int] = {}
+    for result in results:
+        key = f"{result['backend']}/{result['kind']}"
+        seconds[key] = seconds.get(key, 0.0) + result["seconds_per_page"]
+        pages[key] = pages.get(key, 0) + 1
+    return {key: pages[key] / seconds[key] for key in seconds if seconds[key] > 0}
+
+
+def check_baseline(throughput: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """Сравнивает пропускную способность с базовой линией
+
+    Args:
+        throughput (Dict[str, float]): Страниц в секунду по ключу 'бэкенд/тип'
+        baseline (Dict[str, float]): Базовая линия в том же формате
+        tolerance (float): Допустимое относительное падение (0.3 - на 30%)
+
+    Returns:
+        List[str]: Описания регрессий
+    """
+    regressions = []
+    for key, value in sorted(throughput.items()):
+        expected = baseline.get(key)
+        if expected and value < expected * (1 - tolerance):
+            regressions.append(f"{key}: {value:.1f} стр/с при базовой линии {expected:.1f} стр/с")
+    return regressions
+
+
+def measure_import(module: str = "elit_parser", repeat: int = 5) -> Dict[str, Any]:
+    """Измеряет холодный импорт модуля в отдельных процессах Python
+
+    Args:
+        module (str): Имя модуля
+        repeat (int): Количество запусков (берется лучший)
+
+    Returns:
+        Dict[str, Any]: Лучшее время импорта в секундах и загруженные тяжелые модули
+    """
+    probe = _IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)
+    best: Dict[str, Any] = {"seconds": float("inf"), "loaded": []}
+    for _ in range(max(1, repeat)):
+        output = subprocess.run([sys.executable, "-c", probe], cwd=str(SCRIPT_DIR), check=True,
+                                capture_output=True, text=True).stdout
+        measured = json.loads(output.strip().splitlines()[-1])
+        if measured["seconds"] < best["seconds"]:
+            best = measured
+    return best
+
+
+def check_import(measured: Dict[str, Any], budget_ms: float) -> List[str]:
+    """Сравнивает замер импорта с бюджетом
+
+    Args:
+        measured (Dict[str, Any]): Результат measure_import()
+        budget_ms (float): Бюджет времени импорта в миллисекундах
+
+    Returns:
+        List[str]: Описания нарушений
+    """
+    problems = []
+    if measured["seconds"] * 1000 > budget_ms:
+        problems.append(f"импорт занимает {measured['seconds'] * 1000:.0f} мс при бюджете {budget_ms:.0f} мс")
+    if measured["loaded"]:
+        problems.append(f"при импорте загружаются модули: {', '.join(measured['loaded'])}")
+    return problems
+
+
+def main():
+    """Запускает бенчмарк из командной строки"""
+    parser = argparse.ArgumentParser(description="Офлайн-бенчмарк разбора страниц elit.ro")
+    parser.add_argument("--backends", nargs="+", choices=PARSER_BACKENDS, default=list(PARSER_BACKENDS),
+                        help="Бэкенды разбора HTML")
+    parser.add_argument("--repeat", type=int, default=5, help="Количество повторов разбора каждой страницы")
+    parser.add_argument("--no-debug-pages", action="store_true", help="Не использовать страницы из debug_output")
+    parser.add_argument("--synthetic-brands", type=int, default=500, help="Брендов на синтетической странице (0 - нет)")
+    parser.add_argument("--synthetic-models", type=int, default=300, help="Моделей на синтетической странице (0 - нет)")
+    parser.add_argument("--synthetic-engines", type=int, default=2000,
+                        help="Строк в синтетической таблице двигателей (0 - нет)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Файл базовой линии")
+    parser.add_argument("--update-baseline", action="store_true", help="Записать текущие результаты как базовую линию")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="Допустимое относительное падение пропускной способности")
+    parser.add_argument("--json", help="Сохранить результаты замеров в JSON-файл")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS,
+                        help="Бюджет времени холодного импорта elit_parser в мс (0 - без проверки)")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(include_debug=not args.no_debug_pages)
+    fixtures += synthetic_fixtures(args.synthetic_brands, args.synthetic_models, args.synthetic_engines)
+    if not fixtures:
+        print("Нет фикстур для бенчмарка")
+        sys.exit(2)
+
+    results = []
+    with tempfile.TemporaryDirectory() as debug_dir:
+        for backend in args.backends:
+            for fixture in fixtures:
+                result = bench_fixture(backend, fixture, args.repeat, debug_dir)
+                results.append(result)
+                per_record = f"{result['ms_per_record']:.3f}" if result["ms_per_record"] is not None else "-"
+                print(f"{backend:5} {fixture.name:32} {result['kind']:8} записей: {result['records']:5}  "
+                      f"{result['pages_per_sec']:8.1f} стр/с  {per_record:>8} мс/запись  "
+                      f"{result['peak_memory_kb']:7} КБ")
+
+    throughput = aggregate(results)
+    print()
+    for key, value in sorted(throughput.items()):
+        print(f"{key:16} {value:8.1f} стр/с")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    import_problems = []
+    if args.import_budget_ms > 0:
+        measured = measure_import("elit_parser")
+        print(f"Импорт elit_parser: {measured['seconds'] * 1000:.1f} мс (бюджет {args.import_budget_ms:.0f} мс)")
+        import_problems = check_import(measured, args.import_budget_ms)
+        if import_problems:
+            print("Регрессия времени запуска:")
+            for problem in import_problems:
+                print(f"  {problem}")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline = {key: round(value, 1) for key, value in throughput.items()}
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"Базовая линия сохранена в файл {baseline_path}")
+        return
+
+    if baseline_path.exists():
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = check_baseline(throughput, baseline, args.tolerance)
+        if regressions:
+            print("Падение производительности разбора:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"Производительность в пределах базовой линии (допуск {args.tolerance:.0%})")
+
+    if import_problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Постоянный дисковый кэш страниц elit.ro.
+HTML хранится в сжатом виде по SHA-256 содержимого (одинаковые страницы
+хранятся один раз), индекс URL -> содержимое ведется в SQLite. Поддерживаются
+срок жизни записей, ограничение размера с вытеснением давно не используемых
+записей и условная перепроверка через ETag / Last-Modified.
+"""
+
+import gzip
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class CacheEntry(NamedTuple):
+    """Запись кэша страницы"""
+    url: str
+    content: str
+    fetched_at: float
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh: bool
+
+
+class PageCache:
+    """Дисковый кэш HTML-страниц с адресацией по содержимому"""
+
+    def __init__(self, cache_dir: str = "page_cache", ttl: float = 7 * 24 * 3600,
+                 max_bytes: int = 512 * 1024 * 1024):
+        """Инициализация кэша
+
+        Args:
+            cache_dir (str): Каталог кэша
+            ttl (float): Срок жизни записи в секундах
+            max_bytes (int): Максимальный суммарный размер сжатых страниц в байтах
+        """
+        self.cache_dir = Path(cache_dir)
+        self.blobs_dir = self.cache_dir / "blobs"
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "stale": 0, "misses": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.cache_dir / "index.sqlite"), check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            );
+            CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access);
+            CREATE INDEX IF NOT EXISTS pages_digest ON pages (digest);
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            );
+        """)
+        self._db.commit()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blobs_dir / digest[:2] / f"{digest}.html.gz"
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Возвращает запись кэша для URL (в том числе устаревшую)
+
+        Args:
+            url (str): URL страницы
+
+        Returns:
+            Optional[CacheEntry]: Запись кэша или None, если страницы нет в кэше
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest, fetched_at, etag, last_modified FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+
+            digest, fetched_at, etag, last_modified = row
+            try:
+                # Файл читается под блокировкой, чтобы его не удалило вытеснение из другого потока
+                compressed = self._blob_path(digest).read_bytes()
+            except FileNotFoundError:
+                # Файл удален вручную - удаляем записи всех URL с этим содержимым и размер файла
+                self._db.execute("DELETE FROM pages WHERE digest = ?", (digest,))
+                self._db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                self._db.commit()
+                self.stats["misses"] += 1
+                return None
+
+            self._db.execute("UPDATE pages SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+            fresh = time.time() - fetched_at < self.ttl
+            self.stats["hits" if fresh else "stale"] += 1
+
+        content = gzip.decompress(compressed).decode("utf-8")
+        return CacheEntry(url, content, fetched_at, etag, last_modified, fresh)
+
+    def put(self, url: str, content: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Сохраняет страницу в кэш
+
+        Args:
+            url (str): URL страницы
+            content (str): HTML-код страницы
+            etag (Optional[str]): Значение заголовка ETag
+            last_modified (Optional[str]): Значение заголовка Last-Modified
+        """
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest)
+        now = time.time()
+
+        with self._lock:
+            if not blob_path.exists():
+                blob_path.parent.mkdir(exist_ok=True)
+                compressed = gzip.compress(data, compresslevel=6)
+                tmp_path = blob_path.with_suffix(".tmp")
+                tmp_path.write_bytes(compressed)
+                tmp_path.replace(blob_path)
+                self._db.execute("INSERT OR REPLACE INTO blobs (digest, size) VALUES (?, ?)",
+                                 (digest, len(compressed)))
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, digest, fetched_at, last_access, etag, last_modified) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, digest, now, now, etag, last_modified)
+            )
+            self._db.commit()
+            self.stats["stored"] += 1
+            self._evict()
+
+    def touch(self, url: str) -> None:
+        """Продлевает срок жизни записи после ответа 304 Not Modified
+
+        Args:
+            url (str): URL страницы
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE pages SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, url))
+            self._db.commit()
+            self.stats["revalidated"] += 1
+
+    def total_bytes(self) -> int:
+        """Возвращает суммарный размер сжатых страниц"""
+        row = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        return row[0]
+
+    def _evict(self) -> None:
+        """Удаляет давно не использованные записи, пока кэш превышает лимит размера"""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+
+        rows = self._db.execute("SELECT url, digest FROM pages ORDER BY last_access").fetchall()
+        for url, digest in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self.stats["evicted"] += 1
+
+            # Содержимое удаляется, только если на него не ссылаются другие URL
+            still_used = self._db.execute("SELECT 1 FROM pages WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+            if still_used is None:
+                size_row = self._db.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+                self._db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                self._blob_path(digest).unlink(missing_ok=True)
+                total -= size_row[0] if size_row else 0
+
+        self._db.commit()
+
+    def summary(self) -> Dict[str, Any]:
+        """Возвращает статистику кэша за запуск"""
+        with self._lock:
+            return dict(self.stats, total_bytes=self.total_bytes())
+
+    def close(self) -> None:
+        """Закрывает индекс кэша"""
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Локальное хранилище каталога elit.ro в SQLite.
+Бренды, модели и двигатели из результата парсера раскладываются по
+нормализованным таблицам с индексами по бренду, модели, типу топлива,
+мощности (кВт/л.с.) и годам выпуска, поэтому выборки вроде «дизельные
+двигатели бренда X мощнее 100 кВт» и частичные выгрузки читают индекс, а не
+весь JSON. Экспорт восстанавливает прежний формат выходного файла парсера.
+"""
+
+import argparse
+import json
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from elit_loader import normalize_fuel, normalize_year, read_result
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS brands (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL COLLATE NOCASE UNIQUE,
+        country TEXT,
+        position INTEGER NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS models (
+        id INTEGER PRIMARY KEY,
+        brand_id INTEGER NOT NULL REFERENCES brands (id) ON DELETE CASCADE,
+        name TEXT NOT NULL COLLATE NOCASE,
+        position INTEGER NOT NULL,
+        body_type TEXT,
+        year_start TEXT,
+        year_end TEXT,
+        year_from INTEGER,
+        year_to INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS engines (
+        id INTEGER PRIMARY KEY,
+        model_id INTEGER NOT NULL REFERENCES models (id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        code TEXT,
+        description TEXT,
+        kw INTEGER,
+        hp INTEGER,
+        ccm INTEGER,
+        cylinders INTEGER,
+        fuel_type TEXT,
+        fuel TEXT NOT NULL,
+        year_start TEXT,
+        year_end TEXT,
+        year_from INTEGER,
+        year_to INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS models_brand ON models (brand_id, name);
+    CREATE INDEX IF NOT EXISTS models_years ON models (year_from, year_to);
+    CREATE INDEX IF NOT EXISTS engines_model ON engines (model_id, position);
+    CREATE INDEX IF NOT EXISTS engines_fuel_kw ON engines (fuel, kw);
+    CREATE INDEX IF NOT EXISTS engines_fuel_hp ON engines (fuel, hp);
+    CREATE INDEX IF NOT EXISTS engines_kw ON engines (kw);
+    CREATE INDEX IF NOT EXISTS engines_hp ON engines (hp);
+    CREATE INDEX IF NOT EXISTS engines_years ON engines (year_from, year_to);
+    CREATE INDEX IF NOT EXISTS engines_code ON engines (code);
+"""
+
+# Столбцы выборки двигателей в порядке полей записи парсера
+_ENGINE_COLUMNS = "e.code, e.kw, e.hp, e.ccm, e.cylinders, e.fuel_type, e.year_start, e.year_end, e.description"
+
+
+def _engine_record(row: Iterable[Any]) -> Dict[str, Any]:
+    """Восстанавливает запись двигателя в формате парсера из строки выборки _ENGINE_COLUMNS"""
+    code, kw, hp, ccm, cylinders, fuel_type, year_start, year_end, description = row
+    return {
+        "code": code,
+        "kw": kw,
+        "hp": hp,
+        "ccm": ccm,
+        "cylinders": cylinders,
+        "fuelType": fuel_type,
+        "yearStart": year_start,
+        "yearEnd": year_end,
+        "description": description
+    }
+
+
+class CatalogStore:
+    """Каталог брендов, моделей и двигателей в SQLite с запросами по индексам"""
+
+    def __init__(self, path: str):
+        """Открывает (или создает) хранилище
+
+        Args:
+            path (str): Файл базы SQLite
+        """
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.executescript(SCHEMA)
+
+    def import_result(self, result: Dict[str, Any]) -> Dict[str, int]:
+        """Загружает результат парсера; бренды из результата заменяются целиком, остальные не меняются
+
+        Args:
+            result (Dict[str, Any]): Результат в формате бренд -> модели -> двигатели
+
+        Returns:
+            Dict[str, int]: Количество загруженных брендов, моделей и двигателей
+        """
+        counts = {"brands": 0, "models": 0, "engines": 0}
+        now = time.time()
+        with self._db:
+            cursor = self._db.cursor()
+            position = cursor.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM brands").fetchone()[0]
+            for brand_name, brand_data in result.items():
+                country = (brand_data.get("info") or {}).get("country")
+                row = cursor.execute("SELECT id, position FROM brands WHERE name = ?", (brand_name,)).fetchone()
+                if row is not None:
+                    # Модели и двигатели бренда удаляются каскадом и загружаются заново
+                    brand_id = row[0]
+                    cursor.execute("DELETE FROM models WHERE brand_id = ?", (brand_id,))
+                    cursor.execute("UPDATE brands SET name = ?, country = ?, updated_at = ? WHERE id = ?",
+                                   (brand_name, country, now, brand_id))
+                else:
+                    cursor.execute("INSERT INTO brands (name, country, position, updated_at) VALUES (?, ?, ?, ?)",
+                                   (brand_name, country, position, now))
+                    brand_id = cursor.lastrowid
+                    position += 1
+                counts["brands"] += 1
+
+                for model_position, (model_name, model_data) in enumerate((brand_data.get("models") or {}).items()):
+                    info = model_data.get("info") or {}
+                    cursor.execute("""
+                        INSERT INTO models (brand_id, name, position, body_type, year_start, year_end, year_from, year_to)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (brand_id, model_name, model_position, info.get("bodyType"),
+                          info.get("yearStart"), info.get("yearEnd"),
+                          normalize_year(info.get("yearStart")), normalize_year(info.get("yearEnd"))))
+                    model_id = cursor.lastrowid
+                    counts["models"] += 1
+
+                    engines = model_data.get("engines") or []
+                    cursor.executemany("""
+                        INSERT INTO engines (model_id, position, code, description, kw, hp, ccm, cylinders,
+                                             fuel_type, fuel, year_start, year_end, year_from, year_to)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, [
+                        (model_id, engine_position, engine.get("code"), engine.get("description"),
+                         engine.get("kw"), engine.get("hp"), engine.get("ccm"), engine.get("cylinders"),
+                         engine.get("fuelType"), normalize_fuel(engine.get("fuelType")),
+                         engine.get("yearStart"), engine.get("yearEnd"),
+                         normalize_year(engine.get("yearStart")), normalize_year(engine.get("yearEnd")))
+                        for engine_position, engine in enumerate(engines)
+                    ])
+                    counts["engines"] += len(engines)
+            # Статистика индексов помогает планировщику выбрать самый избирательный индекс
+            cursor.execute("ANALYZE")
+        return counts
+
+    def remove_brands(self, names: List[str]) -> int:
+        """Удаляет бренды вместе с моделями и двигателями
+
+        Args:
+            names (List[str]): Названия брендов
+
+        Returns:
+            int: Количество удаленных брендов
+        """
+        with self._db:
+            return sum(self._db.execute("DELETE FROM brands WHERE name = ?", (name,)).rowcount for name in names)
+
+    def export(self, brands: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Собирает каталог (или выбранные бренды) в формате выходного JSON парсера
+
+        Args:
+            brands (Optional[List[str]]): Названия брендов (None - все бренды)
+
+        Returns:
+            Dict[str, Any]: Результат в формате бренд -> модели -> двигатели
+        """
+        where, params = "", []
+        if brands:
+            where = f"WHERE b.name IN ({', '.join('?' * len(brands))})"
+            params = list(brands)
+
+        result: Dict[str, Any] = {}
+        models: Dict[int, Dict[str, Any]] = {}
+        for brand_name, country in self._db.execute(
+                f"SELECT b.name, b.country FROM brands b {where} ORDER BY b.position", params):
+            result[brand_name] = {"info": {"country": country}, "models": {}}
+
+        for model_id, brand_name, name, body_type, year_start, year_end in self._db.execute(f"""
+                SELECT m.id, b.name, m.name, m.body_type, m.year_start, m.year_end
+                FROM models m JOIN brands b ON b.id = m.brand_id {where}
+                ORDER BY b.position, m.position""", params):
+            entry = {"info": {"bodyType": body_type, "yearStart": year_start, "yearEnd": year_end}, "engines": []}
+            result[brand_name]["models"][name] = entry
+            models[model_id] = entry
+
+        for row in self._db.execute(f"""
+                SELECT e.model_id, {_ENGINE_COLUMNS}
+                FROM engines e JOIN models m ON m.id = e.model_id JOIN brands b ON b.id = m.brand_id {where}
+                ORDER BY e.model_id, e.position""", params):
+            models[row[0]]["engines"].append(_engine_record(row[1:]))
+        return result
+
+    def brands(self) -> List[Dict[str, Any]]:
+        """Возвращает бренды с количеством моделей"""
+        return [
+            {"name": name, "country": country, "models": count}
+            for name, country, count in self._db.execute("""
+                SELECT b.name, b.country, COUNT(m.id) FROM brands b LEFT JOIN models m ON m.brand_id = b.id
+                GROUP BY b.id ORDER BY b.position""")
+        ]
+
+    def models(self, brand: str, year: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Возвращает модели бренда
+
+        Args:
+            brand (str): Название бренда (без учета регистра)
+            year (Optional[int]): Только модели, выпускавшиеся в этом году
+
+        Returns:
+            List[Dict[str, Any]]: Модели с годами выпуска и количеством двигателей
+        """
+        sql = """
+            SELECT m.name, m.body_type, m.year_start, m.year_end, COUNT(e.id)
+            FROM models m JOIN brands b ON b.id = m.brand_id LEFT JOIN engines e ON e.model_id = m.id
+            WHERE b.name = ?"""
+        params: List[Any] = [brand]
+        if year is not None:
+            sql += " AND m.year_from <= ? AND (m.year_to IS NULL OR m.year_to >= ?)"
+            params += [year, year]
+        sql += " GROUP BY m.id ORDER BY m.position"
+        return [
+            {"name": name, "bodyType": body_type, "yearStart": year_start, "yearEnd": year_end, "engines": count}
+            for name, body_type, year_start, year_end, count in self._db.execute(sql, params)
+        ]
+
+    def engines(self, brand: Optional[str] = None, model: Optional[str] = None, fuel: Optional[str] = None,
+                min_kw: Optional[int] = None, max_kw: Optional[int] = None,
+                min_hp: Optional[int] = None, max_hp: Optional[int] = None,
+                year: Optional[int] = None, code: Optional[str] = None,
+                limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Выбирает двигатели по условиям (все условия необязательны и объединяются через И)
+
+        Args:
+            brand (Optional[str]): Название бренда (без учета регистра)
+            model (Optional[str]): Название модели (без учета регистра)
+            fuel (Optional[str]): Тип топлива в виде сайта ('Diesel', 'Benzina') или приложения ('дизельный')
+            min_kw (Optional[int]): Минимальная мощность в кВт
+            max_kw (Optional[int]): Максимальная мощность в кВт
+            min_hp (Optional[int]): Минимальная мощность в л.с.
+            max_hp (Optional[int]): Максимальная мощность в л.с.
+            year (Optional[int]): Двигатель выпускался в этом году
+            code (Optional[str]): Код двигателя
+            limit (Optional[int]): Максимальное количество записей
+
+        Returns:
+            List[Dict[str, Any]]: Записи двигателей в формате парсера с полями brand и model
+        """
+        conditions, params = [], []
+        for clause, value in (("b.name = ?", brand), ("m.name = ?", model), ("e.code = ?", code),
+                              ("e.kw >= ?", min_kw), ("e.kw <= ?", max_kw),
+                              ("e.hp >= ?", min_hp), ("e.hp <= ?", max_hp)):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+        if fuel:
+            conditions.append("e.fuel = ?")
+            params.append(normalize_fuel(fuel))
+        if year is not None:
+            conditions.append("e.year_from <= ? AND (e.year_to IS NULL OR e.year_to >= ?)")
+            params += [year, year]
+
+        sql = f"""
+            SELECT b.name, m.name, {_ENGINE_COLUMNS}
+            FROM engines e JOIN models m ON m.id = e.model_id JOIN brands b ON b.id = m.brand_id
+            {"WHERE " + " AND ".join(conditions) if conditions else ""}
+            ORDER BY b.position, m.position, e.position"""
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        records = []
+        for row in self._db.execute(sql, params):
+            record = {"brand": row[0], "model": row[1]}
+            record.update(_engine_record(row[2:]))
+            records.append(record)
+        return records
+
+    def stats(self) -> Dict[str, int]:
+        """Возвращает количество брендов, моделей и двигателей"""
+        return {table: self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("brands", "models", "engines")}
+
+    def close(self) -> None:
+        """Закрывает базу"""
+        self._db.close()
+
+
+def import_catalog(result: Dict[str, Any], path: str) -> Dict[str, int]:
+    """Загружает результат парсера в хранилище каталога
+
+    Args:
+        result (Dict[str, Any]): Результат в формате бренд -> модели -> двигатели
+        path (str): Файл базы SQLite каталога
+
+    Returns:
+        Dict[str, int]: Количество загруженных брендов, моделей и двигателей
+    """
+    store = CatalogStore(path)
+    try:
+        started = time.perf_counter()
+        counts = store.import_result(result)
+        print(f"Каталог {path}: загружено брендов {counts['brands']}, моделей {counts['models']}, "
+              f"двигателей {counts['engines']} за {time.perf_counter() - started:.2f} с")
+        return counts
+    finally:
+        store.close()
+
+
+def _print_records(records: List[Dict[str, Any]], output_format: str) -> None:
+    """Выводит записи построчно в JSON или таблицей"""
+    if output_format == "json":
+        print(json.dumps(records, ensure_ascii=False, indent=2))
+        return
+    for record in records:
+        print("\t".join("" if value is None else str(value) for value in record.values()))
+    print(f"Записей: {len(records)}")
+
+
+def main():
+    """Загрузка, выборки и экспорт каталога из командной строки"""
+    parser = argparse.ArgumentParser(description="Локальное хранилище каталога elit.ro (SQLite)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("import", help="Загрузить JSON-файл парсера или NDJSON-поток")
+    load.add_argument("catalog", help="Файл базы SQLite каталога")
+    load.add_argument("input", help="JSON-файл парсера или NDJSON-поток (.ndjson)")
+
+    export = commands.add_parser("export", help="Выгрузить каталог в формате JSON парсера")
+    export.add_argument("catalog", help="Файл базы SQLite каталога")
+    export.add_argument("output", help="Путь для сохранения JSON файла")
+    export.add_argument("--brands", nargs="+", help="Выгрузить только эти бренды")
+
+    brands = commands.add_parser("brands", help="Список брендов")
+    brands.add_argument("catalog", help="Файл базы SQLite каталога")
+
+    models = commands.add_parser("models", help="Модели бренда")
+    models.add_argument("catalog", help="Файл базы SQLite каталога")
+    models.add_argument("brand", help="Название бренда")
+    models.add_argument("--year", type=int, help="Только модели, выпускавшиеся в этом году")
+
+    engines = commands.add_parser("engines", help="Выборка двигателей")
+    engines.add_argument("catalog", help="Файл базы SQLite каталога")
+    engines.add_argument("--brand", help="Название бренда")
+    engines.add_argument("--model", help="Название модели")
+    engines.add_argument("--fuel", help="Тип топлива (Diesel, Benzina, дизельный, бензиновый, ...)")
+    engines.add_argument("--min-kw", type=int, help="Минимальная мощность в кВт")
+    engines.add_argument("--max-kw", type=int, help="Максимальная мощность в кВт")
+    engines.add_argument("--min-hp", type=int, help="Минимальная мощность в л.с.")
+    engines.add_argument("--max-hp", type=int, help="Максимальная мощность в л.с.")
+    engines.add_argument("--year", type=int, help="Двигатель выпускался в этом году")
+    engines.add_argument("--code", help="Код двигателя")
+    engines.add_argument("--limit", type=int, help="Максимальное количество записей")
+
+    for command in (brands, models, engines):
+        command.add_argument("--format", choices=["table", "json"], default="table", help="Формат вывода")
+
+    stats = commands.add_parser("stats", help="Количество брендов, моделей и двигателей")
+    stats.add_argument("catalog", help="Файл базы SQLite каталога")
+
+    args = parser.parse_args()
+
+    if args.command == "import":
+        import_catalog(read_result(args.input), args.catalog)
+        return
+
+    store = CatalogStore(args.catalog)
+    try:
+        if args.command == "export":
+            result = store.export(args.brands)
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            print(f"Брендов: {len(result)}, результат сохранен в файл {args.output}")
+        elif args.command == "brands":
+            _print_records(store.brands(), args.format)
+        elif args.command == "models":
+            _print_records(store.models(args.brand, args.year), args.format)
+        elif args.command == "engines":
+            _print_records(store.engines(args.brand, args.model, args.fuel, args.min_kw, args.max_kw,
+                                         args.min_hp, args.max_hp, args.year, args.code, args.limit), args.format)
+        else:
+            print(store.stats())
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Журнал контрольных точек полного обхода elit.ro.
+Каждая завершенная единица работы (список брендов, модели бренда, двигатели модели)
+дописывается в конец JSONL-файла сразу после получения. При повторном запуске
+с --resume выполненные единицы пропускаются, а итоговый JSON собирается из журнала.
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+class CheckpointJournal:
+    """Журнал выполненных единиц работы в формате JSON Lines (только дозапись)"""
+
+    def __init__(self, path: str, resume: bool = False, params: Optional[Dict[str, Any]] = None):
+        """Открывает журнал
+
+        Args:
+            path (str): Путь к файлу журнала
+            resume (bool): Продолжить существующий журнал (иначе он начинается заново)
+            params (Optional[Dict[str, Any]]): Параметры запуска для сверки при продолжении
+        """
+        self.path = Path(path)
+        self.params = params or {}
+        self.brands: Optional[List[Dict[str, str]]] = None
+        self.models: Dict[str, List[Dict[str, Any]]] = {}
+        self.engines: Dict[str, List[Dict[str, Any]]] = {}
+        self.skipped = 0
+
+        if resume and self.path.exists():
+            self._load()
+            self._file = open(self.path, "a", encoding="utf-8")
+            print(f"Продолжение по журналу {self.path}: моделей брендов - {len(self.models)}, "
+                  f"моделей с двигателями - {len(self.engines)}")
+        else:
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._append({"unit": "run", "params": self.params})
+
+    @staticmethod
+    def _model_key(brand_id: str, model_id: str) -> str:
+        return f"{brand_id}/{model_id}"
+
+    def _load(self) -> None:
+        """Читает журнал; оборванная последняя строка пропускается"""
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                unit = record.get("unit")
+                if unit == "run":
+                    if self.params and record.get("params") != self.params:
+                        print(f"ВНИМАНИЕ: параметры запуска отличаются от записанных в журнале: {record.get('params')}")
+                elif unit == "brands":
+                    self.brands = record["brands"]
+                elif unit == "models":
+                    self.models[record["brand_id"]] = record["models"]
+                elif unit == "engines":
+                    self.engines[self._model_key(record["brand_id"], record["model_id"])] = record["engines"]
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """Дописывает запись и сбрасывает ее на диск"""
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record_brands(self, brands: List[Dict[str, str]]) -> None:
+        """Записывает список брендов для обхода"""
+        self.brands = brands
+        self._append({"unit": "brands", "brands": brands})
+
+    def record_models(self, brand_id: str, models: List[Dict[str, Any]]) -> None:
+        """Записывает список моделей бренда"""
+        self.models[brand_id] = models
+        self._append({"unit": "models", "brand_id": brand_id, "models": models})
+
+    def record_engines(self, brand_id: str, model_id: str, engines: List[Dict[str, Any]]) -> None:
+        """Записывает список двигателей модели"""
+        self.engines[self._model_key(brand_id, model_id)] = engines
+        self._append({"unit": "engines", "brand_id": brand_id, "model_id": model_id, "engines": engines})
+
+    def get_brands(self) -> Optional[List[Dict[str, str]]]:
+        """Возвращает сохраненный список брендов или None"""
+        if self.brands is not None:
+            self.skipped += 1
+        return self.brands
+
+    def get_models(self, brand_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Возвращает сохраненные модели бренда или None"""
+        models = self.models.get(brand_id)
+        if models is not None:
+            self.skipped += 1
+        return models
+
+    def get_engines(self, brand_id: str, model_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Возвращает сохраненные двигатели модели или None"""
+        engines = self.engines.get(self._model_key(brand_id, model_id))
+        if engines is not None:
+            self.skipped += 1
+        return engines
+
+    def build_result(self, brand_entry: Callable[[Dict[str, str]], Dict[str, Any]],
+                     model_entry: Callable[..., Dict[str, Any]]) -> Dict[str, Any]:
+        """Собирает результат в формате бренд -> модели -> двигатели
+
+        Бренды, до которых обход не дошел, в результат не попадают; модели
+        без записанных двигателей получают пустой список.
+
+        Args:
+            brand_entry (Callable): Функция формирования записи бренда
+            model_entry (Callable): Функция формирования записи модели
+
+        Returns:
+            Dict[str, Any]: Результат парсинга
+        """
+        result = {}
+        for brand in self.brands or []:
+            models = self.models.get(brand["id"])
+            if models is None:
+                continue
+
+            result[brand["name"]] = brand_entry(brand)
+            for model in models:
+                engines = self.engines.get(self._model_key(brand["id"], model["id"]))
+                result[brand["name"]]["models"][model["name"]] = model_entry(model, engines)
+        return result
+
+    def close(self) -> None:
+        """Закрывает файл журнала"""
+        self._file.close()
+
+
+def main():
+    """Собирает JSON-файл из журнала (в том числе незавершенного) без запуска обхода"""
+    parser = argparse.ArgumentParser(description="Сборка результата парсера elit.ro из журнала контрольных точек")
+    parser.add_argument("journal", help="Путь к файлу журнала")
+    parser.add_argument("output", help="Путь для сохранения выходного JSON файла")
+    args = parser.parse_args()
+
+    from elit_parser import ElitRoParser
+
+    journal = CheckpointJournal(args.journal, resume=True)
+    journal.close()
+    result = journal.build_result(ElitRoParser.brand_entry, ElitRoParser.model_entry)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print(f"Результаты сохранены в файл {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Клиент демона парсера elit.ro (elit_daemon.py).
+Передает запросы брендов, моделей и двигателей демону по HTTP или через
+Unix-сокет и возвращает результат в том же виде, что и режимы 'brands',
+'models' и 'engines' парсера. Модуль не зависит от Playwright, поэтому
+клиент запускается без холодного старта браузера.
+"""
+
+import http.client
+import json
+import socket
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode, urlsplit
+
+# Адрес демона по умолчанию
+DEFAULT_DAEMON_ADDRESS = "http://127.0.0.1:8765"
+
+
+class DaemonUnavailable(ConnectionError):
+    """Демон не запущен или не отвечает"""
+
+
+class DaemonError(RuntimeError):
+    """Демон не смог выполнить запрос (ошибка загрузки или разбора страницы)"""
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP-соединение через Unix-сокет"""
+
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class DaemonClient:
+    """Клиент HTTP API демона парсера"""
+
+    def __init__(self, address: str = DEFAULT_DAEMON_ADDRESS, timeout: float = 120.0):
+        """Инициализация клиента
+
+        Args:
+            address (str): Адрес демона: 'http://хост:порт' или 'unix:/путь/к/сокету'
+            timeout (float): Время ожидания ответа в секундах (включает загрузку страницы демоном)
+        """
+        self.address = address
+        self.timeout = timeout
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self.address.startswith("unix:"):
+            return _UnixHTTPConnection(self.address[len("unix:"):], self.timeout)
+        parts = urlsplit(self.address if "://" in self.address else f"http://{self.address}")
+        return http.client.HTTPConnection(parts.hostname or "127.0.0.1", parts.port or 8765, timeout=self.timeout)
+
+    def request(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Выполняет GET-запрос к API демона
+
+        Args:
+            path (str): Путь ('/brands', '/models', '/engines', '/health')
+            params (Optional[Dict[str, Any]]): Параметры запроса (пустые значения не передаются)
+
+        Returns:
+            Dict[str, Any]: Ответ демона
+
+        Raises:
+            DaemonUnavailable: Если демон не запущен или соединение прервано
+            DaemonError: Если демон вернул ошибку
+        """
+        query = urlencode({key: value for key, value in (params or {}).items() if value is not None})
+        connection = self._connection()
+        try:
+            connection.request("GET", f"{path}?{query}" if query else path)
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            raise DaemonUnavailable(f"Демон {self.address} недоступен: {e}") from e
+        finally:
+            connection.close()
+
+        data = json.loads(body.decode("utf-8")) if body else {}
+        if response.status != 200:
+            raise DaemonError(data.get("error", f"HTTP {response.status}"), response.status)
+        return data
+
+    def query(self, mode: str, brand_id: Optional[str] = None, model_id: Optional[str] = None,
+              limit: Optional[int] = None) -> Dict[str, Any]:
+        """Выполняет запрос в формате режимов парсера
+
+        Args:
+            mode (str): Режим ('brands', 'models', 'engines')
+            brand_id (Optional[str]): ID бренда для режима 'models'
+            model_id (Optional[str]): ID модели для режима 'engines'
+            limit (Optional[int]): Максимальное количество записей
+
+        Returns:
+            Dict[str, Any]: {'brands': [...]}, {'models': [...]} или {'engines': [...]}
+        """
+        if mode == "brands":
+            return self.request("/brands", {"limit": limit})
+        if mode == "models":
+            return self.request("/models", {"brand_id": brand_id, "limit": limit})
+        if mode == "engines":
+            return self.request("/engines", {"model_id": model_id, "limit": limit})
+        raise ValueError(f"Режим '{mode}' демоном не поддерживается")
+
+    def health(self) -> Dict[str, Any]:
+        """Возвращает состояние демона: загрузчики, кэш, частоту запросов"""
+        return self.request("/health")
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Демон парсера elit.ro для запросов брендов, моделей и двигателей по требованию.
+Браузеры (или HTTP-клиенты) загрузчиков запускаются один раз при старте и
+остаются прогретыми, поэтому запрос двигателей одной модели не ждет
+холодного старта Chromium. Одинаковые одновременные запросы объединяются в
+одну загрузку, а результаты хранятся в памяти заданное время. API доступен
+по HTTP или через Unix-сокет; клиент - elit_client.py и ключ --daemon парсера.
+"""
+
+import argparse
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from elit_client import DEFAULT_DAEMON_ADDRESS
+from elit_fetch import BrowserFetcher, FetchError, Fetcher, create_fetcher
+from elit_metrics import CrawlMetrics
+from elit_parser import ElitRoParser, add_crawl_arguments, crawl_options
+from elit_pipeline import ThreadHostBudget
+
+# Параметр запроса с ID для каждого типа запроса
+QUERY_KINDS = {"brands": None, "models": "brand_id", "engines": "model_id"}
+
+
+class ParserDaemon:
+    """Пул прогретых загрузчиков с объединением одинаковых запросов и кэшем результатов"""
+
+    def __init__(self, parser: ElitRoParser, workers: int = 2, ttl: float = 300.0, cache_size: int = 1024,
+                 query_timeout: float = 120.0):
+        """Инициализация демона
+
+        Args:
+            parser (ElitRoParser): Парсер, предоставляющий URL, разбор, лимиты и политику повторов
+            workers (int): Количество загрузчиков (у каждого свой браузер или HTTP-клиент)
+            ttl (float): Время хранения результата в кэше в секундах (0 - без кэша)
+            cache_size (int): Максимальное количество результатов в кэше
+            query_timeout (float): Время ожидания результата загрузки запросом в секундах
+        """
+        self.parser = parser
+        self.workers = max(1, workers)
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self.query_timeout = query_timeout
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "loads": 0, "errors": 0}
+
+        self.jobs: "queue.Queue[Optional[Tuple[str, Optional[str], Future]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, Optional[str]], Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, Optional[str]], Future] = {}
+        self._threads: List[threading.Thread] = []
+        self._started = time.time()
+
+    def start(self) -> None:
+        """Запускает загрузчики и ждет, пока каждый из них прогреется
+
+        Raises:
+            Exception: Ошибка запуска браузера или HTTP-клиента
+        """
+        parser = self.parser
+        # В режиме воспроизведения запросов к сайту нет
+        parser.budget = ThreadHostBudget(throttle=parser.throttle) if not parser.replay else None
+
+        started = time.perf_counter()
+        ready: List[Future] = []
+        for i in range(self.workers):
+            future: Future = Future()
+            thread = threading.Thread(target=self._worker_loop, args=(future,), name=f"elit-daemon-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+            ready.append(future)
+        try:
+            for future in ready:
+                future.result()
+        except Exception:
+            # Уже прогретые загрузчики закрываются, чтобы не оставлять запущенные браузеры
+            self.stop()
+            raise
+        print(f"Загрузчиков запущено: {self.workers} ({parser.fetch_backend}), "
+              f"за {time.perf_counter() - started:.1f} с")
+
+    def stop(self) -> None:
+        """Останавливает загрузчики и закрывает их браузеры"""
+        for _ in self._threads:
+            self.jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+        # Задания, которые не успели взять загрузчики, завершаются ошибкой
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                kind, item_id, future = job
+                self._finish((kind, item_id), future, None, RuntimeError("Демон остановлен"))
+        if self.parser.cache is not None:
+            self.parser.cache.close()
+            self.parser.cache = None
+
+    def query(self, kind: str, item_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Возвращает бренды, модели бренда или двигатели модели
+
+        Результат берется из кэша; если такая же загрузка уже выполняется,
+        запрос ждет ее результата вместо повторной загрузки.
+
+        Args:
+            kind (str): Тип запроса ('brands', 'models', 'engines')
+            item_id (Optional[str]): ID бренда для 'models' или ID модели для 'engines'
+
+        Returns:
+            List[Dict[str, Any]]: Записи в том же виде, что и в режимах парсера
+        """
+        key = (kind, item_id)
+        now = time.monotonic()
+        with self._lock:
+            self.stats["requests"] += 1
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > now:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return cached[1]
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+            else:
+                future = Future()
+                self._inflight[key] = future
+                self.jobs.put((kind, item_id, future))
+
+        try:
+            return future.result(timeout=self.query_timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"Загрузка не завершилась за {self.query_timeout:g} с")
+
+    def _create_fetcher(self) -> Fetcher:
+        """Создает загрузчик потока; бэкенд 'browser' получает собственный браузер"""
+        parser = self.parser
+        fetcher = create_fetcher(parser.fetch_backend, parser.CONTEXT_OPTIONS, parser.load_profile,
+                                 cache=parser.cache, replay=parser.replay, metrics=parser.metrics,
+                                 recycle=parser.recycle, memory=parser.memory)
+        if fetcher is None:
+            fetcher = BrowserFetcher(parser.CONTEXT_OPTIONS, parser.load_profile, parser.recycle, parser.memory)
+        return fetcher
+
+    def _worker_loop(self, ready: Future) -> None:
+        """Поток загрузчика: прогревает браузер и выполняет задания из очереди"""
+        try:
+            fetcher: Optional[Fetcher] = self._create_fetcher()
+        except Exception as e:
+            ready.set_exception(e)
+            return
+        try:
+            fetcher.start()
+        except Exception as e:
+            fetcher.close()
+            ready.set_exception(e)
+            return
+        ready.set_result(None)
+
+        try:
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    break
+                kind, item_id, future = job
+                if fetcher is None:
+                    try:
+                        fetcher = self._create_fetcher()
+                    except Exception as e:
+                        # Поток остается в работе: следующее задание снова попробует создать загрузчик
+                        print(f"Не удалось пересоздать загрузчик: {e}")
+                        self._finish((kind, item_id), future, None, e)
+                        continue
+                try:
+                    records, error = self._load(fetcher, kind, item_id), None
+                except Exception as e:
+                    records, error = None, e
+                    # После ошибки браузера (закрытая страница, сбой процесса) загрузчик пересоздается
+                    if not isinstance(e, FetchError):
+                        fetcher.close()
+                        fetcher = None
+                self._finish((kind, item_id), future, records, error)
+        finally:
+            if fetcher is not None:
+                fetcher.close()
+
+    def _load(self, fetcher: Fetcher, kind: str, item_id: Optional[str]) -> List[Dict[str, Any]]:
+        """Загружает и разбирает страницу, повторяя временные ошибки по политике парсера"""
+        parser = self.parser
+        if kind == "brands":
+            url, debug_name, context = parser.brands_url(), "brands_page", {}
+        elif kind == "models":
+            url, debug_name, context = parser.models_url(item_id), f"models_{item_id}", {"brand_id": item_id}
+        else:
+            url, debug_name, context = parser.engines_url(item_id), f"engines_{item_id}", {}
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                if parser.budget is not None:
+                    parser.budget.acquire(url)
+                parser.retry.record_request()
+                started = time.perf_counter()
+                with parser.metrics.stage(f"load_{kind}"):
+                    content = fetcher.fetch(url, kind, **context)
+                break
+            except Exception as e:
+                parser.artifacts.error(debug_name, e)
+                delay = parser.retry_after_error(url, attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+        parser.throttle.on_success(time.perf_counter() - started)
+        parser.metrics.count("pages")
+        with self._lock:
+            self.stats["loads"] += 1
+
+        if kind == "brands":
+            return parser.extract_brands(content, debug_name)
+        if kind == "models":
+            return parser.extract_models(content, item_id, item_id, debug_name)
+        return parser.extract_engines(content, item_id, debug_name)
+
+    def _finish(self, key: Tuple[str, Optional[str]], future: Future,
+                records: Optional[List[Dict[str, Any]]], error: Optional[BaseException]) -> None:
+        """Передает результат загрузки всем ожидающим запросам и сохраняет его в кэше"""
+        with self._lock:
+            self._inflight.pop(key, None)
+            if error is not None:
+                self.stats["errors"] += 1
+            elif self.ttl > 0:
+                self._cache[key] = (time.monotonic() + self.ttl, records)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(records)
+
+    def summary(self) -> Dict[str, Any]:
+        """Возвращает состояние демона: счетчики запросов, размер кэша, частоту запросов, память"""
+        with self._lock:
+            stats = dict(self.stats)
+            cached = len(self._cache)
+            inflight = len(self._inflight)
+        return {
+            "uptime_seconds": round(time.time() - self._started, 1),
+            "workers": self.workers,
+            "fetch_backend": self.parser.fetch_backend,
+            "queued": self.jobs.qsize(),
+            "inflight": inflight,
+            "cached": cached,
+            "stats": stats,
+            "throttle": self.parser.throttle.summary(),
+            "retry": self.parser.retry.summary(),
+            "memory": self.parser.memory.summary()
+        }
+
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    """Обработчик HTTP API: /brands, /models?brand_id=, /engines?model_id=, /health, /metrics"""
+
+    # Устанавливается в serve()
+    daemon: ParserDaemon
+
+    def do_GET(self) -> None:
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip("/") or "/"
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+
+        if path == "/health":
+            self._send_json(200, self.daemon.summary())
+            return
+        if path == "/metrics":
+            body = CrawlMetrics.prometheus(self.daemon.parser.metrics.summary()).encode("utf-8")
+            self._send(200, body, "text/plain; version=0.0.4; charset=utf-8")
+            return
+
+        kind = path.lstrip("/")
+        if kind not in QUERY_KINDS:
+            self._send_json(404, {"error": f"Неизвестный путь: {path}"})
+            return
+
+        id_param = QUERY_KINDS[kind]
+        item_id = params.get(id_param) if id_param else None
+        if id_param and not item_id:
+            self._send_json(400, {"error": f"Не указан параметр {id_param}"})
+            return
+        try:
+            limit = int(params["limit"]) if params.get("limit") else None
+        except ValueError:
+            self._send_json(400, {"error": "Параметр limit должен быть целым числом"})
+            return
+
+        try:
+            records = self.daemon.query(kind, item_id)
+        except TimeoutError as e:
+            self._send_json(504, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(502, {"error": f"Ошибка загрузки: {e}"})
+            return
+        self._send_json(200, {kind: records[:limit] if limit is not None else records})
+
+    def _send_json(self, status: int, data: Dict[str, Any]) -> None:
+        self._send(status, json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # У клиентов Unix-сокета нет адреса
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    """HTTP-сервер на Unix-сокете"""
+
+    address_family = socket.AF_UNIX
+    daemon_threads = True
+
+    def server_bind(self) -> None:
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+def create_server(daemon: ParserDaemon, host: str = "127.0.0.1", port: int = 8765,
+                  socket_path: Optional[str] = None) -> HTTPServer:
+    """Создает HTTP-сервер API демона
+
+    Args:
+        daemon (ParserDaemon): Запущенный демон
+        host (str): Адрес для HTTP
+        port (int): Порт для HTTP
+        socket_path (Optional[str]): Путь к Unix-сокету (если задан, HTTP-порт не открывается)
+
+    Returns:
+        HTTPServer: Сервер, готовый к serve_forever()
+    """
+    handler = type("BoundDaemonRequestHandler", (DaemonRequestHandler,), {"daemon": daemon})
+    if socket_path:
+        # Сокет, оставшийся от предыдущего запуска, мешает привязке
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        return UnixHTTPServer(socket_path, handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def _terminate(signum: int, frame: Any) -> None:
+    """Останавливает демон по SIGTERM так же, как по Ctrl+C"""
+    raise KeyboardInterrupt
+
+
+def main():
+    """Запуск демона из командной строки"""
+    default = urlsplit(DEFAULT_DAEMON_ADDRESS)
+    parser = argparse.ArgumentParser(description="Демон парсера elit.ro: бренды, модели и двигатели по запросу")
+    parser.add_argument("--host", default=default.hostname, help="Адрес HTTP API")
+    parser.add_argument("--port", type=int, default=default.port, help="Порт HTTP API")
+    parser.add_argument("--socket", help="Путь к Unix-сокету (вместо HTTP-порта)")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="Количество прогретых загрузчиков (браузеров или HTTP-клиентов)")
+    parser.add_argument("--ttl", type=float, default=300,
+                        help="Время хранения результатов в кэше в секундах (0 - без кэша)")
+    parser.add_argument("--cache-size", type=int, default=1024, help="Максимальное количество результатов в кэше")
+    parser.add_argument("--query-timeout", type=float, default=120,
+                        help="Время ожидания результата загрузки запросом в секундах")
+    parser.add_argument("--output", default="elit_daemon",
+                        help="Префикс файлов метрик и отчетов (<output>.metrics.json, <output>.prom)")
+    parser.add_argument("--max-brands", type=int, default=100, help="Максимальное количество брендов в ответе")
+    parser.add_argument("--max-models", type=int, default=20, help="Максимальное количество моделей в ответе")
+    parser.add_argument("--max-engines", type=int, default=50, help="Максимальное количество двигателей в ответе")
+    add_crawl_arguments(parser)
+    args = parser.parse_args()
+
+    elit_parser = ElitRoParser(args.output, max_brands=args.max_brands, max_models=args.max_models,
+                               max_engines=args.max_engines, **crawl_options(args))
+    daemon = ParserDaemon(elit_parser, workers=args.workers, ttl=args.ttl, cache_size=args.cache_size,
+                          query_timeout=args.query_timeout)
+    daemon.start()
+
+    server = create_server(daemon, args.host, args.port, args.socket)
+    address = f"unix:{args.socket}" if args.socket else f"http://{args.host}:{args.port}"
+    print(f"Демон парсера слушает {address}")
+
+    signal.signal(signal.SIGTERM, _terminate)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Остановка демона...")
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+        daemon.stop()
+        elit_parser.artifacts.close()
+        print(f"Статистика демона: {daemon.summary()['stats']}")
+        elit_parser.report_failures()
+        elit_parser.report_memory()
+        elit_parser.report_metrics()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Слой загрузки страниц elit.ro.
+Страницы каталога в основном формируются на сервере, поэтому их можно получать
+обычным HTTP-клиентом с пулом keep-alive соединений, а браузер Playwright
+запускать только для тех URL, где в ответе нет ожидаемых ссылок или таблиц.
+"""
+
+import re
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from elit_cache import CacheEntry, PageCache
+from elit_load_profile import FullLoadProfile
+from elit_memory import BrowserSession, MemoryMonitor, RecyclePolicy
+from elit_metrics import DISABLED_METRICS, CrawlMetrics
+
+# Допустимые значения параметра fetch_backend
+FETCH_BACKENDS = ("browser", "http", "auto")
+
+# Признаки заполненных страниц каталога
+_BRAND_LINK_RE = re.compile(r"""href=["'][^"']*autoturism-identificare-vehicul-""", re.IGNORECASE)
+_TABLE_RE = re.compile(r"<table\b", re.IGNORECASE)
+_ENGINE_HEADER_RE = re.compile(r"<th\b[^>]*>[^<]*(kw|hp|ccm|motor|tip|cilindri|carburant)", re.IGNORECASE)
+
+
+class FetchError(RuntimeError):
+    """Ошибка загрузки страницы"""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        """Инициализация ошибки
+
+        Args:
+            message (str): Описание ошибки
+            status (Optional[int]): Код ответа HTTP, если ответ был получен
+            retry_after (Optional[float]): Задержка перед повтором из заголовка Retry-After в секундах
+        """
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class PageIncomplete(FetchError):
+    """Страница загружена, но в ней нет ожидаемого содержимого"""
+
+
+class FetchResult(NamedTuple):
+    """Результат загрузки страницы с учетом условного запроса"""
+    content: Optional[str]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
+
+def is_complete(kind: str, content: str, brand_id: Optional[str] = None) -> bool:
+    """Проверяет, что в HTML-коде есть данные, нужные парсеру страницы данного типа
+
+    Args:
+        kind (str): Тип страницы ('brands', 'models', 'engines')
+        content (str): HTML-код страницы
+        brand_id (Optional[str]): ID бренда для страницы моделей
+
+    Returns:
+        bool: True, если страницу можно разбирать без браузера
+    """
+    if kind == "brands":
+        return bool(_BRAND_LINK_RE.search(content))
+    if kind == "models":
+        marker = f"autoturism-identificare-vehicul-{brand_id}-" if brand_id else "autoturism-identificare-vehicul-"
+        return bool(_TABLE_RE.search(content)) and marker in content
+    if kind == "engines":
+        return bool(_ENGINE_HEADER_RE.search(content))
+    return True
+
+
+class Fetcher:
+    """Базовый класс загрузчика страниц"""
+
+    name = "base"
+
+    def fetch(self, url: str, kind: str, **context: Any) -> str:
+        """Загружает страницу и возвращает ее HTML-код
+
+        Args:
+            url (str): URL страницы
+            kind (str): Тип страницы ('brands', 'models', 'engines')
+            **context: Дополнительные данные для проверки страницы (например, brand_id)
+
+        Returns:
+            str: HTML-код страницы
+        """
+        raise NotImplementedError
+
+    def fetch_conditional(self, url: str, kind: str, etag: Optional[str] = None,
+                          last_modified: Optional[str] = None, **context: Any) -> FetchResult:
+        """Загружает страницу, если она изменилась с момента предыдущей загрузки
+
+        Загрузчики без поддержки условных запросов всегда загружают страницу заново.
+
+        Args:
+            url (str): URL страницы
+            kind (str): Тип страницы ('brands', 'models', 'engines')
+            etag (Optional[str]): ETag сохраненной копии
+            last_modified (Optional[str]): Last-Modified сохраненной копии
+            **context: Дополнительные данные для проверки страницы
+
+        Returns:
+            FetchResult: Новое содержимое или признак not_modified
+        """
+        return FetchResult(self.fetch(url, kind, **context))
+
+    def start(self) -> None:
+        """Заранее готовит загрузчик к работе (например, запускает браузер), чтобы первый запрос не ждал"""
+
+    def close(self) -> None:
+        """Освобождает ресурсы загрузчика"""
+
+
+class HttpFetcher(Fetcher):
+    """Загрузка страниц HTTP-клиентом с пулом keep-alive соединений"""
+
+    name = "http"
+
+    def __init__(self, user_agent: str, locale: str = "ro-RO", pool_size: int = 10,
+                 timeout: float = 30.0, validate: bool = True):
+        """Инициализация HTTP-загрузчика
+
+        Args:
+            user_agent (str): Заголовок User-Agent
+            locale (str): Язык для заголовка Accept-Language
+            pool_size (int): Максимальное количество соединений с одним хостом
+            timeout (float): Таймаут запроса в секундах
+            validate (bool): Проверять ли наличие ожидаемых ссылок и таблиц в ответе
+        """
+        # requests загружается только для HTTP-клиента: запуски с браузером и --help его не ждут
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self.validate = validate
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": user_agent,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": f"{locale},{locale.split('-')[0]};q=0.9",
+        })
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch(self, url: str, kind: str, **context: Any) -> str:
+        return self.fetch_conditional(url, kind, **context).content
+
+    def fetch_conditional(self, url: str, kind: str, etag: Optional[str] = None,
+                          last_modified: Optional[str] = None, **context: Any) -> FetchResult:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        import requests
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise FetchError(f"Ошибка HTTP-запроса {url}: {e}") from e
+
+        if response.status_code == 304:
+            return FetchResult(None, etag, last_modified, not_modified=True)
+
+        if response.status_code >= 400:
+            retry_after = response.headers.get("Retry-After", "")
+            raise FetchError(f"HTTP {response.status_code} для {url}", status=response.status_code,
+                             retry_after=float(retry_after) if retry_after.isdigit() else None)
+
+        # Сайт не всегда указывает кодировку, а страницы в UTF-8
+        if "charset" not in response.headers.get("Content-Type", "").lower():
+            response.encoding = "utf-8"
+        content = response.text
+
+        if self.validate and not is_complete(kind, content, context.get("brand_id")):
+            raise PageIncomplete(f"На странице {url} нет данных без выполнения скриптов")
+
+        return FetchResult(content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class BrowserFetcher(Fetcher):
+    """Загрузка страниц браузером Playwright; браузер запускается при первом обращении"""
+
+    name = "browser"
+
+    def __init__(self, context_options: Dict[str, Any], load_profile: Optional[FullLoadProfile] = None,
+                 recycle: Optional[RecyclePolicy] = None, memory: Optional[MemoryMonitor] = None):
+        """Инициализация загрузчика
+
+        Args:
+            context_options (Dict[str, Any]): Параметры контекста браузера
+            load_profile (Optional[FullLoadProfile]): Профиль загрузки страниц
+            recycle (Optional[RecyclePolicy]): Правила переработки страницы и браузера
+            memory (Optional[MemoryMonitor]): Монитор памяти браузера
+        """
+        self.context_options = context_options
+        self.load_profile = load_profile or FullLoadProfile()
+        self.session = BrowserSession(context_options, self.load_profile, recycle, memory)
+        self._started = False
+
+    def _ensure_page(self):
+        """Запускает браузер и открывает страницу, если это еще не сделано"""
+        if not self._started:
+            print("Запуск браузера для загрузки страниц...")
+            self._started = True
+        return self.session.page
+
+    def start(self) -> None:
+        self._ensure_page()
+
+    def fetch(self, url: str, kind: str, **context: Any) -> str:
+        page = self._ensure_page()
+        self.load_profile.navigate(page, url, kind, **context)
+        with self.load_profile.metrics.stage("content"):
+            content = page.content()
+        self.session.navigated()
+        return content
+
+    def close(self) -> None:
+        self.session.close()
+        self._started = False
+
+
+class FallbackFetcher(Fetcher):
+    """Загрузка основным загрузчиком с переходом на резервный для отдельных URL
+
+    На резервный загрузчик переходим только при неполной странице (PageIncomplete).
+    Остальные ошибки загрузки пробрасываются, чтобы их видели повторы и регулятор частоты.
+    """
+
+    name = "auto"
+
+    def __init__(self, primary: Fetcher, fallback: Fetcher, metrics: Optional[CrawlMetrics] = None):
+        """Инициализация загрузчика
+
+        Args:
+            primary (Fetcher): Основной загрузчик
+            fallback (Fetcher): Резервный загрузчик
+            metrics (Optional[CrawlMetrics]): Метрики обхода (переход на резервный загрузчик - повтор)
+        """
+        self.primary = primary
+        self.fallback = fallback
+        self.metrics = metrics or DISABLED_METRICS
+        self.stats = {primary.name: 0, fallback.name: 0}
+
+    def fetch(self, url: str, kind: str, **context: Any) -> str:
+        try:
+            content = self.primary.fetch(url, kind, **context)
+            self.stats[self.primary.name] += 1
+            return content
+        except PageIncomplete as e:
+            print(f"{e}; переход на загрузчик '{self.fallback.name}'")
+            self.metrics.count("retries")
+
+        content = self.fallback.fetch(url, kind, **context)
+        self.stats[self.fallback.name] += 1
+        return content
+
+    def fetch_conditional(self, url: str, kind: str, etag: Optional[str] = None,
+                          last_modified: Optional[str] = None, **context: Any) -> FetchResult:
+        try:
+            result = self.primary.fetch_conditional(url, kind, etag, last_modified, **context)
+            self.stats[self.primary.name] += 1
+            return result
+        except PageIncomplete as e:
+            print(f"{e}; переход на загрузчик '{self.fallback.name}'")
+            self.metrics.count("retries")
+
+        result = self.fallback.fetch_conditional(url, kind, etag, last_modified, **context)
+        self.stats[self.fallback.name] += 1
+        return result
+
+    def start(self) -> None:
+        self.primary.start()
+        self.fallback.start()
+
+    def close(self) -> None:
+        self.primary.close()
+        self.fallback.close()
+
+
+class CachingFetcher(Fetcher):
+    """Загрузка страниц через дисковый кэш; в режиме воспроизведения сеть не используется"""
+
+    name = "cache"
+
+    def __init__(self, inner: Optional[Fetcher], cache: PageCache, replay: bool = False):
+        """Инициализация загрузчика
+
+        Args:
+            inner (Optional[Fetcher]): Загрузчик для страниц, которых нет в кэше (None в режиме воспроизведения)
+            cache (PageCache): Кэш страниц
+            replay (bool): Брать страницы только из кэша, независимо от срока жизни
+        """
+        self.inner = inner
+        self.cache = cache
+        self.replay = replay
+        self.stats = getattr(inner, "stats", {})
+
+    def fetch(self, url: str, kind: str, **context: Any) -> str:
+        content, entry = self.lookup(url)
+        if content is not None:
+            return content
+        return self.refresh(url, kind, entry, **context)
+
+    def lookup(self, url: str) -> Tuple[Optional[str], Optional[CacheEntry]]:
+        """Ищет страницу в кэше, не обращаясь к сети
+
+        Args:
+            url (str): URL страницы
+
+        Returns:
+            Tuple[Optional[str], Optional[CacheEntry]]: HTML-код, если копию можно отдать без загрузки,
+                и запись кэша для условного запроса в refresh()
+        """
+        entry = self.cache.get(url)
+        if entry is not None and (entry.fresh or self.replay):
+            return entry.content, entry
+        return None, entry
+
+    def refresh(self, url: str, kind: str, entry: Optional[CacheEntry], **context: Any) -> str:
+        """Загружает страницу из сети (условным запросом, если есть устаревшая копия) и сохраняет ее в кэш
+
+        Args:
+            url (str): URL страницы
+            kind (str): Тип страницы ('brands', 'models', 'engines')
+            entry (Optional[CacheEntry]): Запись кэша, полученная от lookup()
+            **context: Дополнительные данные для проверки страницы
+
+        Returns:
+            str: HTML-код страницы
+        """
+        if self.replay or self.inner is None:
+            raise FetchError(f"Страницы нет в кэше (режим воспроизведения): {url}")
+
+        if entry is not None:
+            result = self.inner.fetch_conditional(url, kind, entry.etag, entry.last_modified, **context)
+            if result.not_modified:
+                self.cache.touch(url)
+                return entry.content
+        else:
+            result = self.inner.fetch_conditional(url, kind, **context)
+
+        self.cache.put(url, result.content, result.etag, result.last_modified)
+        return result.content
+
+    def start(self) -> None:
+        if self.inner is not None:
+            self.inner.start()
+
+    def close(self) -> None:
+        if self.inner is not None:
+            self.inner.close()
+
+
+def create_fetcher(backend: str, context_options: Dict[str, Any],
+                   load_profile: Optional[FullLoadProfile] = None,
+                   cache: Optional[PageCache] = None, replay: bool = False,
+                   metrics: Optional[CrawlMetrics] = None, recycle: Optional[RecyclePolicy] = None,
+                   memory: Optional[MemoryMonitor] = None) -> Optional[Fetcher]:
+    """Создает загрузчик страниц для указанного бэкенда
+
+    Args:
+        backend (str): 'browser' - только Playwright (без кэша возвращается None, страницу передает парсер),
+            'http' - только HTTP-клиент, 'auto' - HTTP-клиент с переходом на Playwright
+        context_options (Dict[str, Any]): Параметры контекста браузера
+        load_profile (Optional[FullLoadProfile]): Профиль загрузки страниц для резервного браузера
+        cache (Optional[PageCache]): Кэш страниц
+        replay (bool): Брать страницы только из кэша, без обращения к сети
+        metrics (Optional[CrawlMetrics]): Метрики обхода
+        recycle (Optional[RecyclePolicy]): Правила переработки страницы и браузера
+        memory (Optional[MemoryMonitor]): Монитор памяти браузера
+
+    Returns:
+        Optional[Fetcher]: Загрузчик страниц
+    """
+    if backend not in FETCH_BACKENDS:
+        raise ValueError(f"Неизвестный бэкенд загрузки: {backend}")
+
+    if replay:
+        if cache is None:
+            raise ValueError("Для режима воспроизведения нужен кэш страниц")
+        return CachingFetcher(None, cache, replay=True)
+
+    user_agent = context_options["user_agent"]
+    locale = context_options.get("locale", "ro-RO")
+
+    if backend == "browser":
+        # С кэшем браузер запускается только для страниц, которых нет в кэше
+        fetcher = BrowserFetcher(context_options, load_profile, recycle, memory) if cache is not None else None
+    elif backend == "http":
+        fetcher = HttpFetcher(user_agent, locale, validate=False)
+    else:
+        fetcher = FallbackFetcher(HttpFetcher(user_agent, locale),
+                                  BrowserFetcher(context_options, load_profile, recycle, memory), metrics=metrics)
+
+    if cache is not None:
+        return CachingFetcher(fetcher, cache)
+    return fetcher
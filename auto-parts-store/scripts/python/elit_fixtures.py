@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Фикстуры страниц elit.ro для офлайн-прогонов парсера.
+Источники: сохраненные страницы из debug_output, дополнительные файлы из
+bench_fixtures и синтетические страницы заданного размера. FixturePage
+заменяет страницу Playwright и отдает HTML по URL без браузера и сети.
+"""
+
+import random
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from elit_parser import ElitRoParser
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DEBUG_DIR = SCRIPT_DIR / "debug_output"
+
+# Дополнительные фикстуры: brands__<имя>.html, models__<brand_id>__<имя>.html, engines__<имя>.html
+FIXTURES_DIR = SCRIPT_DIR / "bench_fixtures"
+
+_FUEL_TYPES = ("Benzina", "Diesel", "Benzina/Gaz", "Hibrid")
+_ENGINE_NAMES = ("1.4 TSI", "1.6 MPI", "1.9 TDI", "2.0 TDI", "2.0 TFSI", "1.5 dCi", "1.6 HDi", "3.0 V6")
+
+
+class Fixture(NamedTuple):
+    """Страница для офлайн-прогона"""
+    name: str
+    kind: str
+    content: str
+    brand_id: Optional[str] = None
+
+
+def synthetic_brands_page(count: int) -> str:
+    """Генерирует страницу брендов со ссылками в формате каталога
+
+    Args:
+        count (int): Количество брендов
+
+    Returns:
+        str: HTML-код страницы
+    """
+    items = "".join(
+        f'<div class="catalog-car-item"><a class="catalog-car-item-link" '
+        f'href="/Catalog/autoturism-identificare-vehicul-brand{i}/39849642;39850140;{1000 + i}">'
+        f"BRAND{i} </a></div>\n"
+        for i in range(count)
+    )
+    return f'<html><body><div class="catalog-car-container">\n{items}</div></body></html>'
+
+
+def synthetic_models_page(brand_id: str, count: int, model_prefix: str = "model") -> str:
+    """Генерирует страницу моделей бренда с таблицей моделей
+
+    Args:
+        brand_id (str): ID бренда
+        count (int): Количество моделей
+        model_prefix (str): Начало ID моделей (ID модели - model_prefix и номер)
+
+    Returns:
+        str: HTML-код страницы
+    """
+    rows = []
+    for i in range(count):
+        start = 1990 + i % 25
+        rows.append(
+            f'<tr><td><a href="/Catalog/autoturism-identificare-vehicul-{brand_id}-{model_prefix}{i}/39849642;{2000 + i}">'
+            f"Model {i} ({i % 12 + 1:02d}/{start % 100:02d}-{(i + 5) % 12 + 1:02d}/{(start + 7) % 100:02d})</a></td>"
+            f"<td>Sedan</td></tr>\n"
+        )
+    return f"<html><body><table><tr><th>Model</th><th>Caroserie</th></tr>\n{''.join(rows)}</table></body></html>"
+
+
+def synthetic_engines_page(count: int, seed: int = 0) -> str:
+    """Генерирует страницу двигателей модели с таблицей kW/HP/ccm
+
+    Args:
+        count (int): Количество строк таблицы
+        seed (int): Начальное значение генератора случайных чисел
+
+    Returns:
+        str: HTML-код страницы
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        name = rng.choice(_ENGINE_NAMES)
+        kw = rng.randint(40, 250)
+        start = rng.randint(1990, 2020)
+        end = "-" if rng.random() < 0.3 else f"{rng.randint(1, 12):02d}/{(start + rng.randint(1, 10)) % 100:02d}"
+        rows.append(
+            f"<tr><td>{name}</td><td>{rng.randint(1, 12):02d}/{start % 100:02d} - {end}</td>"
+            f"<td>{kw}</td><td>{round(kw * 1.36)}</td><td>{name.split()[0]}</td><td>{rng.choice((3, 4, 6))}</td>"
+            f"<td>{rng.choice(_FUEL_TYPES)}</td><td>CODE{i:05d}</td></tr>\n"
+        )
+    header = ("<tr><th>Tip motor</th><th>An</th><th>kW</th><th>HP</th><th>ccm</th>"
+              "<th>Cilindri</th><th>Carburant</th><th>Cod motor</th></tr>\n")
+    return f"<html><body><table>{header}{''.join(rows)}</table></body></html>"
+
+
+def load_fixtures(include_debug: bool = True, fixtures_dir: Path = FIXTURES_DIR) -> List[Fixture]:
+    """Собирает фикстуры из сохраненных страниц
+
+    Из debug_output берется страница брендов, а страницы поиска search_<БРЕНД>.html
+    используются как страницы моделей (на них нет таблиц, поэтому проверяется
+    путь поиска ссылок по всему документу).
+
+    Args:
+        include_debug (bool): Включать страницы из debug_output
+        fixtures_dir (Path): Каталог дополнительных фикстур
+
+    Returns:
+        List[Fixture]: Список фикстур
+    """
+    fixtures = []
+
+    if include_debug and DEBUG_DIR.exists():
+        brands_page = DEBUG_DIR / "brands_page.html"
+        if brands_page.exists():
+            fixtures.append(Fixture("brands_page", "brands", brands_page.read_text(encoding="utf-8")))
+        for path in sorted(DEBUG_DIR.glob("search_*.html")):
+            brand_id = path.stem[len("search_"):].lower()
+            fixtures.append(Fixture(path.stem, "models", path.read_text(encoding="utf-8"), brand_id))
+
+    if fixtures_dir.exists():
+        for path in sorted(fixtures_dir.glob("*.html")):
+            parts = path.stem.split("__")
+            kind = parts[0]
+            if kind == "models" and len(parts) >= 3:
+                fixtures.append(Fixture(path.stem, kind, path.read_text(encoding="utf-8"), parts[1]))
+            elif kind in ("brands", "engines"):
+                fixtures.append(Fixture(path.stem, kind, path.read_text(encoding="utf-8")))
+            else:
+                print(f"Пропущен файл фикстуры с неизвестным типом: {path.name}")
+
+    return fixtures
+
+
+def synthetic_fixtures(brands: int = 0, models: int = 0, engines: int = 0) -> List[Fixture]:
+    """Создает синтетические фикстуры заданного размера (0 - не создавать)
+
+    Args:
+        brands (int): Количество брендов на странице брендов
+        models (int): Количество моделей на странице моделей
+        engines (int): Количество строк в таблице двигателей
+
+    Returns:
+        List[Fixture]: Список фикстур
+    """
+    fixtures = []
+    if brands:
+        fixtures.append(Fixture(f"synthetic_brands_{brands}", "brands", synthetic_brands_page(brands)))
+    if models:
+        fixtures.append(Fixture(f"synthetic_models_{models}", "models",
+                                synthetic_models_page("brand0", models), "brand0"))
+    if engines:
+        fixtures.append(Fixture(f"synthetic_engines_{engines}", "engines", synthetic_engines_page(engines)))
+    return fixtures
+
+
+class FixturePage:
+    """Заглушка страницы Playwright: отдает HTML по URL из словаря"""
+
+    def __init__(self, pages: Dict[str, str]):
+        """Инициализация страницы
+
+        Args:
+            pages (Dict[str, str]): HTML-код страниц по URL
+        """
+        self.pages = pages
+        self.url: Optional[str] = None
+        self.navigations = 0
+
+    def goto(self, url: str, **kwargs: Any) -> None:
+        if url not in self.pages:
+            raise KeyError(f"Нет фикстуры для URL: {url}")
+        self.url = url
+        self.navigations += 1
+
+    def wait_for_load_state(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def wait_for_selector(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def wait_for_function(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def route(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def screenshot(self, **kwargs: Any) -> None:
+        pass
+
+    def content(self) -> str:
+        return self.pages[self.url]
+
+
+def fixture_page(parser: "ElitRoParser", fixture: Fixture) -> FixturePage:
+    """Создает заглушку страницы, отдающую фикстуру по URL нужного типа
+
+    Args:
+        parser (ElitRoParser): Парсер, формирующий URL страниц
+        fixture (Fixture): Фикстура
+
+    Returns:
+        FixturePage: Заглушка страницы
+    """
+    if fixture.kind == "brands":
+        url = parser.brands_url()
+    elif fixture.kind == "models":
+        url = parser.models_url(fixture.brand_id)
+    else:
+        url = parser.engines_url("bench")
+    return FixturePage({url: fixture.content})
+
+
+def parse_fixture(parser: "ElitRoParser", page: FixturePage, fixture: Fixture) -> List[Dict[str, Any]]:
+    """Разбирает фикстуру методом parse_* нужного типа
+
+    Args:
+        parser (ElitRoParser): Парсер
+        page (FixturePage): Заглушка страницы из fixture_page()
+        fixture (Fixture): Фикстура
+
+    Returns:
+        List[Dict[str, Any]]: Полученные записи
+    """
+    if fixture.kind == "brands":
+        return parser.parse_brands(page)
+    if fixture.kind == "models":
+        return parser.parse_models(page, fixture.brand_id, fixture.brand_id)
+    return parser.parse_engines(page, "bench", "bench", fixture.name)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Граница обхода (frontier) сайта elit.ro.
+URL каталога приводятся к каноническому виду и индексируются по 64-битному
+хешу, поэтому страница, на которую ссылаются несколько строк таблицы или
+несколько брендов, загружается за запуск один раз, а повторы получают уже
+разобранный результат. Множество загруженных URL с временем последней
+загрузки может сохраняться в SQLite между запусками.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlencode, urljoin, urlsplit, urlunsplit
+
+from elit_parsers import LINK_MARKER
+
+DEFAULT_BASE_URL = "https://www.elit.ro"
+
+# Параметры запроса, не влияющие на содержимое страницы
+_TRACKING_PARAMS = ("utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "gclid", "fbclid")
+
+
+def canonicalize_url(url: str, base_url: str = DEFAULT_BASE_URL) -> str:
+    """Приводит URL к каноническому виду для сравнения
+
+    Относительный адрес дополняется базовым, схема и хост приводятся к нижнему
+    регистру (без 'www.' и стандартного порта), фрагмент и метки отслеживания
+    удаляются, параметры сортируются, '%3B' раскодируется, повторные и
+    завершающие '/' убираются. Путь страниц каталога
+    (autoturism-identificare-vehicul-*) приводится к нижнему регистру.
+
+    Args:
+        url (str): Исходный URL
+        base_url (str): Базовый URL сайта для относительных адресов
+
+    Returns:
+        str: Канонический URL
+    """
+    parts = urlsplit(urljoin(base_url + "/", url.strip()))
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and not (scheme == "http" and parts.port == 80 or scheme == "https" and parts.port == 443):
+        host = f"{host}:{parts.port}"
+    if scheme == "http":
+        scheme = "https"
+
+    path = unquote(parts.path)
+    while "//" in path:
+        path = path.replace("//", "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+    if LINK_MARKER in path.lower():
+        path = path.lower()
+
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                             if key.lower() not in _TRACKING_PARAMS))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def url_key(canonical_url: str) -> int:
+    """Возвращает 64-битный ключ канонического URL (целое со знаком для SQLite)"""
+    digest = hashlib.blake2b(canonical_url.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class UrlFrontier:
+    """Множество URL, запланированных в текущем запуске, и результаты их разбора"""
+
+    def __init__(self, path: Optional[str] = None, base_url: str = DEFAULT_BASE_URL):
+        """Инициализация границы обхода
+
+        Args:
+            path (Optional[str]): Файл SQLite для сохранения загруженных URL между запусками
+                (None - только в памяти)
+            base_url (str): Базовый URL сайта для относительных адресов
+        """
+        self.path = path
+        self.base_url = base_url
+        self.stats = {"scheduled": 0, "duplicates": 0, "known": 0, "fetched": 0}
+
+        self._lock = threading.Lock()
+        self._claimed: Dict[int, str] = {}
+        self._results: Dict[int, Any] = {}
+        self._fetched: Dict[int, Tuple[str, str, float]] = {}
+        self._previous: Dict[int, float] = {}
+        self._db: Optional[sqlite3.Connection] = None
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS urls (
+                    key INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    kind TEXT,
+                    first_fetch REAL NOT NULL,
+                    last_fetch REAL NOT NULL,
+                    fetches INTEGER NOT NULL DEFAULT 1
+                )
+            """)
+            self._db.commit()
+            self._previous = dict(self._db.execute("SELECT key, last_fetch FROM urls"))
+
+    def key(self, url: str) -> int:
+        """Возвращает ключ URL в хеш-индексе"""
+        return url_key(canonicalize_url(url, self.base_url))
+
+    def claim(self, url: str) -> bool:
+        """Планирует загрузку URL
+
+        Args:
+            url (str): URL страницы
+
+        Returns:
+            bool: True, если URL в этом запуске еще не планировался (страницу нужно загрузить);
+                False для повтора - его результат берется через result()
+        """
+        key = self.key(url)
+        with self._lock:
+            if key in self._claimed:
+                self.stats["duplicates"] += 1
+                return False
+            self._claimed[key] = url
+            self.stats["scheduled"] += 1
+            if key in self._previous:
+                self.stats["known"] += 1
+            return True
+
+    def release(self, url: str) -> None:
+        """Снимает планирование URL после неудачной загрузки, чтобы повтор загрузил страницу снова"""
+        key = self.key(url)
+        with self._lock:
+            if self._claimed.pop(key, None) is not None:
+                self.stats["scheduled"] -= 1
+
+    def complete(self, url: str, kind: str, result: Any) -> None:
+        """Сохраняет результат разбора загруженной страницы
+
+        Args:
+            url (str): URL страницы
+            kind (str): Тип страницы ('brands', 'models', 'engines')
+            result (Any): Результат разбора для повторов
+        """
+        key = self.key(url)
+        with self._lock:
+            self._results[key] = result
+            self._fetched[key] = (canonicalize_url(url, self.base_url), kind, time.time())
+            self.stats["fetched"] += 1
+
+    def result(self, url: str) -> Optional[Any]:
+        """Возвращает сохраненный результат разбора URL или None"""
+        with self._lock:
+            return self._results.get(self.key(url))
+
+    def last_fetch(self, url: str) -> Optional[float]:
+        """Возвращает время последней загрузки URL (в этом или прошлых запусках) или None"""
+        key = self.key(url)
+        with self._lock:
+            if key in self._fetched:
+                return self._fetched[key][2]
+            return self._previous.get(key)
+
+    def summary(self) -> Dict[str, Any]:
+        """Возвращает статистику: запланировано, сэкономлено загрузок, известно по прошлым запускам"""
+        with self._lock:
+            return dict(self.stats, saved_navigations=self.stats["duplicates"])
+
+    def close(self) -> None:
+        """Сохраняет загруженные URL с временем загрузки и закрывает базу"""
+        if self._db is None:
+            return
+        with self._lock:
+            rows = [(key, url, kind, fetched_at, fetched_at) for key, (url, kind, fetched_at) in self._fetched.items()]
+            self._db.executemany("""
+                INSERT INTO urls (key, url, kind, first_fetch, last_fetch) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    last_fetch = excluded.last_fetch,
+                    fetches = urls.fetches + 1
+            """, rows)
+            self._db.commit()
+            self._db.close()
+            self._db = None
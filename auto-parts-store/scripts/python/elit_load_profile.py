@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Профили загрузки страниц в браузере.
+Профиль 'full' повторяет исходное поведение (ожидание networkidle), профиль 'lean'
+блокирует картинки, медиа, шрифты, стили и сторонние счетчики и ждет только
+появления данных, нужных парсеру конкретной страницы.
+"""
+
+from typing import Any, Dict, Optional, TYPE_CHECKING
+from urllib.parse import urlparse
+
+from elit_metrics import DISABLED_METRICS, CrawlMetrics
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Page, Route
+    from playwright.async_api import Page as AsyncPage, Route as AsyncRoute
+
+# Допустимые значения параметра load_profile
+LOAD_PROFILES = ("full", "lean")
+
+# Типы ресурсов, которые не нужны для чтения ссылок и таблиц
+BLOCKED_RESOURCE_TYPES = ("image", "media", "font", "stylesheet")
+
+# Хосты счетчиков, рекламы и баннеров cookie, встречающиеся на elit.ro
+ANALYTICS_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googleadservices.com",
+    "facebook.com",
+    "facebook.net",
+    "cookielaw.org",
+    "onetrust.com",
+    "cookiepedia.co.uk",
+    "hotjar.com",
+)
+
+# Оценка среднего размера заблокированного ответа по типу ресурса (байт).
+# Заблокированный запрос не выполняется, поэтому его настоящий размер неизвестен.
+ESTIMATED_RESOURCE_BYTES = {
+    "image": 30_000,
+    "media": 250_000,
+    "font": 40_000,
+    "stylesheet": 25_000,
+    "script": 60_000,
+}
+DEFAULT_ESTIMATED_BYTES = 5_000
+
+# JS-условие готовности страницы двигателей: таблица с заголовками kw/hp/ccm
+_ENGINE_TABLE_READY_JS = """
+() => Array.from(document.querySelectorAll('table th'))
+    .some(th => /kw|hp|ccm/i.test(th.textContent))
+"""
+
+
+class PageLoadStats:
+    """Статистика заблокированных запросов одной страницы"""
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self.by_type: Dict[str, int] = {}
+
+    def add(self, resource_type: str, estimated_bytes: int) -> None:
+        """Учитывает заблокированный запрос
+
+        Args:
+            resource_type (str): Тип ресурса
+            estimated_bytes (int): Оценка размера ответа
+        """
+        self.requests += 1
+        self.bytes += estimated_bytes
+        self.by_type[resource_type] = self.by_type.get(resource_type, 0) + 1
+
+
+class FullLoadProfile:
+    """Исходный профиль загрузки: переход на страницу и ожидание networkidle"""
+
+    name = "full"
+
+    # Метрики времени перехода и ожидания; парсер подставляет свои
+    metrics: CrawlMetrics = DISABLED_METRICS
+
+    def attach(self, page: "Page") -> None:
+        """Подготавливает страницу браузера к работе с профилем
+
+        Args:
+            page (Page): Объект страницы Playwright
+        """
+
+    async def attach_async(self, page: "AsyncPage") -> None:
+        """Асинхронный вариант attach()"""
+
+    def navigate(self, page: "Page", url: str, kind: str, **context: Any) -> None:
+        """Переходит на страницу и ждет готовности данных
+
+        Args:
+            page (Page): Объект страницы Playwright
+            url (str): URL страницы
+            kind (str): Тип страницы ('brands', 'models', 'engines')
+            **context: Данные для условия готовности (например, brand_id)
+        """
+        with self.metrics.stage("goto"):
+            page.goto(url)
+        with self.metrics.stage("wait"):
+            page.wait_for_load_state("networkidle")
+
+    async def navigate_async(self, page: "AsyncPage", url: str, kind: str, **context: Any) -> None:
+        """Асинхронный вариант navigate()"""
+        with self.metrics.stage("goto"):
+            await page.goto(url)
+        with self.metrics.stage("wait"):
+            await page.wait_for_load_state("networkidle")
+
+    def summary(self) -> Optional[Dict[str, Any]]:
+        """Возвращает сводку по сэкономленным запросам (None, если профиль ничего не блокирует)"""
+        return None
+
+
+class LeanLoadProfile(FullLoadProfile):
+    """Облегченный профиль: блокировка лишних ресурсов и точечное ожидание данных"""
+
+    name = "lean"
+
+    def __init__(self, ready_timeout: float = 15.0, site_host: str = "elit.ro"):
+        """Инициализация профиля
+
+        Args:
+            ready_timeout (float): Максимальное время ожидания данных на странице в секундах
+            site_host (str): Домен сайта; запросы к другим доменам из ANALYTICS_HOSTS блокируются
+        """
+        self.ready_timeout_ms = ready_timeout * 1000
+        self.site_host = site_host
+        self.total = PageLoadStats()
+        self.pages = 0
+        self._current: Dict[int, PageLoadStats] = {}
+
+    def _block_reason(self, resource_type: str, url: str) -> Optional[str]:
+        """Определяет, нужно ли блокировать запрос
+
+        Args:
+            resource_type (str): Тип ресурса
+            url (str): URL запроса
+
+        Returns:
+            Optional[str]: Категория блокировки или None, если запрос нужно пропустить
+        """
+        if resource_type in BLOCKED_RESOURCE_TYPES:
+            return resource_type
+
+        host = urlparse(url).hostname or ""
+        if not host.endswith(self.site_host) and any(host.endswith(h) for h in ANALYTICS_HOSTS):
+            return "analytics"
+
+        return None
+
+    def _record(self, page_key: int, reason: str, resource_type: str) -> None:
+        """Учитывает заблокированный запрос страницы
+
+        Args:
+            page_key (int): Ключ страницы браузера
+            reason (str): Категория блокировки
+            resource_type (str): Тип ресурса
+        """
+        estimated = ESTIMATED_RESOURCE_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+        self._current.setdefault(page_key, PageLoadStats()).add(reason, estimated)
+
+    def attach(self, page: "Page") -> None:
+        page_key = id(page)
+
+        def handle(route: "Route") -> None:
+            request = route.request
+            reason = self._block_reason(request.resource_type, request.url)
+            if reason:
+                self._record(page_key, reason, request.resource_type)
+                route.abort()
+            else:
+                route.continue_()
+
+        page.route("**/*", handle)
+
+    async def attach_async(self, page: "AsyncPage") -> None:
+        page_key = id(page)
+
+        async def handle(route: "AsyncRoute") -> None:
+            request = route.request
+            reason = self._block_reason(request.resource_type, request.url)
+            if reason:
+                self._record(page_key, reason, request.resource_type)
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await page.route("**/*", handle)
+
+    @staticmethod
+    def _ready_condition(kind: str, **context: Any) -> Dict[str, str]:
+        """Возвращает условие готовности страницы данного типа
+
+        Args:
+            kind (str): Тип страницы ('brands', 'models', 'engines')
+            **context: Данные для условия (например, brand_id)
+
+        Returns:
+            Dict[str, str]: {'selector': ...} или {'function': ...}
+        """
+        if kind == "brands":
+            return {"selector": "a[href*='autoturism-identificare-vehicul-']"}
+        if kind == "models":
+            brand_id = context.get("brand_id")
+            marker = f"autoturism-identificare-vehicul-{brand_id}-" if brand_id else "autoturism-identificare-vehicul-"
+            return {"selector": f"table a[href*='{marker}']"}
+        return {"function": _ENGINE_TABLE_READY_JS}
+
+    def _begin(self, page_key: int) -> None:
+        self._current[page_key] = PageLoadStats()
+
+    def _finish(self, page_key: int, url: str) -> None:
+        """Выводит статистику страницы и добавляет ее к общей
+
+        Args:
+            page_key (int): Ключ страницы браузера
+            url (str): URL страницы
+        """
+        stats = self._current.pop(page_key, PageLoadStats())
+        self.pages += 1
+        self.total.requests += stats.requests
+        self.total.bytes += stats.bytes
+        for reason, count in stats.by_type.items():
+            self.total.by_type[reason] = self.total.by_type.get(reason, 0) + count
+        print(f"Профиль lean: заблокировано запросов: {stats.requests}, "
+              f"сэкономлено ~{stats.bytes // 1024} КБ ({url})")
+
+    def navigate(self, page: "Page", url: str, kind: str, **context: Any) -> None:
+        page_key = id(page)
+        self._begin(page_key)
+        with self.metrics.stage("goto"):
+            page.goto(url, wait_until="domcontentloaded")
+
+        # Playwright к этому моменту уже загружен: страница открыта
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+        condition = self._ready_condition(kind, **context)
+        try:
+            with self.metrics.stage("wait"):
+                if "selector" in condition:
+                    page.wait_for_selector(condition["selector"], state="attached", timeout=self.ready_timeout_ms)
+                else:
+                    page.wait_for_function(condition["function"], timeout=self.ready_timeout_ms)
+        except PlaywrightTimeoutError:
+            # Страница без данных (например, бренд без моделей) разбирается как есть
+            print(f"Данные не появились на странице за {self.ready_timeout_ms / 1000:.0f} с: {url}")
+
+        self._finish(page_key, url)
+
+    async def navigate_async(self, page: "AsyncPage", url: str, kind: str, **context: Any) -> None:
+        page_key = id(page)
+        self._begin(page_key)
+        with self.metrics.stage("goto"):
+            await page.goto(url, wait_until="domcontentloaded")
+
+        from playwright.async_api import TimeoutError as AsyncPlaywrightTimeoutError
+
+        condition = self._ready_condition(kind, **context)
+        try:
+            with self.metrics.stage("wait"):
+                if "selector" in condition:
+                    await page.wait_for_selector(condition["selector"], state="attached",
+                                                 timeout=self.ready_timeout_ms)
+                else:
+                    await page.wait_for_function(condition["function"], timeout=self.ready_timeout_ms)
+        except AsyncPlaywrightTimeoutError:
+            print(f"Данные не появились на странице за {self.ready_timeout_ms / 1000:.0f} с: {url}")
+
+        self._finish(page_key, url)
+
+    def summary(self) -> Optional[Dict[str, Any]]:
+        return {
+            "pages": self.pages,
+            "blocked_requests": self.total.requests,
+            "estimated_bytes_saved": self.total.bytes,
+            "blocked_by_type": dict(self.total.by_type),
+        }
+
+
+def create_load_profile(name: str) -> FullLoadProfile:
+    """Создает профиль загрузки по названию
+
+    Args:
+        name (str): Название профиля ('full' или 'lean')
+
+    Returns:
+        FullLoadProfile: Профиль загрузки
+    """
+    if name == "lean":
+        return LeanLoadProfile()
+    if name == "full":
+        return FullLoadProfile()
+    raise ValueError(f"Неизвестный профиль загрузки: {name}")
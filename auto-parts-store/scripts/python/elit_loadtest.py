@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Нагрузочный тест полного обхода на локальном тестовом сервере elit_mock.py.
+Сервер запускается в отдельном процессе, чтобы его работа не делила GIL с
+парсером, а парсер выполняет run(mode="full") по адресу сервера с теми же
+параметрами обхода, что и elit_parser.py. Выводятся страницы в секунду,
+общее время, пиковая память парсера и браузера и ответы сервера по кодам;
+при скорости ниже --min-pages-per-sec код выхода 1.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from elit_mock import add_mock_arguments, create_server, create_site, server_url, site_options
+from elit_parser import ElitRoParser, add_crawl_arguments, crawl_options
+
+# Ограничения парсера не должны обрезать каталог тестового сервера
+_NO_LIMIT = 10 ** 9
+
+
+def _serve(connection: Any, options: Dict[str, Any]) -> None:
+    """Работает в процессе сервера: отправляет URL, по команде останавливается и отправляет статистику"""
+    site = create_site(**options)
+    server = create_server(site, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    connection.send((server_url(server), site.catalog.size))
+    connection.recv()
+    server.shutdown()
+    server.server_close()
+    connection.send(site.summary())
+    connection.close()
+
+
+class MockServerProcess:
+    """Тестовый сервер elit_mock.py в отдельном процессе"""
+
+    def __init__(self, options: Dict[str, Any]):
+        """Инициализация
+
+        Args:
+            options (Dict[str, Any]): Параметры create_site()
+        """
+        self.options = options
+        self.url: Optional[str] = None
+        self.size: Dict[str, int] = {}
+        self._connection = None
+        self._process: Optional[multiprocessing.Process] = None
+
+    def start(self) -> str:
+        """Запускает сервер и возвращает его базовый URL"""
+        self._connection, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_serve, args=(child, self.options), daemon=True)
+        self._process.start()
+        self.url, self.size = self._connection.recv()
+        return self.url
+
+    def stop(self) -> Dict[str, Any]:
+        """Останавливает сервер и возвращает его статистику"""
+        if self._process is None:
+            return {}
+        self._connection.send(None)
+        summary = self._connection.recv()
+        self._process.join()
+        self._process = None
+        return summary
+
+    def __enter__(self) -> "MockServerProcess":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+
+def run_load_test(mock: Dict[str, Any], crawl: Dict[str, Any], output_dir: str,
+                  verbose: bool = False) -> Dict[str, Any]:
+    """Выполняет полный обход тестового сервера и измеряет его
+
+    Args:
+        mock (Dict[str, Any]): Параметры каталога и поведения сервера (create_site())
+        crawl (Dict[str, Any]): Параметры обхода ElitRoParser (crawl_options())
+        output_dir (str): Каталог для выходного файла и метрик парсера
+        verbose (bool): Показывать вывод парсера
+
+    Returns:
+        Dict[str, Any]: Результаты замера
+    """
+    with MockServerProcess(mock) as server:
+        parser = ElitRoParser(str(Path(output_dir) / "loadtest.json"), max_brands=_NO_LIMIT,
+                              max_models=_NO_LIMIT, max_engines=_NO_LIMIT,
+                              **dict(crawl, base_url=server.url))
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        started = time.perf_counter()
+        with output:
+            result = parser.run("full")
+        wall = time.perf_counter() - started
+        server_summary = server.stop()
+
+    counters = parser.metrics.summary()["counters"]
+    memory = parser.memory.summary()
+    pages = counters.get("pages", 0)
+    models = sum(len(brand["models"]) for brand in result.values())
+    engines = sum(len(model["engines"]) for brand in result.values() for model in brand["models"].values())
+    return {
+        "catalog": server.size,
+        "brands": len(result),
+        "models": models,
+        "engines": engines,
+        "pages": pages,
+        "wall_seconds": round(wall, 3),
+        "pages_per_sec": round(pages / wall, 1) if wall > 0 else None,
+        "failed_units": counters.get("failed_units", 0),
+        "retries": counters.get("retries", 0),
+        "peak_rss_mb": memory["peak_rss_mb"],
+        "peak_browser_rss_mb": memory["peak_browser_rss_mb"] if memory["samples"] else None,
+        "server": server_summary
+    }
+
+
+def main():
+    """Запускает нагрузочный тест из командной строки"""
+    parser = argparse.ArgumentParser(description="Нагрузочный тест полного обхода на тестовом сервере elit.ro")
+    add_mock_arguments(parser)
+    add_crawl_arguments(parser)
+    # Без браузера и без ограничения частоты измеряется сам парсер, а не вежливость к сайту
+    parser.set_defaults(fetch_backend="http", host_rate=0.0, artifacts="off")
+    parser.add_argument("--verbose", action="store_true", help="Показывать вывод парсера")
+    parser.add_argument("--json", help="Сохранить результаты замера в JSON-файл")
+    parser.add_argument("--min-pages-per-sec", type=float,
+                        help="Минимально допустимая скорость обхода (ниже - код выхода 1)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        result = run_load_test(site_options(args), crawl_options(args), output_dir, verbose=args.verbose)
+
+    catalog = result["catalog"]
+    print(f"Каталог сервера: брендов {catalog['brands']}, моделей {catalog['models']}, "
+          f"двигателей {catalog['engines']}")
+    print(f"Получено: брендов {result['brands']}, моделей {result['models']}, двигателей {result['engines']}, "
+          f"не загружено единиц: {result['failed_units']}")
+    print(f"Страниц: {result['pages']} за {result['wall_seconds']:.2f} с, {result['pages_per_sec']} стр/с, "
+          f"повторов: {result['retries']}")
+    memory = f"Пиковый RSS парсера: {result['peak_rss_mb']} МБ"
+    if result["peak_browser_rss_mb"]:
+        memory += f", браузера: {result['peak_browser_rss_mb']} МБ"
+    print(memory)
+    server = result["server"]
+    print(f"Сервер: запросов {server['requests']}, ответы по кодам {server['statuses']}, "
+          f"отправлено {server['bytes_sent'] // 1024} КБ")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    if args.min_pages_per_sec is not None and (result["pages_per_sec"] or 0) < args.min_pages_per_sec:
+        print(f"Скорость обхода ниже {args.min_pages_per_sec} стр/с")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
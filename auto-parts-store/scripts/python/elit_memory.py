@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Учет памяти браузера и переработка страниц при долгом обходе elit.ro.
+MemoryMonitor измеряет RSS процесса парсера и всех его дочерних процессов
+(драйвер Playwright, процессы Chromium и рендереры), а также JS-кучу
+страницы, и запоминает пиковые значения. BrowserSession измеряет только
+свое дерево процессов - драйвер Playwright, запущенный сессией, и его
+потомков, - поэтому процессы разбора и браузеры других сессий в порог
+памяти не попадают. RecyclePolicy решает, когда
+страницу с контекстом нужно пересоздать (после N переходов) и когда
+браузер нужно перезапустить (превышен порог памяти). BrowserSession -
+браузер, контекст и страница синхронного обхода с такой переработкой;
+cookies контекста переносятся в новый контекст, поэтому состояние сайта
+при переработке не теряется.
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+from elit_metrics import CrawlMetrics, DISABLED_METRICS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
+
+# JS-куча страницы (performance.memory есть только в Chromium)
+JS_HEAP_SCRIPT = "() => performance.memory ? performance.memory.usedJSHeapSize : null"
+
+_MB = 1024 * 1024
+
+
+def _proc_rss(pid: int) -> Optional[int]:
+    """Возвращает RSS процесса в байтах по /proc (None, если процесса нет)"""
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="ascii", errors="ignore") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        return None
+    return 0
+
+
+# Запуск драйвера Playwright сессиями выполняется по одному, чтобы новый дочерний процесс
+# парсера можно было отнести к запустившей его сессии
+_SPAWN_LOCK = threading.Lock()
+
+
+def _proc_parents() -> Dict[int, int]:
+    """Возвращает родителей всех процессов (pid -> ppid) по /proc/<pid>/stat"""
+    parents: Dict[int, int] = {}
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry.name}/stat", "r", encoding="ascii", errors="ignore") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Имя процесса в скобках может содержать пробелы, ppid идет вторым полем после него
+        parents[int(entry.name)] = int(stat[stat.rfind(")") + 2:].split()[1])
+    return parents
+
+
+def _proc_children(root: int) -> Dict[int, int]:
+    """Возвращает потомков процесса root (pid -> ppid) по /proc/<pid>/stat"""
+    parents = _proc_parents()
+    descendants: Dict[int, int] = {}
+    frontier = [root]
+    while frontier:
+        parent = frontier.pop()
+        for pid, ppid in parents.items():
+            if ppid == parent and pid not in descendants:
+                descendants[pid] = ppid
+                frontier.append(pid)
+    return descendants
+
+
+def _psutil_installed() -> bool:
+    try:
+        import psutil  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def children_rss(pid: Optional[int] = None) -> Optional[int]:
+    """Возвращает суммарный RSS дочерних процессов (браузера) в байтах
+
+    Используется psutil, если он установлен, иначе /proc (Linux).
+
+    Args:
+        pid (Optional[int]): Корневой процесс (по умолчанию текущий)
+
+    Returns:
+        Optional[int]: RSS в байтах или None, если измерить нельзя
+    """
+    pid = pid or os.getpid()
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        total = 0
+        for child in psutil.Process(pid).children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    if not Path("/proc/self/status").exists():
+        return None
+    return sum(_proc_rss(child) or 0 for child in _proc_children(pid))
+
+
+def tree_rss(roots: Iterable[int]) -> Optional[int]:
+    """Возвращает суммарный RSS процессов roots и всех их потомков в байтах
+
+    Завершившиеся процессы не учитываются.
+
+    Args:
+        roots (Iterable[int]): Корневые процессы
+
+    Returns:
+        Optional[int]: RSS в байтах или None, если измерить нельзя
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    total = 0
+    if psutil is not None:
+        for root in roots:
+            try:
+                process = psutil.Process(root)
+                tree = [process] + process.children(recursive=True)
+            except psutil.Error:
+                continue
+            for child in tree:
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    continue
+        return total
+
+    if not Path("/proc/self/status").exists():
+        return None
+    for root in roots:
+        total += sum(_proc_rss(pid) or 0 for pid in [root, *_proc_children(root)])
+    return total
+
+
+def child_pids() -> List[int]:
+    """Возвращает PID прямых дочерних процессов текущего процесса (пустой список, если узнать нельзя)"""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        return [child.pid for child in psutil.Process().children()]
+    if not Path("/proc/self/status").exists():
+        return []
+    pid = os.getpid()
+    return [child for child, parent in _proc_parents().items() if parent == pid]
+
+
+def self_peak_rss() -> Optional[int]:
+    """Возвращает пиковый RSS текущего процесса в байтах"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # На macOS ru_maxrss в байтах, в Linux - в килобайтах
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryMonitor:
+    """Текущая и пиковая память парсера и браузера; методы можно вызывать из разных потоков"""
+
+    def __init__(self, metrics: CrawlMetrics = DISABLED_METRICS):
+        """Инициализация монитора
+
+        Args:
+            metrics (CrawlMetrics): Метрики обхода, в которые записываются пиковые значения
+        """
+        self.metrics = metrics
+        self.available = _psutil_installed() or Path("/proc/self/status").exists()
+        self._lock = threading.Lock()
+        self.browser_rss = 0
+        self.peak_browser_rss = 0
+        self.peak_js_heap = 0
+        self.samples = 0
+
+    def sample(self, pids: Optional[List[int]] = None) -> Optional[int]:
+        """Измеряет память браузера и обновляет пиковые значения
+
+        Args:
+            pids (Optional[List[int]]): Корневые процессы браузера (None - все дочерние процессы парсера,
+                пустой список - процессы неизвестны и память не измеряется)
+
+        Returns:
+            Optional[int]: Текущий RSS браузера в байтах (None, если измерить нельзя)
+        """
+        if not self.available:
+            rss = None
+        elif pids is None:
+            rss = children_rss()
+        else:
+            rss = tree_rss(pids) if pids else None
+        with self._lock:
+            self.samples += 1
+            if rss is not None:
+                self.browser_rss = rss
+                self.peak_browser_rss = max(self.peak_browser_rss, rss)
+        if rss is not None:
+            self.metrics.peak("browser_rss_bytes", rss)
+        return rss
+
+    def sample_page(self, page: "Page", pids: Optional[List[int]] = None) -> Optional[int]:
+        """Измеряет JS-кучу страницы и память браузера
+
+        Args:
+            page (Page): Объект страницы Playwright
+            pids (Optional[List[int]]): Корневые процессы браузера (см. sample())
+
+        Returns:
+            Optional[int]: Текущий RSS браузера в байтах
+        """
+        try:
+            heap = page.evaluate(JS_HEAP_SCRIPT)
+        except Exception:
+            heap = None
+        self.record_js_heap(heap)
+        return self.sample(pids)
+
+    def record_js_heap(self, heap: Optional[float]) -> None:
+        """Учитывает размер JS-кучи страницы в байтах (None - не измерен)"""
+        if not heap:
+            return
+        with self._lock:
+            self.peak_js_heap = max(self.peak_js_heap, int(heap))
+        self.metrics.peak("js_heap_bytes", int(heap))
+
+    def summary(self) -> Dict[str, Any]:
+        """Возвращает пиковую память в МБ: процесса парсера, браузера и JS-кучи страницы"""
+        peak_self = self_peak_rss()
+        if peak_self is not None:
+            self.metrics.peak("peak_rss_bytes", peak_self)
+        with self._lock:
+            return {
+                "peak_rss_mb": round(peak_self / _MB, 1) if peak_self is not None else None,
+                "peak_browser_rss_mb": round(self.peak_browser_rss / _MB, 1) if self.available else None,
+                "peak_js_heap_mb": round(self.peak_js_heap / _MB, 1),
+                "samples": self.samples
+            }
+
+
+class RecyclePolicy:
+    """Правила переработки страниц и браузера"""
+
+    def __init__(self, max_navigations: int = 200, memory_limit_mb: Optional[float] = None,
+                 check_every: int = 20):
+        """Инициализация правил
+
+        Args:
+            max_navigations (int): Переходов на одной странице до пересоздания страницы и контекста (0 - без ограничения)
+            memory_limit_mb (Optional[float]): Порог памяти браузера в МБ, после которого браузер
+                перезапускается (None - без порога)
+            check_every (int): Измерять память каждые N переходов
+        """
+        self.max_navigations = max(0, max_navigations)
+        self.memory_limit = memory_limit_mb * _MB if memory_limit_mb else None
+        self.check_every = max(1, check_every)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_navigations or self.memory_limit)
+
+    def page_expired(self, navigations: int) -> bool:
+        """Проверяет, пора ли пересоздать страницу после navigations переходов"""
+        return bool(self.max_navigations) and navigations >= self.max_navigations
+
+    def should_check_memory(self, navigations: int) -> bool:
+        """Проверяет, нужно ли измерить память после очередного перехода"""
+        return navigations % self.check_every == 0
+
+    def over_limit(self, rss: Optional[int]) -> bool:
+        """Проверяет, превышен ли порог памяти браузера"""
+        return self.memory_limit is not None and rss is not None and rss >= self.memory_limit
+
+
+class BrowserSession:
+    """Браузер, контекст и страница синхронного обхода с переработкой по RecyclePolicy"""
+
+    def __init__(self, context_options: Dict[str, Any], load_profile: Any,
+                 policy: Optional[RecyclePolicy] = None, monitor: Optional[MemoryMonitor] = None):
+        """Инициализация сессии (браузер запускается при первом обращении к page)
+
+        Args:
+            context_options (Dict[str, Any]): Параметры контекста браузера
+            load_profile (Any): Профиль загрузки, подключаемый к каждой новой странице
+            policy (Optional[RecyclePolicy]): Правила переработки (None - без переработки)
+            monitor (Optional[MemoryMonitor]): Монитор памяти
+        """
+        self.context_options = context_options
+        self.load_profile = load_profile
+        self.policy = policy or RecyclePolicy(0)
+        self.monitor = monitor or MemoryMonitor()
+        self.navigations = 0
+        self.page_navigations = 0
+        self.page_recycles = 0
+        self.browser_restarts = 0
+        # Драйвер Playwright этой сессии; браузер и рендереры - его потомки
+        self.pids: List[int] = []
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._page: Optional["Page"] = None
+
+    @property
+    def page(self) -> "Page":
+        """Текущая страница (после переработки - новая)"""
+        if self._page is None:
+            if self._browser is None:
+                if self._playwright is None:
+                    from playwright.sync_api import sync_playwright
+                    with _SPAWN_LOCK:
+                        before = set(child_pids())
+                        self._playwright = sync_playwright().start()
+                        self.pids = [pid for pid in child_pids() if pid not in before]
+                self._browser = self._playwright.chromium.launch(headless=True)
+            self._open_page()
+        return self._page
+
+    def _open_page(self, storage_state: Optional[Dict[str, Any]] = None) -> None:
+        options = dict(self.context_options)
+        if storage_state:
+            options["storage_state"] = storage_state
+        self._context = self._browser.new_context(**options)
+        self._page = self._context.new_page()
+        self.load_profile.attach(self._page)
+        self.page_navigations = 0
+
+    def _storage_state(self) -> Optional[Dict[str, Any]]:
+        try:
+            return self._context.storage_state() if self._context is not None else None
+        except Exception:
+            return None
+
+    def _close_context(self) -> None:
+        if self._context is not None:
+            try:
+                self._context.close()
+            except Exception:
+                pass
+        self._context = None
+        self._page = None
+
+    def navigated(self) -> None:
+        """Учитывает переход и при необходимости пересоздает страницу или перезапускает браузер
+
+        Вызывается после того, как HTML страницы получен, поэтому переработка
+        не прерывает загрузку.
+        """
+        self.navigations += 1
+        self.page_navigations += 1
+        if self._page is None:
+            return
+
+        if self.policy.should_check_memory(self.navigations):
+            rss = self.monitor.sample_page(self._page, self.pids)
+            if self.policy.over_limit(rss):
+                print(f"Память браузера {rss // _MB} МБ превысила порог "
+                      f"{self.policy.memory_limit // _MB} МБ, перезапуск браузера")
+                self.restart()
+                return
+
+        if self.policy.page_expired(self.page_navigations):
+            self.recycle()
+
+    def recycle(self) -> None:
+        """Закрывает контекст и открывает новую страницу в новом контексте с прежними cookies"""
+        state = self._storage_state()
+        self._close_context()
+        self._open_page(state)
+        self.page_recycles += 1
+        self.monitor.metrics.count("page_recycles")
+
+    def restart(self) -> None:
+        """Перезапускает браузер, сохраняя cookies контекста"""
+        state = self._storage_state()
+        self._close_context()
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception:
+                pass
+        self._browser = self._playwright.chromium.launch(headless=True)
+        self._open_page(state)
+        self.browser_restarts += 1
+        self.monitor.metrics.count("browser_restarts")
+        self.monitor.sample(self.pids)
+
+    def close(self) -> None:
+        """Закрывает браузер и останавливает Playwright"""
+        if self._page is not None:
+            self.monitor.sample_page(self._page, self.pids)
+        if self._browser is not None:
+            self._browser.close()
+        if self._playwright is not None:
+            self._playwright.stop()
+        self.pids = []
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._page = None
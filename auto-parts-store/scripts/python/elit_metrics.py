@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Метрики обхода elit.ro.
+CrawlMetrics собирает время стадий (переход на страницу, ожидание данных,
+page.content(), скриншоты, разбор HTML, запись результата) и счетчики
+страниц, записей, повторов и ошибок. Сводка с p50/p95/max записывается рядом
+с выходным файлом в JSON и в текстовом формате Prometheus. RunProfiler
+по ключу --profile сохраняет данные cProfile и tracemalloc за запуск.
+"""
+
+import io
+import json
+import math
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import cProfile
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Возвращает процентиль отсортированной выборки методом ближайшего ранга
+
+    Args:
+        samples (List[float]): Отсортированные значения
+        fraction (float): Доля (0.5 - медиана, 0.95 - p95)
+
+    Returns:
+        float: Значение процентиля (0.0 для пустой выборки)
+    """
+    if not samples:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(samples)))
+    return samples[min(rank, len(samples)) - 1]
+
+
+class CrawlMetrics:
+    """Время стадий и счетчики обхода; методы можно вызывать из разных потоков"""
+
+    # Счетчики, которые выводятся всегда, даже с нулевым значением
+    COUNTERS = ("pages", "records", "retries", "errors")
+
+    def __init__(self, enabled: bool = True):
+        """Инициализация метрик
+
+        Args:
+            enabled (bool): Собирать метрики (False - все методы ничего не делают)
+        """
+        self.enabled = enabled
+        self.started = time.time()
+        self._started_perf = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages: Dict[str, List[float]] = {}
+        self._counters: Dict[str, int] = {name: 0 for name in self.COUNTERS}
+        self._peaks: Dict[str, float] = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Добавляет длительность стадии
+
+        Args:
+            stage (str): Название стадии
+            seconds (float): Длительность в секундах
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._stages.setdefault(stage, []).append(seconds)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Измеряет время выполнения блока как стадию name (в том числе блока с await)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Увеличивает счетчик
+
+        Args:
+            name (str): Название счетчика
+            value (int): Приращение
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def peak(self, name: str, value: float) -> None:
+        """Запоминает наибольшее значение показателя (например, пиковую память)
+
+        Args:
+            name (str): Название показателя
+            value (float): Текущее значение
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if value > self._peaks.get(name, float("-inf")):
+                self._peaks[name] = value
+
+    def summary(self) -> Dict[str, Any]:
+        """Возвращает сводку: длительность запуска, p50/p95/max по стадиям, счетчики и пиковые значения"""
+        with self._lock:
+            stages = {name: sorted(samples) for name, samples in self._stages.items()}
+            counters = dict(self._counters)
+            peaks = dict(self._peaks)
+
+        return {
+            "started_at": round(self.started, 3),
+            "elapsed_seconds": round(time.perf_counter() - self._started_perf, 6),
+            "stages": {
+                name: {
+                    "count": len(samples),
+                    "total": round(sum(samples), 6),
+                    "p50": round(percentile(samples, 0.5), 6),
+                    "p95": round(percentile(samples, 0.95), 6),
+                    "max": round(samples[-1], 6)
+                }
+                for name, samples in sorted(stages.items())
+            },
+            "counters": dict(sorted(counters.items())),
+            "peaks": dict(sorted(peaks.items()))
+        }
+
+    @staticmethod
+    def prometheus(summary: Dict[str, Any], prefix: str = "elit") -> str:
+        """Формирует текстовый формат Prometheus (для textfile collector node_exporter)
+
+        Args:
+            summary (Dict[str, Any]): Сводка, полученная от summary()
+            prefix (str): Префикс названий метрик
+
+        Returns:
+            str: Текст метрик
+        """
+        lines = [
+            f"# HELP {prefix}_run_duration_seconds Длительность запуска парсера",
+            f"# TYPE {prefix}_run_duration_seconds gauge",
+            f"{prefix}_run_duration_seconds {summary['elapsed_seconds']}",
+            f"# HELP {prefix}_run_started_timestamp_seconds Время запуска парсера",
+            f"# TYPE {prefix}_run_started_timestamp_seconds gauge",
+            f"{prefix}_run_started_timestamp_seconds {summary['started_at']}"
+        ]
+
+        if summary["stages"]:
+            lines.append(f"# HELP {prefix}_stage_seconds Время стадий обхода")
+            lines.append(f"# TYPE {prefix}_stage_seconds summary")
+            for name, stage in summary["stages"].items():
+                for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("1", "max")):
+                    lines.append(f'{prefix}_stage_seconds{{stage="{name}",quantile="{quantile}"}} {stage[key]}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stage["total"]}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stage["count"]}')
+
+        for name, value in summary["counters"].items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+
+        for name, value in summary.get("peaks", {}).items():
+            lines.append(f"# TYPE {prefix}_{name}_max gauge")
+            lines.append(f"{prefix}_{name}_max {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, output_path: Union[str, Path]) -> List[Path]:
+        """Записывает сводку рядом с выходным файлом: <output>.metrics.json и <output>.prom
+
+        Args:
+            output_path (Union[str, Path]): Путь к выходному файлу парсера
+
+        Returns:
+            List[Path]: Пути записанных файлов
+        """
+        summary = self.summary()
+        json_path = Path(f"{output_path}.metrics.json")
+        prom_path = Path(f"{output_path}.prom")
+
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        # Файл для textfile collector заменяется целиком, чтобы не читался недописанным
+        tmp_path = prom_path.with_name(prom_path.name + ".tmp")
+        tmp_path.write_text(self.prometheus(summary), encoding="utf-8")
+        tmp_path.replace(prom_path)
+        return [json_path, prom_path]
+
+
+# Метрики по умолчанию для объектов, созданных без парсера (например, профиль загрузки в бенчмарке)
+DISABLED_METRICS = CrawlMetrics(enabled=False)
+
+
+class RunProfiler:
+    """Профилирование запуска: cProfile основного потока и tracemalloc всего процесса
+
+    cProfile учитывает только поток, в котором запущен профилировщик; потоки
+    загрузки конвейера и процессы разбора в профиль не попадают.
+    """
+
+    def __init__(self, output_path: Union[str, Path], top: int = 30):
+        """Инициализация профилировщика
+
+        Args:
+            output_path (Union[str, Path]): Путь к выходному файлу парсера (рядом пишутся .prof и .profile.txt)
+            top (int): Количество строк в текстовом отчете
+        """
+        self.output_path = output_path
+        self.top = top
+        self._profile: Optional["cProfile.Profile"] = None
+
+    def start(self) -> None:
+        """Запускает cProfile и tracemalloc"""
+        # cProfile и pstats нужны только при --profile
+        import cProfile
+
+        tracemalloc.start(10)
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self) -> List[Path]:
+        """Останавливает профилирование и записывает <output>.prof и текстовый отчет <output>.profile.txt
+
+        Returns:
+            List[Path]: Пути записанных файлов
+        """
+        if self._profile is None:
+            return []
+        self._profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        prof_path = Path(f"{self.output_path}.prof")
+        report_path = Path(f"{self.output_path}.profile.txt")
+        self._profile.dump_stats(str(prof_path))
+
+        import pstats
+
+        report = io.StringIO()
+        report.write(f"cProfile (по суммарному времени, первые {self.top}):\n")
+        pstats.Stats(self._profile, stream=report).sort_stats("cumulative").print_stats(self.top)
+        report.write(f"tracemalloc: текущая память {current // 1024} КБ, пиковая {peak // 1024} КБ\n")
+        report.write(f"Крупнейшие места выделения памяти (первые {self.top}):\n")
+        for stat in snapshot.statistics("lineno")[:self.top]:
+            report.write(f"  {stat}\n")
+        report_path.write_text(report.getvalue(), encoding="utf-8")
+
+        self._profile = None
+        return [prof_path, report_path]
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Локальный тестовый сервер, заменяющий elit.ro.
+Отдает страницы брендов, моделей и двигателей по тем же путям, что и сайт:
+из фикстур (elit_fixtures.load_fixtures) или синтетические страницы
+заданного размера. Задержка ответа, доля ошибок 503 и ограничение частоты
+запросов (ответ 429 с Retry-After) настраиваются, поэтому на сервере можно
+проверять повторы, регулятор частоты и измерять скорость обхода без сети.
+Парсер подключается к серверу ключом --base-url или переменной ELIT_BASE_URL.
+"""
+
+import argparse
+import hashlib
+import random
+import re
+import signal
+import threading
+import time
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from elit_fixtures import (Fixture, load_fixtures, synthetic_brands_page, synthetic_engines_page,
+                           synthetic_models_page)
+
+# Пути страниц каталога elit.ro (см. ElitRoParser.brands_url, models_url, engines_url)
+BRANDS_PATH = "/Catalog/autoturism-identificare-vehicul/39849642;39850140"
+CATALOG_PREFIX = "/Catalog/autoturism-identificare-vehicul-"
+
+_BRAND_LINK = re.compile(r'autoturism-identificare-vehicul-([^/"\'\s;]+)/')
+
+
+class MockCatalog:
+    """Страницы каталога по путям сайта: фикстуры или синтетические страницы"""
+
+    def __init__(self, brands: int = 50, models: int = 40, engines: int = 10,
+                 fixtures: Optional[List[Fixture]] = None):
+        """Инициализация каталога
+
+        Страница брендов берется из фикстуры типа 'brands', страницы моделей - из
+        фикстур 'models' по ID бренда, страницы двигателей - из фикстур 'engines'
+        (по ID модели выбирается одна из них). Чего нет в фикстурах, генерируется.
+        ID синтетических моделей содержат ID бренда, поэтому не повторяются
+        между брендами и каждая модель - отдельная страница двигателей.
+
+        Args:
+            brands (int): Количество синтетических брендов
+            models (int): Количество моделей на синтетической странице моделей
+            engines (int): Количество строк на синтетической странице двигателей
+            fixtures (Optional[List[Fixture]]): Фикстуры страниц (None - только синтетические страницы)
+        """
+        fixtures = fixtures or []
+        self.models = models
+        self.engines = engines
+        brand_pages = [fixture.content for fixture in fixtures if fixture.kind == "brands"]
+        self.brands_page = brand_pages[0] if brand_pages else synthetic_brands_page(brands)
+        self.models_pages = {fixture.brand_id: fixture.content for fixture in fixtures if fixture.kind == "models"}
+        self.engines_pages = [fixture.content for fixture in fixtures if fixture.kind == "engines"]
+        self.brand_ids = set(_BRAND_LINK.findall(self.brands_page))
+
+    def page(self, path: str) -> Optional[str]:
+        """Возвращает HTML-код страницы по пути (None - страницы нет)
+
+        Args:
+            path (str): Путь URL без параметров
+
+        Returns:
+            Optional[str]: HTML-код страницы
+        """
+        if path == "/":
+            return f'<html><body><a href="{BRANDS_PATH}">Catalog</a></body></html>'
+        if path == BRANDS_PATH:
+            return self.brands_page
+        if not path.startswith(CATALOG_PREFIX):
+            return None
+
+        item_id = path[len(CATALOG_PREFIX):].split("/", 1)[0]
+        if not item_id:
+            return None
+        if item_id in self.brand_ids:
+            if item_id in self.models_pages:
+                return self.models_pages[item_id]
+            return synthetic_models_page(item_id, self.models, model_prefix=f"{item_id}model")
+
+        # Остальные ID - модели; страница двигателей одна и та же при каждом запросе
+        seed = zlib.crc32(item_id.encode("utf-8"))
+        if self.engines_pages:
+            return self.engines_pages[seed % len(self.engines_pages)]
+        return synthetic_engines_page(self.engines, seed=seed)
+
+    @property
+    def size(self) -> Dict[str, int]:
+        """Размер каталога: бренды, модели и двигатели (для страниц из фикстур - оценка)"""
+        brands = len(self.brand_ids)
+        return {"brands": brands, "models": brands * self.models, "engines": brands * self.models * self.engines}
+
+
+class MockSite:
+    """Поведение тестового сервера: задержка, ошибки, ограничение частоты и статистика"""
+
+    def __init__(self, catalog: MockCatalog, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit: float = 0.0, retry_after: int = 1,
+                 seed: Optional[int] = None):
+        """Инициализация сайта
+
+        Args:
+            catalog (MockCatalog): Страницы каталога
+            latency (float): Задержка каждого ответа в секундах
+            jitter (float): Случайная добавка к задержке от 0 до jitter секунд
+            error_rate (float): Доля запросов, на которые отвечает 503
+            rate_limit (float): Допустимое число запросов в секунду, сверх него ответ 429 (0 - без ограничения)
+            retry_after (int): Значение заголовка Retry-After в ответах 429 и 503 в целых секундах
+            seed (Optional[int]): Начальное значение генератора ошибок и задержек (None - случайное)
+        """
+        self.catalog = catalog
+        self.latency = max(0.0, latency)
+        self.jitter = max(0.0, jitter)
+        self.error_rate = max(0.0, error_rate)
+        self.rate_limit = max(0.0, rate_limit)
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent: Deque[float] = deque()
+        self.requests = 0
+        self.bytes_sent = 0
+        self.statuses: Dict[int, int] = {}
+
+    def _admit(self) -> Tuple[Optional[int], float]:
+        """Решает, отвечать ли на запрос ошибкой, и выбирает задержку ответа"""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            if self.rate_limit:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] >= 1.0:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rate_limit:
+                    return 429, 0.0
+                self._recent.append(now)
+            if self.error_rate and self._random.random() < self.error_rate:
+                return 503, delay
+        return None, delay
+
+    def respond(self, path: str, headers: Any) -> Tuple[int, Dict[str, str], bytes]:
+        """Формирует ответ на запрос GET
+
+        Args:
+            path (str): Путь URL
+            headers (Any): Заголовки запроса
+
+        Returns:
+            Tuple[int, Dict[str, str], bytes]: Код ответа, заголовки и тело
+        """
+        error, delay = self._admit()
+        if delay:
+            time.sleep(delay)
+
+        if error is not None:
+            status, response_headers, body = error, {"Retry-After": str(self.retry_after)}, b"Service unavailable"
+        else:
+            content = self.catalog.page(unquote(urlsplit(path).path))
+            if content is None:
+                status, response_headers, body = 404, {}, b"Not found"
+            else:
+                body = content.encode("utf-8")
+                etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+                response_headers = {"ETag": etag, "Content-Type": "text/html; charset=utf-8"}
+                if headers.get("If-None-Match") == etag:
+                    status, body = 304, b""
+                else:
+                    status = 200
+
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.bytes_sent += len(body)
+        return status, response_headers, body
+
+    def summary(self) -> Dict[str, Any]:
+        """Возвращает статистику сервера: запросы, ответы по кодам и отправленные байты"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+                "bytes_sent": self.bytes_sent
+            }
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов тестового сервера"""
+
+    # Соединения keep-alive, как у сайта. Заголовки и тело отправляются отдельно, поэтому без
+    # TCP_NODELAY каждый ответ ждет отложенного подтверждения клиента (~40 мс)
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    # Устанавливается в create_server()
+    site: MockSite
+
+    def do_GET(self) -> None:
+        status, headers, body = self.site.respond(self.path, self.headers)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Журнал каждого запроса замедляет сервер под нагрузкой
+        pass
+
+
+def create_server(site: MockSite, host: str = "127.0.0.1", port: int = 8800) -> ThreadingHTTPServer:
+    """Создает тестовый HTTP-сервер
+
+    Args:
+        site (MockSite): Поведение сервера
+        host (str): Адрес
+        port (int): Порт (0 - любой свободный)
+
+    Returns:
+        ThreadingHTTPServer: Сервер, готовый к serve_forever()
+    """
+    handler = type("BoundMockRequestHandler", (MockRequestHandler,), {"site": site})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def server_url(server: ThreadingHTTPServer) -> str:
+    """Возвращает базовый URL сервера для ключа --base-url"""
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    """Добавляет параметры каталога и поведения сервера (общие для сервера и нагрузочного теста)
+
+    Args:
+        parser (argparse.ArgumentParser): Разбор аргументов командной строки
+    """
+    parser.add_argument("--brands", type=int, default=50, help="Количество синтетических брендов")
+    parser.add_argument("--models", type=int, default=40, help="Количество моделей на бренд")
+    parser.add_argument("--engines", type=int, default=10, help="Количество двигателей на модель")
+    parser.add_argument("--fixtures", action="store_true",
+                        help="Отдавать сохраненные страницы из debug_output и bench_fixtures, "
+                             "недостающие страницы генерировать")
+    parser.add_argument("--latency", type=float, default=0.0, help="Задержка ответа в секундах")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Случайная добавка к задержке до N секунд")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов 503")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="Запросов в секунду, сверх которых сервер отвечает 429 (0 - без ограничения)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Заголовок Retry-After ответов 429 и 503 в секундах")
+    parser.add_argument("--seed", type=int, help="Начальное значение генератора ошибок и задержек")
+
+
+def site_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """Возвращает параметры каталога и сервера из аргументов, добавленных add_mock_arguments()
+
+    Args:
+        args (argparse.Namespace): Разобранные аргументы командной строки
+
+    Returns:
+        Dict[str, Any]: Параметры create_site()
+    """
+    return {
+        "brands": args.brands,
+        "models": args.models,
+        "engines": args.engines,
+        "fixtures": args.fixtures,
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "rate_limit": args.rate_limit,
+        "retry_after": args.retry_after,
+        "seed": args.seed
+    }
+
+
+def create_site(brands: int = 50, models: int = 40, engines: int = 10, fixtures: bool = False,
+                **behaviour: Any) -> MockSite:
+    """Создает сайт с каталогом заданного размера
+
+    Args:
+        brands (int): Количество синтетических брендов
+        models (int): Количество моделей на бренд
+        engines (int): Количество двигателей на модель
+        fixtures (bool): Использовать сохраненные страницы
+        **behaviour: Параметры MockSite (latency, jitter, error_rate, rate_limit, retry_after, seed)
+
+    Returns:
+        MockSite: Сайт
+    """
+    catalog = MockCatalog(brands, models, engines, load_fixtures() if fixtures else None)
+    return MockSite(catalog, **behaviour)
+
+
+def _terminate(signum: int, frame: Any) -> None:
+    """Останавливает сервер по SIGTERM так же, как по Ctrl+C"""
+    raise KeyboardInterrupt
+
+
+def main():
+    """Запуск тестового сервера из командной строки"""
+    parser = argparse.ArgumentParser(description="Локальный тестовый сервер, заменяющий elit.ro")
+    parser.add_argument("--host", default="127.0.0.1", help="Адрес сервера")
+    parser.add_argument("--port", type=int, default=8800, help="Порт сервера (0 - любой свободный)")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    site = create_site(**site_options(args))
+    server = create_server(site, args.host, args.port)
+    size = site.catalog.size
+    print(f"Тестовый сервер elit.ro слушает {server_url(server)}: брендов {size['brands']}, "
+          f"моделей {size['models']}, двигателей {size['engines']}")
+    print(f"Обход: python elit_parser.py <файл> full --base-url {server_url(server)} --fetch-backend http")
+
+    signal.signal(signal.SIGTERM, _terminate)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Остановка сервера...")
+    finally:
+        server.server_close()
+        print(f"Статистика сервера: {site.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Бэкенды разбора HTML-страниц elit.ro.
+SoupParser - эталонная реализация на BeautifulSoup (html.parser), LxmlParser -
+быстрая реализация на lxml, которая для страниц моделей и двигателей разбирает
+только фрагмент с таблицами. Правила отбора ссылок и разбора строк таблиц общие,
+поэтому оба бэкенда возвращают одинаковые записи.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Допустимые значения параметра parser_backend
+PARSER_BACKENDS = ("lxml", "soup")
+
+# Общая часть адресов страниц каталога
+LINK_MARKER = "autoturism-identificare-vehicul"
+ID_MARKER = "autoturism-identificare-vehicul-"
+
+# Служебные ссылки, которые не являются брендами или моделями
+SKIP_WORDS = ("home", "back", "menu", "catalog", "next", "prev")
+
+# Заголовки, по которым определяется таблица двигателей
+ENGINE_HEADER_KEYWORDS = ("kw", "hp", "ccm", "motor", "tip", "cilindri", "carburant")
+
+# Признаки дизельного двигателя в описании
+DIESEL_KEYWORDS = ("diesel", "di", "tdi", "hdi")
+
+# Годы производства в названии модели: "MODEL (01/94-10/03)" или "MODEL (1994-2003)"
+MODEL_YEARS_RE = re.compile(r"(.+?)\s*\((\d{2}\/\d{2}|\d{4})\s*-\s*(\d{2}\/\d{2}|\d{4}|\-)\)")
+
+# Годы производства в строке таблицы двигателей
+ENGINE_YEARS_RE = re.compile(r"(\d{2}\/\d{2}|\d{4})\s*-\s*(\d{2}\/\d{2}|\d{4}|-)")
+
+# Границы области с таблицами на странице
+_TABLE_START_RE = re.compile(r"<table\b", re.IGNORECASE)
+_TABLE_END_RE = re.compile(r"</table\s*>", re.IGNORECASE)
+
+# XML-объявление с кодировкой, которое lxml не принимает в строке str
+_XML_DECLARATION_RE = re.compile(r"^\s*<\?xml[^>]*\?>", re.IGNORECASE)
+
+
+def _is_skipped(name: str) -> bool:
+    lowered = name.lower()
+    return any(word in lowered for word in SKIP_WORDS)
+
+
+def _extract_id(href: str, marker: str) -> str:
+    return href.split(marker)[1].split("/")[0].split(";")[0]
+
+
+def brand_record(name: str, href: str) -> Optional[Dict[str, str]]:
+    """Формирует запись бренда из текста и адреса ссылки
+
+    Args:
+        name (str): Текст ссылки (без пробелов по краям)
+        href (str): Адрес ссылки
+
+    Returns:
+        Optional[Dict[str, str]]: Запись бренда или None, если ссылка не является брендом
+    """
+    # Пропускаем пустые или служебные элементы
+    if not name or len(name) > 50 or _is_skipped(name) or not href or ID_MARKER not in href:
+        return None
+
+    # Извлекаем ID бренда из URL
+    return {
+        "id": _extract_id(href, ID_MARKER),
+        "name": name
+    }
+
+
+def model_record(name: str, href: str, brand_id: str, min_length: int = 1) -> Optional[Dict[str, Any]]:
+    """Формирует запись модели из текста и адреса ссылки
+
+    Args:
+        name (str): Текст ссылки (без пробелов по краям)
+        href (str): Адрес ссылки
+        brand_id (str): ID бренда
+        min_length (int): Минимальная длина названия модели
+
+    Returns:
+        Optional[Dict[str, Any]]: Запись модели или None, если ссылка не является моделью
+    """
+    # Пропускаем неподходящие ссылки и текст в ВЕРХНЕМ РЕГИСТРЕ (вероятно, бренды)
+    if (not name or len(name) > 100 or len(name) < min_length or
+            _is_skipped(name) or name.upper() == name):
+        return None
+
+    # Ссылка должна содержать часть URL после названия бренда
+    marker = f"{ID_MARKER}{brand_id}-"
+    if marker not in href:
+        return None
+
+    model_id = _extract_id(href, marker)
+
+    # Извлекаем годы производства из названия модели
+    year_start = None
+    year_end = None
+    year_match = MODEL_YEARS_RE.search(name)
+    if year_match:
+        name = year_match.group(1).strip()
+        year_start = year_match.group(2)
+        year_end = None if year_match.group(3) == "-" else year_match.group(3)
+
+    return {
+        "id": model_id,
+        "name": name,
+        "year_start": year_start,
+        "year_end": year_end,
+        "body_type": None,
+        "code": None
+    }
+
+
+def is_engine_table(headers: Iterable[str]) -> bool:
+    """Проверяет по заголовкам, что таблица содержит двигатели
+
+    Args:
+        headers (Iterable[str]): Тексты заголовков таблицы в нижнем регистре
+
+    Returns:
+        bool: True для таблицы двигателей
+    """
+    joined = " ".join(headers)
+    return any(keyword in joined for keyword in ENGINE_HEADER_KEYWORDS)
+
+
+def engine_record(cells: List[str]) -> Optional[Dict[str, Any]]:
+    """Формирует запись двигателя из текстов ячеек строки таблицы
+
+    Args:
+        cells (List[str]): Тексты ячеек (без пробелов по краям)
+
+    Returns:
+        Optional[Dict[str, Any]]: Запись двигателя или None для пустой строки
+
+    Raises:
+        ValueError: Если значение ячейки не удается разобрать
+    """
+    def cell(index: int) -> str:
+        return cells[index] if len(cells) > index else ""
+
+    # Извлекаем данные из ячеек
+    engine_type = cell(0)
+    year_text = cell(1)
+    kw_text = cell(2)
+    hp_text = cell(3)
+    ccm_text = cell(4)
+    cylinders_text = cell(5)
+    fuel_type_text = cell(6)
+    engine_code = cell(7)
+
+    # Парсим значения
+    kw = int(kw_text) if kw_text and kw_text.isdigit() else None
+    hp = int(hp_text) if hp_text and hp_text.isdigit() else None
+
+    # Обработка ccm
+    ccm = None
+    if ccm_text:
+        if "." in ccm_text:
+            ccm = round(float(ccm_text) * 1000)
+        else:
+            ccm = int(ccm_text) if ccm_text.isdigit() else None
+
+    # Обработка количества цилиндров
+    cylinders = int(cylinders_text) if cylinders_text and cylinders_text.isdigit() else None
+
+    # Парсим годы производства
+    year_start = None
+    year_end = None
+    year_match = ENGINE_YEARS_RE.search(year_text)
+    if year_match:
+        year_start = year_match.group(1)
+        year_end = None if year_match.group(2) == "-" else year_match.group(2)
+
+    # Определяем тип топлива
+    if not fuel_type_text:
+        engine_type_lower = engine_type.lower()
+        fuel_type_text = "Diesel" if any(keyword in engine_type_lower for keyword in DIESEL_KEYWORDS) else "Benzina"
+
+    if not (engine_type or engine_code or kw or hp or ccm):
+        return None
+
+    return {
+        "code": engine_code or engine_type,
+        "kw": kw,
+        "hp": hp,
+        "ccm": ccm,
+        "cylinders": cylinders,
+        "fuelType": fuel_type_text,
+        "yearStart": year_start,
+        "yearEnd": year_end,
+        "description": engine_type
+    }
+
+
+def _engine_rows(rows: Iterable[List[str]]) -> List[Dict[str, Any]]:
+    """Разбирает строки таблицы двигателей, пропуская строки с ошибками
+
+    Args:
+        rows (Iterable[List[str]]): Тексты ячеек каждой строки
+
+    Returns:
+        List[Dict[str, Any]]: Список двигателей
+    """
+    engines = []
+    for cells in rows:
+        if len(cells) < 3:
+            continue
+        try:
+            engine = engine_record(cells)
+        except Exception as e:
+            print(f"Ошибка при обработке строки таблицы: {str(e)}")
+            continue
+        if engine is not None:
+            engines.append(engine)
+    return engines
+
+
+class SoupParser:
+    """Эталонный разбор страниц через BeautifulSoup (html.parser)"""
+
+    name = "soup"
+
+    def __init__(self):
+        # BeautifulSoup загружается только при выборе этого бэкенда
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+
+    def parse_brands(self, content: str) -> List[Dict[str, str]]:
+        """Извлекает бренды (id, name) со страницы брендов
+
+        Args:
+            content (str): HTML-код страницы
+
+        Returns:
+            List[Dict[str, str]]: Список брендов в порядке на странице
+        """
+        soup = self._soup(content, "html.parser")
+        brands = []
+        for link in soup.find_all("a", href=lambda href: href and LINK_MARKER in href):
+            brand = brand_record(link.get_text().strip(), link.get("href", ""))
+            if brand is not None:
+                brands.append(brand)
+        return brands
+
+    def parse_models(self, content: str, brand_id: str) -> List[Dict[str, Any]]:
+        """Извлекает модели бренда со страницы моделей
+
+        Args:
+            content (str): HTML-код страницы
+            brand_id (str): ID бренда
+
+        Returns:
+            List[Dict[str, Any]]: Список моделей в порядке на странице
+        """
+        soup = self._soup(content, "html.parser")
+        models = []
+
+        # Попытка 1: Ищем таблицы с моделями
+        for table in soup.find_all("table"):
+            for row in table.find_all("tr"):
+                for link in row.find_all("a", href=lambda href: href and LINK_MARKER in href):
+                    model = model_record(link.get_text().strip(), link.get("href", ""), brand_id)
+                    if model is not None:
+                        models.append(model)
+
+        # Попытка 2: Ищем ссылки в любых элементах страницы
+        if not models:
+            marker = f"{ID_MARKER}{brand_id}-"
+            for link in soup.find_all("a", href=lambda href: href and marker in href):
+                model = model_record(link.get_text().strip(), link.get("href", ""), brand_id, min_length=2)
+                if model is not None:
+                    models.append(model)
+
+        return models
+
+    def parse_engines(self, content: str) -> List[Dict[str, Any]]:
+        """Извлекает двигатели модели со страницы двигателей
+
+        Args:
+            content (str): HTML-код страницы
+
+        Returns:
+            List[Dict[str, Any]]: Список двигателей в порядке на странице
+        """
+        soup = self._soup(content, "html.parser")
+        engines = []
+
+        for table in soup.find_all("table"):
+            headers = [th.get_text().strip().lower() for th in table.find_all("th")]
+            if not is_engine_table(headers):
+                continue
+
+            # Пропускаем строку заголовка
+            rows = ([cell.get_text().strip() for cell in row.find_all("td")] for row in table.find_all("tr")[1:])
+            engines.extend(_engine_rows(rows))
+
+        return engines
+
+
+class LxmlParser:
+    """Быстрый разбор страниц через lxml; для моделей и двигателей разбирается только область таблиц"""
+
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.etree
+        import lxml.html
+        self._html = lxml.html
+        self._parser_error = lxml.etree.ParserError
+
+    def _document(self, content: str) -> Optional[Any]:
+        """Разбирает страницу целиком
+
+        Args:
+            content (str): HTML-код страницы
+
+        Returns:
+            Optional[Any]: Корневой элемент документа или None, если документ пуст
+        """
+        # Как и BeautifulSoup, пустую страницу и страницу с XML-объявлением разбираем без ошибки
+        content = _XML_DECLARATION_RE.sub("", content, count=1)
+        if not content.strip():
+            return None
+        try:
+            return self._html.document_fromstring(content)
+        except self._parser_error:
+            return None
+
+    def _tables_fragment(self, content: str) -> Optional[Any]:
+        """Разбирает участок страницы от первой <table> до последней </table>
+
+        Args:
+            content (str): HTML-код страницы
+
+        Returns:
+            Optional[Any]: Корневой элемент фрагмента или None, если таблиц нет
+        """
+        start = _TABLE_START_RE.search(content)
+        if start is None:
+            return None
+
+        end = None
+        for end in _TABLE_END_RE.finditer(content, start.start()):
+            pass
+        stop = end.end() if end is not None else len(content)
+
+        return self._html.fragment_fromstring(content[start.start():stop], create_parent="div")
+
+    @staticmethod
+    def _links(root: Any, marker: str) -> Iterable[Tuple[str, str]]:
+        """Возвращает (текст, адрес) ссылок, адрес которых содержит marker
+
+        Args:
+            root (Any): Элемент lxml
+            marker (str): Обязательная часть адреса
+
+        Returns:
+            Iterable[Tuple[str, str]]: Пары (текст без пробелов по краям, адрес)
+        """
+        for link in root.iter("a"):
+            href = link.get("href")
+            if href and marker in href:
+                yield link.text_content().strip(), href
+
+    def parse_brands(self, content: str) -> List[Dict[str, str]]:
+        """Извлекает бренды (id, name) со страницы брендов
+
+        Args:
+            content (str): HTML-код страницы
+
+        Returns:
+            List[Dict[str, str]]: Список брендов в порядке на странице
+        """
+        # Ссылки брендов разбросаны по странице, поэтому разбирается весь документ
+        root = self._document(content)
+        if root is None:
+            return []
+        brands = []
+        for name, href in self._links(root, LINK_MARKER):
+            brand = brand_record(name, href)
+            if brand is not None:
+                brands.append(brand)
+        return brands
+
+    def parse_models(self, content: str, brand_id: str) -> List[Dict[str, Any]]:
+        """Извлекает модели бренда со страницы моделей
+
+        Args:
+            content (str): HTML-код страницы
+            brand_id (str): ID бренда
+
+        Returns:
+            List[Dict[str, Any]]: Список моделей в порядке на странице
+        """
+        models = []
+
+        # Попытка 1: Ищем таблицы с моделями
+        fragment = self._tables_fragment(content)
+        if fragment is not None:
+            for table in fragment.iter("table"):
+                for row in table.iter("tr"):
+                    for name, href in self._links(row, LINK_MARKER):
+                        model = model_record(name, href, brand_id)
+                        if model is not None:
+                            models.append(model)
+
+        # Попытка 2: Ищем ссылки в любых элементах страницы
+        root = self._document(content) if not models else None
+        if root is not None:
+            for name, href in self._links(root, f"{ID_MARKER}{brand_id}-"):
+                model = model_record(name, href, brand_id, min_length=2)
+                if model is not None:
+                    models.append(model)
+
+        return models
+
+    def parse_engines(self, content: str) -> List[Dict[str, Any]]:
+        """Извлекает двигатели модели со страницы двигателей
+
+        Args:
+            content (str): HTML-код страницы
+
+        Returns:
+            List[Dict[str, Any]]: Список двигателей в порядке на странице
+        """
+        fragment = self._tables_fragment(content)
+        if fragment is None:
+            return []
+
+        engines = []
+        for table in fragment.iter("table"):
+            headers = [th.text_content().strip().lower() for th in table.iter("th")]
+            if not is_engine_table(headers):
+                continue
+
+            # Пропускаем строку заголовка
+            rows = ([cell.text_content().strip() for cell in row.iter("td")] for row in list(table.iter("tr"))[1:])
+            engines.extend(_engine_rows(rows))
+
+        return engines
+
+
+def create_page_parser(name: str) -> Any:
+    """Создает бэкенд разбора страниц по названию
+
+    Args:
+        name (str): Название бэкенда ('lxml' или 'soup')
+
+    Returns:
+        Any: Объект с методами parse_brands, parse_models и parse_engines
+    """
+    if name == "lxml":
+        return LxmlParser()
+    if name == "soup":
+        return SoupParser()
+    raise ValueError(f"Неизвестный бэкенд разбора страниц: {name}")
+
+
+# Бэкенды разбора, созданные в процессе-обработчике (по одному на название)
+_process_parsers: Dict[str, Any] = {}
+
+
+def parse_page_records(backend: str, kind: str, content: str, brand_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Разбирает страницу в процессе-обработчике пула (функция уровня модуля для передачи в пул)
+
+    Args:
+        backend (str): Название бэкенда разбора
+        kind (str): Тип страницы ('brands', 'models', 'engines')
+        content (str): HTML-код страницы
+        brand_id (Optional[str]): ID бренда для страницы моделей
+
+    Returns:
+        List[Dict[str, Any]]: Найденные записи без сортировки и ограничения количества
+    """
+    page_parser = _process_parsers.get(backend)
+    if page_parser is None:
+        page_parser = _process_parsers[backend] = create_page_parser(backend)
+
+    if kind == "brands":
+        return page_parser.parse_brands(content)
+    if kind == "models":
+        return page_parser.parse_models(content, brand_id)
+    return page_parser.parse_engines(content)
@@ -0,0 +1,576 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Конвейерный обход сайта elit.ro для режима 'full'.
+Стадии работают одновременно и связаны ограниченными очередями:
+потоки-загрузчики получают HTML страниц, пул процессов разбирает его на всех
+ядрах, а основной поток собирает результат и ставит новые задания загрузки.
+Переполненная очередь останавливает предыдущую стадию, а глубина очередей
+периодически выводится, чтобы подбирать число загрузчиков и процессов разбора.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+from urllib.parse import urlparse
+
+from elit_fetch import BrowserFetcher, CachingFetcher, Fetcher, create_fetcher
+from elit_parsers import parse_page_records
+from elit_throttle import AdaptiveThrottle, HostBudgetExceeded
+
+if TYPE_CHECKING:
+    from elit_parser import ElitRoParser
+
+
+class PipelineTask(NamedTuple):
+    """Задание загрузки страницы"""
+    kind: str
+    url: str
+    debug_name: str
+    brand_index: int = -1
+    model_index: int = -1
+    brand_id: Optional[str] = None
+
+
+class ThreadHostBudget:
+    """Бюджет запросов к хостам для потоков: минимальный интервал между запросами и общий лимит"""
+
+    def __init__(self, rate: float = 1.0, max_requests: Optional[int] = None,
+                 throttle: Optional[AdaptiveThrottle] = None):
+        """Инициализация бюджета
+
+        Args:
+            rate (float): Допустимое число запросов в секунду к одному хосту (0 - без ограничения)
+            max_requests (Optional[int]): Максимальное число запросов к одному хосту (None - без ограничения)
+            throttle (Optional[AdaptiveThrottle]): Регулятор частоты; если задан, интервал между
+                запросами берется из него, а rate не используется
+        """
+        self.rate = rate
+        self.max_requests = max_requests
+        self.throttle = throttle
+        self.counts: Dict[str, int] = {}
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _interval(self) -> float:
+        """Минимальный интервал между запросами к одному хосту в секундах"""
+        if self.throttle is not None:
+            return self.throttle.interval()
+        return 1.0 / self.rate if self.rate > 0 else 0.0
+
+    def acquire(self, url: str) -> None:
+        """Резервирует слот для запроса к хосту и ждет его наступления
+
+        Args:
+            url (str): URL запроса
+
+        Raises:
+            HostBudgetExceeded: Если лимит запросов к хосту исчерпан
+        """
+        host = urlparse(url).netloc
+
+        with self._lock:
+            count = self.counts.get(host, 0)
+            if self.max_requests is not None and count >= self.max_requests:
+                raise HostBudgetExceeded(f"Исчерпан лимит запросов к хосту {host}: {self.max_requests}")
+            self.counts[host] = count + 1
+
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self._interval()
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class PipelineCrawler:
+    """Обход брендов, моделей и двигателей конвейером загрузка -> разбор -> сборка"""
+
+    def __init__(self, parser: "ElitRoParser", fetchers: int = 2, parse_workers: Optional[int] = None,
+                 queue_size: int = 32, host_rate: float = 1.0, host_max_requests: Optional[int] = None,
+                 stats_interval: float = 10.0):
+        """Инициализация обходчика
+
+        Args:
+            parser (ElitRoParser): Парсер, предоставляющий URL, загрузчики, отбор записей и лимиты
+            fetchers (int): Количество потоков-загрузчиков (у каждого свой браузер или HTTP-клиент)
+            parse_workers (Optional[int]): Количество процессов разбора (None - по числу ядер,
+                0 - разбор в потоке конвейера без пула процессов)
+            queue_size (int): Размер очередей между стадиями
+            host_rate (float): Допустимое число запросов в секунду к одному хосту
+            host_max_requests (Optional[int]): Максимальное число запросов к одному хосту
+            stats_interval (float): Интервал вывода глубины очередей в секундах (0 - не выводить)
+        """
+        self.parser = parser
+        self.fetchers = max(1, fetchers)
+        self.parse_workers = (os.cpu_count() or 1) if parse_workers is None else max(0, parse_workers)
+        self.queue_size = max(1, queue_size)
+        self.host_rate = host_rate
+        self.host_max_requests = host_max_requests
+        self.stats_interval = stats_interval
+        self.stats: Dict[str, Any] = {}
+
+        # Задания загрузки ставит только сборщик, поэтому их очередь не ограничена:
+        # иначе сборщик и загрузчики могли бы ждать друг друга
+        self.tasks: "queue.Queue[Optional[PipelineTask]]" = queue.Queue()
+        self.pages: "queue.Queue[Optional[Tuple[PipelineTask, Optional[str], Optional[BaseException]]]]" = \
+            queue.Queue(maxsize=self.queue_size)
+        self.parsed: "queue.Queue[Tuple[PipelineTask, Optional[List[Dict[str, Any]]], Optional[BaseException]]]" = \
+            queue.Queue(maxsize=self.queue_size)
+
+        self._budget: Optional[ThreadHostBudget] = None
+        self._stop = threading.Event()
+        # Первая ошибка, завершившая поток стадии; сборщик передает ее вызывающему
+        self._failure: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self._parsing = 0
+        self._parse_slots = threading.Semaphore(max(1, self.parse_workers) * 2)
+        self._fetch_stats: Dict[str, int] = {}
+
+        self._brands: List[Dict[str, str]] = []
+        self._models: Dict[int, List[Dict[str, Any]]] = {}
+        self._engines: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+        self._outstanding = 0
+        # Результаты загруженных URL и задания-повторы, ждущие первой загрузки (по ключу границы обхода)
+        self._done: Dict[int, Tuple[Optional[List[Dict[str, Any]]], Optional[BaseException]]] = {}
+        self._waiters: Dict[int, List[PipelineTask]] = {}
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        """Ставит элемент в ограниченную очередь, ожидая места; прерывается при остановке конвейера"""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue) -> Any:
+        """Берет элемент из очереди; при остановке конвейера возвращает None"""
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def _run_stage(self, target: Callable[..., None], *args: Any) -> None:
+        """Выполняет цикл стадии в потоке; ошибка стадии запоминается и останавливает конвейер"""
+        try:
+            target(*args)
+        except BaseException as e:
+            with self._lock:
+                if self._failure is None:
+                    self._failure = e
+            self._stop.set()
+
+    def _next_parsed(self, parse_thread: threading.Thread) -> Tuple[PipelineTask, Optional[List[Dict[str, Any]]],
+                                                                    Optional[BaseException]]:
+        """Ждет результат разбора, пока стадии конвейера работают
+
+        Raises:
+            RuntimeError: Поток разбора завершился без ошибки, не передав ожидаемые результаты
+        """
+        while True:
+            try:
+                return self.parsed.get(timeout=0.1)
+            except queue.Empty:
+                pass
+            if self._failure is not None:
+                raise self._failure
+            if not parse_thread.is_alive():
+                raise RuntimeError("Поток разбора конвейера завершился раньше времени")
+
+    def _add_stat(self, name: str, value: float) -> None:
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + value
+
+    def _create_fetcher(self) -> Fetcher:
+        """Создает загрузчик для потока; без кэша бэкенд 'browser' получает собственный браузер"""
+        fetcher = create_fetcher(self.parser.fetch_backend, self.parser.CONTEXT_OPTIONS, self.parser.load_profile,
+                                 cache=self.parser.cache, replay=self.parser.replay, metrics=self.parser.metrics,
+                                 recycle=self.parser.recycle, memory=self.parser.memory)
+        if fetcher is None:
+            fetcher = BrowserFetcher(self.parser.CONTEXT_OPTIONS, self.parser.load_profile,
+                                     self.parser.recycle, self.parser.memory)
+        return fetcher
+
+    def _fetch_loop(self) -> None:
+        """Стадия загрузки: берет задания и передает HTML страниц на разбор"""
+        fetcher = self._create_fetcher()
+        try:
+            while True:
+                task = self._get(self.tasks)
+                if task is None:
+                    break
+
+                started = time.perf_counter()
+                content, error = self._fetch_with_retries(fetcher, task)
+                self._add_stat("fetch_seconds", time.perf_counter() - started)
+                self._add_stat("fetched", 1)
+
+                if content is not None:
+                    reason = self.parser.artifacts.decide(task.debug_name)
+                    if reason:
+                        self.parser.artifacts.submit(task.debug_name, reason, html=content)
+
+                if not self._put(self.pages, (task, content, error)):
+                    break
+        finally:
+            for name, count in getattr(fetcher, "stats", {}).items():
+                with self._lock:
+                    self._fetch_stats[name] = self._fetch_stats.get(name, 0) + count
+            fetcher.close()
+
+    def _fetch_with_retries(self, fetcher: Fetcher, task: PipelineTask) -> Tuple[Optional[str], Optional[BaseException]]:
+        """Загружает страницу задания, повторяя временные ошибки по политике парсера
+
+        Returns:
+            Tuple[Optional[str], Optional[BaseException]]: HTML-код страницы или последняя ошибка
+        """
+        parser = self.parser
+        context = {"brand_id": task.brand_id} if task.brand_id else {}
+        # Свежая копия из кэша не расходует бюджет хоста и не влияет на регулятор частоты
+        entry = None
+        if isinstance(fetcher, CachingFetcher):
+            content, entry = fetcher.lookup(task.url)
+            if content is not None:
+                parser.metrics.count("pages")
+                return content, None
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                if self._budget is not None:
+                    self._budget.acquire(task.url)
+                print(f"Переходим на URL: {task.url}")
+                parser.retry.record_request()
+                started = time.perf_counter()
+                with parser.metrics.stage(f"load_{task.kind}"):
+                    if isinstance(fetcher, CachingFetcher):
+                        content = fetcher.refresh(task.url, task.kind, entry, **context)
+                    else:
+                        content = fetcher.fetch(task.url, task.kind, **context)
+            except Exception as e:
+                parser.artifacts.error(task.debug_name, e)
+                delay = parser.retry_after_error(task.url, attempt, e)
+                # Ожидание повтора прерывается при остановке конвейера
+                if delay is None or self._stop.wait(delay):
+                    return None, e
+                continue
+
+            parser.throttle.on_success(time.perf_counter() - started)
+            parser.metrics.count("pages")
+            return content, None
+
+    def _parse_loop(self, pool: Optional[ProcessPoolExecutor]) -> None:
+        """Стадия разбора: передает HTML в пул процессов, не более двух страниц на процесс одновременно"""
+        backend = self.parser.parser_backend
+        while True:
+            item = self._get(self.pages)
+            if item is None:
+                break
+
+            task, content, error = item
+            if error is not None:
+                if not self._put(self.parsed, (task, None, error)):
+                    break
+                continue
+
+            if pool is None:
+                started = time.perf_counter()
+                try:
+                    records, error = parse_page_records(backend, task.kind, content, task.brand_id), None
+                except Exception as e:
+                    records, error = None, e
+                self._add_stat("parse_seconds", time.perf_counter() - started)
+                self.parser.metrics.observe(f"parse_{task.kind}", time.perf_counter() - started)
+                self._finish_parse(task, content, records, error)
+                continue
+
+            # Ожидание свободного слота останавливает чтение очереди HTML,
+            # а переполненная очередь HTML останавливает загрузчики
+            while not self._parse_slots.acquire(timeout=0.1):
+                if self._stop.is_set():
+                    return
+            with self._lock:
+                self._parsing += 1
+            started = time.perf_counter()
+            future = pool.submit(parse_page_records, backend, task.kind, content, task.brand_id)
+            future.add_done_callback(lambda f, t=task, c=content, s=started: self._on_parsed(t, c, s, f))
+
+    def _on_parsed(self, task: PipelineTask, content: str, started: float, future: Future) -> None:
+        """Принимает результат разбора из пула процессов (время разбора включает ожидание в пуле)"""
+        self._add_stat("parse_seconds", time.perf_counter() - started)
+        self.parser.metrics.observe(f"parse_{task.kind}", time.perf_counter() - started)
+        try:
+            if future.cancelled():
+                return
+            error = future.exception()
+            self._finish_parse(task, content, None if error is not None else future.result(), error)
+        finally:
+            with self._lock:
+                self._parsing -= 1
+            self._parse_slots.release()
+
+    def _finish_parse(self, task: PipelineTask, content: str, records: Optional[List[Dict[str, Any]]],
+                      error: Optional[BaseException]) -> None:
+        """Сохраняет отладочные данные неудачного разбора и передает результат сборщику"""
+        self._add_stat("parsed", 1)
+        self.parser.report_parse_result(task.debug_name, content, records, error)
+        self._put(self.parsed, (task, records, error))
+
+    def _monitor_loop(self) -> None:
+        """Замеряет глубину очередей и периодически выводит ее"""
+        samples = 0
+        totals = {"tasks": 0, "pages": 0, "parsing": 0, "parsed": 0}
+        peaks = dict(totals)
+        last_report = time.monotonic()
+
+        while not self._stop.wait(0.1):
+            with self._lock:
+                depths = {
+                    "tasks": self.tasks.qsize(),
+                    "pages": self.pages.qsize(),
+                    "parsing": self._parsing,
+                    "parsed": self.parsed.qsize()
+                }
+            samples += 1
+            for name, depth in depths.items():
+                totals[name] += depth
+                peaks[name] = max(peaks[name], depth)
+
+            if self.stats_interval and time.monotonic() - last_report >= self.stats_interval:
+                last_report = time.monotonic()
+                print(f"Очереди конвейера: загрузка {depths['tasks']}, "
+                      f"HTML {depths['pages']}/{self.queue_size}, разбор {depths['parsing']}, "
+                      f"сборка {depths['parsed']}/{self.queue_size}")
+
+        with self._lock:
+            self.stats["queue_peak"] = peaks
+            self.stats["queue_mean"] = {name: round(total / samples, 2) if samples else 0
+                                        for name, total in totals.items()}
+
+    def _schedule(self, task: PipelineTask) -> None:
+        """Ставит задание загрузки; повтор уже запланированного URL ждет результата первой загрузки"""
+        frontier = self.parser.frontier
+        if frontier is not None and task.kind != "brands" and not frontier.claim(task.url):
+            key = frontier.key(task.url)
+            if key in self._done:
+                records, error = self._done[key]
+                self._collect(task, list(records) if records is not None else None, error, None)
+            else:
+                self._waiters.setdefault(key, []).append(task)
+            return
+
+        self._outstanding += 1
+        self.tasks.put(task)
+
+    def _complete(self, task: PipelineTask, records: Optional[List[Dict[str, Any]]],
+                  error: Optional[BaseException]) -> None:
+        """Отмечает URL загруженным и передает результат заданиям-повторам"""
+        frontier = self.parser.frontier
+        if frontier is None or task.kind == "brands":
+            return
+
+        key = frontier.key(task.url)
+        if error is None:
+            frontier.complete(task.url, task.kind, records)
+        self._done[key] = (records, error)
+        for waiter in self._waiters.pop(key, []):
+            self._collect(waiter, list(records) if records is not None else None, error, None)
+
+    def _start_brands(self, brands: List[Dict[str, str]]) -> None:
+        """Передает бренды в поток и ставит задания загрузки моделей"""
+        journal = self.parser.journal
+        stream = self.parser.stream
+        self._brands = brands
+
+        # Бренды передаются в поток сразу, в исходном порядке
+        if stream is not None:
+            for brand in brands:
+                stream.add_brand(brand)
+
+        for index, brand in enumerate(brands):
+            models = journal.get_models(brand["id"]) if journal is not None else None
+            if models is not None:
+                self._start_models(index, models)
+                continue
+
+            print(f"Получение моделей для бренда {brand['name']} ({brand['id']})...")
+            self._schedule(PipelineTask("models", self.parser.models_url(brand["id"]), f"models_{brand['id']}",
+                                        brand_index=index, brand_id=brand["id"]))
+
+    def _start_models(self, brand_index: int, models: List[Dict[str, Any]]) -> None:
+        """Передает модели бренда в поток и ставит задания загрузки двигателей"""
+        journal = self.parser.journal
+        stream = self.parser.stream
+        brand = self._brands[brand_index]
+        self._models[brand_index] = models
+
+        for model_index, model in enumerate(models):
+            if stream is not None:
+                stream.add_model(brand, model)
+
+            engines = journal.get_engines(brand["id"], model["id"]) if journal is not None else None
+            if engines is not None:
+                self._finish_engines(brand_index, model_index, engines)
+                continue
+
+            self._schedule(PipelineTask("engines", self.parser.engines_url(model["id"]), f"engines_{model['id']}",
+                                        brand_index=brand_index, model_index=model_index))
+
+    def _finish_engines(self, brand_index: int, model_index: int, engines: List[Dict[str, Any]]) -> None:
+        """Сохраняет двигатели модели (в потоке NDJSON - сразу записывает)"""
+        stream = self.parser.stream
+        if stream is not None:
+            stream.add_engines(self._brands[brand_index], self._models[brand_index][model_index], engines)
+            engines = []
+        self._engines[(brand_index, model_index)] = engines
+
+    def _collect(self, task: PipelineTask, records: Optional[List[Dict[str, Any]]],
+                 error: Optional[BaseException], brands_filter: Optional[List[str]]) -> None:
+        """Стадия сборки: обрабатывает результат разбора одной страницы
+
+        Ошибка страницы брендов прерывает обход; ошибка страницы моделей оставляет
+        у бренда пустой список, ошибка страницы двигателей - у модели.
+        """
+        journal = self.parser.journal
+
+        if task.kind == "brands":
+            if error is not None:
+                raise error
+            brands = self.parser.filter_brands(self.parser.select_brands(records), brands_filter)
+            if journal is not None:
+                journal.record_brands(brands)
+            self._start_brands(brands)
+
+        elif task.kind == "models":
+            brand = self._brands[task.brand_index]
+            if error is not None:
+                print(f"{brand['name']}: ошибка при получении моделей: {error}")
+                self.parser.failures.add("models", task.url, error, brand=brand["name"])
+                self._models[task.brand_index] = []
+                return
+            models = self.parser.select_models(records, brand["name"])[:self.parser.max_models]
+            if journal is not None:
+                journal.record_models(brand["id"], models)
+            self._start_models(task.brand_index, models)
+
+        else:
+            brand = self._brands[task.brand_index]
+            model = self._models[task.brand_index][task.model_index]
+            if error is not None:
+                print(f"    {brand['name']} / {model['name']}: ошибка при получении двигателей: {error}")
+                self.parser.failures.add("engines", task.url, error, brand=brand["name"], model=model["name"])
+                self._engines[(task.brand_index, task.model_index)] = []
+                return
+
+            engines = self.parser.select_engines(records, model["name"])[:self.parser.max_engines]
+            if journal is not None:
+                journal.record_engines(brand["id"], model["id"], engines)
+            print(f"    {brand['name']} / {model['name']}: получено двигателей: {len(engines)}")
+            self._finish_engines(task.brand_index, task.model_index, engines)
+
+    def run(self, brands_filter: Optional[List[str]] = None,
+            brands: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """Выполняет полный обход сайта
+
+        Args:
+            brands_filter (Optional[List[str]]): Список брендов для фильтрации
+            brands (Optional[List[Dict[str, str]]]): Готовый список брендов (страница брендов не загружается)
+
+        Returns:
+            Dict[str, Any]: Результат в формате бренд -> модели -> двигатели
+        """
+        if not self.parser.replay:
+            self._budget = ThreadHostBudget(self.host_rate, self.host_max_requests, throttle=self.parser.throttle)
+
+        # Процессы разбора запускаются через spawn: fork процесса с потоками браузера небезопасен
+        pool = None
+        if self.parse_workers > 0:
+            pool = ProcessPoolExecutor(max_workers=self.parse_workers,
+                                       mp_context=multiprocessing.get_context("spawn"))
+
+        print(f"Конвейер: загрузчиков {self.fetchers}, процессов разбора {self.parse_workers}, "
+              f"размер очередей {self.queue_size}")
+        started = time.perf_counter()
+
+        fetch_threads = [threading.Thread(target=self._run_stage, args=(self._fetch_loop,),
+                                          name=f"elit-fetch-{i}", daemon=True) for i in range(self.fetchers)]
+        parse_thread = threading.Thread(target=self._run_stage, args=(self._parse_loop, pool), name="elit-parse",
+                                        daemon=True)
+        monitor_thread = threading.Thread(target=self._monitor_loop, name="elit-monitor", daemon=True)
+        for thread in fetch_threads + [parse_thread, monitor_thread]:
+            thread.start()
+
+        try:
+            journal = self.parser.journal
+            brands_preset = brands
+            brands = journal.get_brands() if journal is not None else None
+            if brands is None and brands_preset is not None:
+                brands = self.parser.filter_brands(brands_preset, brands_filter)
+                if journal is not None:
+                    journal.record_brands(brands)
+            if brands is None:
+                print("Начинаем получение брендов...")
+                self._schedule(PipelineTask("brands", self.parser.brands_url(), "brands_page"))
+            else:
+                self._start_brands(brands)
+
+            while self._outstanding:
+                task, records, error = self._next_parsed(parse_thread)
+                self._outstanding -= 1
+                self._collect(task, records, error, brands_filter)
+                self._complete(task, records, error)
+        finally:
+            # Загрузчики завершаются по пустым заданиям; при ошибке стадии прерываются сразу
+            if self._outstanding:
+                self._stop.set()
+            for _ in fetch_threads:
+                self.tasks.put(None)
+            for thread in fetch_threads:
+                thread.join()
+            self._put(self.pages, None)
+            parse_thread.join()
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+            self._stop.set()
+            monitor_thread.join()
+            self._report(time.perf_counter() - started)
+
+        stream = self.parser.stream
+        if stream is not None:
+            # Результат уже записан в поток и в памяти не хранится
+            return {}
+        if journal is not None:
+            # Итоговый результат собирается из журнала, включая единицы прошлых запусков
+            return journal.build_result(self.parser.brand_entry, self.parser.model_entry)
+
+        brand_results = []
+        for brand_index in range(len(self._brands)):
+            models = self._models.get(brand_index, [])
+            brand_results.append([(model, self._engines.get((brand_index, model_index), []))
+                                  for model_index, model in enumerate(models)])
+        return self.parser.assemble_result(self._brands, brand_results)
+
+    def _report(self, elapsed: float) -> None:
+        """Выводит итоговую статистику стадий конвейера"""
+        stats = self.stats
+        peak = stats.get("queue_peak", {})
+        mean = stats.get("queue_mean", {})
+        print(f"Конвейер: {elapsed:.1f} с, загружено страниц {int(stats.get('fetched', 0))} "
+              f"(время загрузчиков {stats.get('fetch_seconds', 0.0):.1f} с), "
+              f"разобрано {int(stats.get('parsed', 0))} (время разбора {stats.get('parse_seconds', 0.0):.1f} с)")
+        if peak:
+            print("Глубина очередей (средняя / максимальная): " + ", ".join(
+                f"{name} {mean.get(name, 0)} / {peak[name]}" for name in ("tasks", "pages", "parsing", "parsed")))
+        if self._fetch_stats:
+            print(f"Загружено страниц по способам: {self._fetch_stats}")
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Сверка результатов парсера elit.ro со справочником моделей csv.csv и cars_fixed.csv.
+Названия брендов и моделей приводятся к ключам (латиница в верхнем регистре
+без пунктуации, без кузова в скобках и слов 'series'/'class'), ключи
+хешируются в 64-битные числа, и таблицы соединяются хеш-соединением pandas
+без циклов по строкам. Модель сайта сначала ищется по полному ключу, затем
+по семейству (первое слово: 'GOLF IV' -> 'GOLF'). Результат - наборы
+совпавших, новых, отсутствующих на сайте моделей и моделей с расходящимися
+годами выпуска, а также порядок обхода с популярными моделями в начале.
+
+PopularityIndex использует те же ключи без pandas, чтобы парсер мог
+обходить популярные модели первыми (ключ --popular-csv).
+"""
+
+import argparse
+import csv
+import re
+import time
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Справочники лежат в корне приложения
+CATALOG_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_CSV = CATALOG_DIR / "csv.csv"
+DEFAULT_FIXED_CSV = CATALOG_DIR / "cars_fixed.csv"
+
+# Кузов или код поколения в скобках и слова, которых нет в названиях справочника
+_PARENS_RE = r"\([^)]*\)"
+_NOISE_WORDS_RE = r"\b(?:SERIES|SERIE|CLASS|CLASSE|KLASSE)\b"
+_NON_ALNUM_RE = r"[^A-Z0-9]+"
+
+# Названия брендов на сайте, отличающиеся от справочника (после приведения к ключу)
+BRAND_ALIASES = {
+    "MERCEDESBENZ": "MERCEDES",
+    "VW": "VOLKSWAGEN",
+    "LADA": "VAZ",
+    "ROLLSROYCEMOTORCARS": "ROLLSROYCE"
+}
+
+
+def _ascii_upper(text: str) -> str:
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").upper()
+
+
+def brand_key(name: str) -> str:
+    """Возвращает ключ бренда для сопоставления ('Mercedes-Benz' -> 'MERCEDES')"""
+    key = re.sub(_NON_ALNUM_RE, "", _ascii_upper(name))
+    return BRAND_ALIASES.get(key, key)
+
+
+def model_keys(name: str) -> Tuple[str, str]:
+    """Возвращает полный ключ модели и ключ семейства
+
+    Args:
+        name (str): Название модели ('GOLF IV (1J1)', '3 series', 'A-class')
+
+    Returns:
+        Tuple[str, str]: Полный ключ ('GOLFIV') и семейство ('GOLF')
+    """
+    text = re.sub(_NOISE_WORDS_RE, " ", re.sub(_PARENS_RE, " ", _ascii_upper(name)))
+    words = [word for word in re.split(_NON_ALNUM_RE, text) if word]
+    return "".join(words), words[0] if words else ""
+
+
+class PopularityIndex:
+    """Популярные модели из cars_fixed.csv для выбора порядка обхода (без pandas)"""
+
+    def __init__(self, path: str = str(DEFAULT_FIXED_CSV)):
+        """Загружает популярные модели
+
+        Args:
+            path (str): Путь к cars_fixed.csv (столбцы brand, model, ..., is_popular)
+        """
+        self.models: Set[Tuple[str, str]] = set()
+        self.brands: Dict[str, int] = {}
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                if str(row.get("is_popular", "")).strip() != "1":
+                    continue
+                brand = brand_key(row["brand"])
+                self.models.add((brand, model_keys(row["model"])[0]))
+                self.brands[brand] = self.brands.get(brand, 0) + 1
+
+    def is_popular(self, brand_name: str, model_name: str) -> bool:
+        """Проверяет, популярна ли модель (по полному ключу или семейству)"""
+        brand = brand_key(brand_name)
+        full, family = model_keys(model_name)
+        return (brand, full) in self.models or (brand, family) in self.models
+
+    def rank_models(self, brand_name: str, models: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Переставляет популярные модели в начало, сохраняя порядок внутри групп"""
+        return sorted(models, key=lambda model: not self.is_popular(brand_name, model["name"]))
+
+    def rank_brands(self, brands: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Переставляет бренды по числу популярных моделей (по убыванию), сохраняя порядок при равенстве"""
+        return sorted(brands, key=lambda brand: -self.brands.get(brand_key(brand["name"]), 0))
+
+
+def _require_pandas():
+    try:
+        import pandas
+    except ImportError:
+        raise RuntimeError("Для сверки со справочником установите пакет pandas")
+    return pandas
+
+
+def _map_unique(series: "pd.Series", transform: Any) -> "pd.Series":
+    """Применяет векторное преобразование только к различным значениям столбца
+
+    Бренды и годы в таблицах повторяются тысячи раз, поэтому строковые
+    операции выполняются над уникальными значениями, а результат
+    раскладывается по строкам по кодам factorize().
+    """
+    pd = _require_pandas()
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    mapped = transform(pd.Series(uniques, dtype=object))
+    return pd.Series(mapped.to_numpy()[codes], index=series.index)
+
+
+def add_keys(frame: "pd.DataFrame", brand_column: str = "brand", model_column: str = "model") -> "pd.DataFrame":
+    """Добавляет векторно вычисленные ключи бренда и модели (те же, что brand_key() и model_keys())
+
+    Добавляются столбцы brand_key, model_key, family_key и 64-битные хеши
+    key_hash (бренд + модель) и family_hash (бренд + семейство) для соединения.
+
+    Args:
+        frame (pd.DataFrame): Таблица с названиями брендов и моделей
+        brand_column (str): Столбец бренда
+        model_column (str): Столбец модели
+
+    Returns:
+        pd.DataFrame: Та же таблица с ключами
+    """
+    pd = _require_pandas()
+
+    def ascii_upper(series: "pd.Series") -> "pd.Series":
+        return (series.fillna("").astype(str).str.normalize("NFKD")
+                .str.encode("ascii", "ignore").str.decode("ascii").str.upper())
+
+    def brand_keys(series: "pd.Series") -> "pd.Series":
+        return ascii_upper(series).str.replace(_NON_ALNUM_RE, "", regex=True).replace(BRAND_ALIASES)
+
+    def model_words(series: "pd.Series") -> "pd.Series":
+        return (ascii_upper(series)
+                .str.replace(_PARENS_RE, " ", regex=True)
+                .str.replace(_NOISE_WORDS_RE, " ", regex=True)
+                .str.replace(_NON_ALNUM_RE, " ", regex=True)
+                .str.strip())
+
+    frame["brand_key"] = _map_unique(frame[brand_column], brand_keys)
+    text = _map_unique(frame[model_column], model_words)
+    frame["model_key"] = text.str.replace(" ", "", regex=False)
+    frame["family_key"] = text.str.partition(" ")[0]
+
+    frame["key_hash"] = pd.util.hash_pandas_object(frame["brand_key"] + "|" + frame["model_key"], index=False).to_numpy()
+    frame["family_hash"] = pd.util.hash_pandas_object(frame["brand_key"] + "|" + frame["family_key"],
+                                                      index=False).to_numpy()
+    return frame
+
+
+def parse_years(series: "pd.Series", pivot: Optional[int] = None) -> "pd.Series":
+    """Векторно приводит годы ('01/94', '94', '2003', '-') к числам так же, как normalize_year()
+
+    Args:
+        series (pd.Series): Значения годов
+        pivot (Optional[int]): Двузначные годы не больше этого значения относятся к 2000-м
+            (по умолчанию - следующий год)
+
+    Returns:
+        pd.Series: Годы (пропуск - открытый диапазон или нераспознанное значение)
+    """
+    pd = _require_pandas()
+    if pivot is None:
+        pivot = (datetime.now().year + 1) % 100
+    digits = _map_unique(series, lambda values: values.astype("string").str.strip()
+                         .str.extract(r"^(?:\d{1,2}/)?(\d{2}|\d{4})$")[0])
+    years = pd.to_numeric(digits, errors="coerce").astype("Int64")
+    short = years < 100
+    return years.mask(short & (years <= pivot), years + 2000).mask(short & (years > pivot), years + 1900)
+
+
+def load_reference(csv_path: str = str(DEFAULT_CSV), fixed_path: str = str(DEFAULT_FIXED_CSV)) -> "pd.DataFrame":
+    """Загружает справочник: годы из csv.csv ('-' - выпускается до сих пор), страна и популярность из cars_fixed.csv
+
+    Args:
+        csv_path (str): Путь к csv.csv (бренд;модель;год начала;год окончания, без заголовка)
+        fixed_path (str): Путь к cars_fixed.csv
+
+    Returns:
+        pd.DataFrame: Модели справочника с ключами, годами, страной и популярностью
+    """
+    pd = _require_pandas()
+    reference = pd.read_csv(csv_path, sep=";", header=None, names=["brand", "model", "year_from", "year_to"],
+                            dtype=str, keep_default_na=False)
+    reference["year_from"] = parse_years(reference["year_from"])
+    reference["year_to"] = parse_years(reference["year_to"])
+    add_keys(reference)
+
+    fixed = pd.read_csv(fixed_path, dtype=str, keep_default_na=False)
+    fixed["is_popular"] = pd.to_numeric(fixed["is_popular"], errors="coerce").fillna(0).astype(int)
+    add_keys(fixed)
+    fixed = fixed.drop_duplicates("key_hash")[["key_hash", "country", "is_popular"]]
+
+    reference = reference.drop_duplicates("key_hash").merge(fixed, on="key_hash", how="left")
+    reference["is_popular"] = reference["is_popular"].fillna(0).astype(int)
+    return reference
+
+
+def scraped_frame(result: Dict[str, Any]) -> "pd.DataFrame":
+    """Разворачивает результат парсера (бренд -> модели) в таблицу моделей
+
+    Args:
+        result (Dict[str, Any]): Результат в формате выходного JSON парсера
+
+    Returns:
+        pd.DataFrame: Модели с ключами, годами выпуска и количеством двигателей
+    """
+    pd = _require_pandas()
+    rows = [
+        (brand_name, model_name, (model_data.get("info") or {}).get("yearStart"),
+         (model_data.get("info") or {}).get("yearEnd"), len(model_data.get("engines") or []))
+        for brand_name, brand_data in result.items()
+        for model_name, model_data in (brand_data.get("models") or {}).items()
+    ]
+    frame = pd.DataFrame(rows, columns=["brand", "model", "year_start", "year_end", "engines"])
+    frame["position"] = range(len(frame))
+    frame["year_start"] = parse_years(frame["year_start"])
+    frame["year_end"] = parse_years(frame["year_end"])
+    return add_keys(frame)
+
+
+def reconcile(scraped: "pd.DataFrame", reference: "pd.DataFrame", tolerance: int = 1,
+              all_brands: bool = False) -> Dict[str, "pd.DataFrame"]:
+    """Сопоставляет модели сайта со справочником
+
+    Модель сайта сопоставляется с моделью справочника по полному ключу, а при
+    его отсутствии - по семейству. Годы расходятся, если диапазон сайта не
+    укладывается в диапазон справочника с допуском tolerance лет.
+
+    Args:
+        scraped (pd.DataFrame): Модели сайта (scraped_frame())
+        reference (pd.DataFrame): Справочник (load_reference())
+        tolerance (int): Допуск сравнения годов в годах
+        all_brands (bool): Считать отсутствующими модели всех брендов справочника
+            (по умолчанию - только брендов, найденных на сайте)
+
+    Returns:
+        Dict[str, pd.DataFrame]: Наборы matched, conflicts, new, missing и crawl_order
+    """
+    pd = _require_pandas()
+    ref = reference[["key_hash", "brand", "model", "year_from", "year_to", "country", "is_popular"]].rename(
+        columns={"brand": "ref_brand", "model": "ref_model"})
+
+    exact = scraped.merge(ref, on="key_hash", how="left")
+    exact["match"] = exact["ref_model"].notna().map({True: "model", False: None})
+
+    # Второй проход только для несовпавших: семейство сайта против полного ключа справочника
+    unmatched = exact["ref_model"].isna()
+    family = (exact.loc[unmatched, scraped.columns]
+              .merge(ref.rename(columns={"key_hash": "family_hash"}), on="family_hash", how="left"))
+    family["match"] = family["ref_model"].notna().map({True: "family", False: None})
+    joined = pd.concat([exact[~unmatched], family], ignore_index=True).sort_values("position", kind="stable")
+    joined["is_popular"] = joined["is_popular"].astype("Int64")
+
+    found = joined["ref_model"].notna()
+    late_start = joined["year_start"] < joined["year_from"] - tolerance
+    ends_after = joined["year_to"].notna() & (
+        joined["year_end"].isna() | (joined["year_end"] > joined["year_to"] + tolerance))
+    conflict = found & (late_start | ends_after).fillna(False)
+
+    columns = ["brand", "model", "year_start", "year_end", "engines", "match",
+               "ref_brand", "ref_model", "year_from", "year_to", "country", "is_popular"]
+    matched = joined.loc[found & ~conflict, columns]
+    conflicts = joined.loc[conflict, columns]
+    new = joined.loc[~found, ["brand", "model", "year_start", "year_end", "engines"]].copy()
+    new["brand_known"] = joined.loc[~found, "brand_key"].isin(reference["brand_key"]).to_numpy()
+
+    # Отсутствующие на сайте: модели справочника, с которыми не совпала ни одна модель сайта
+    hit = pd.concat([exact.loc[~unmatched, "key_hash"], family.loc[family["ref_model"].notna(), "family_hash"]])
+    missing = reference[~reference["key_hash"].isin(hit)]
+    if not all_brands:
+        missing = missing[missing["brand_key"].isin(scraped["brand_key"])]
+    missing = missing[["brand", "model", "year_from", "year_to", "country", "is_popular"]]
+
+    # Порядок обхода: популярные модели первыми, затем бренды с большим числом популярных моделей
+    order = joined[["brand", "model", "position", "brand_key", "is_popular"]].copy()
+    order["is_popular"] = order["is_popular"].fillna(0).astype(int)
+    brand_weight = reference.groupby("brand_key")["is_popular"].sum()
+    order["brand_popular"] = order["brand_key"].map(brand_weight).fillna(0).astype(int)
+    crawl_order = (order.sort_values(["is_popular", "brand_popular", "position"], ascending=[False, False, True],
+                                     kind="stable")[["brand", "model", "is_popular"]])
+
+    return {"matched": matched, "conflicts": conflicts, "new": new, "missing": missing, "crawl_order": crawl_order}
+
+
+def write_report(sets: Dict[str, "pd.DataFrame"], output_dir: str) -> List[Path]:
+    """Записывает наборы сверки в CSV-файлы <output_dir>/<набор>.csv
+
+    Args:
+        sets (Dict[str, pd.DataFrame]): Наборы, полученные от reconcile()
+        output_dir (str): Каталог отчета
+
+    Returns:
+        List[Path]: Пути записанных файлов
+    """
+    directory = Path(output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, frame in sets.items():
+        path = directory / f"{name}.csv"
+        frame.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def main():
+    """Сверка результата парсера со справочником из командной строки"""
+    from elit_loader import read_result
+
+    parser = argparse.ArgumentParser(description="Сверка результатов парсера elit.ro со справочником моделей")
+    parser.add_argument("input", help="JSON-файл парсера или NDJSON-поток (.ndjson)")
+    parser.add_argument("--csv", default=str(DEFAULT_CSV), help="Справочник моделей с годами (csv.csv)")
+    parser.add_argument("--fixed-csv", default=str(DEFAULT_FIXED_CSV),
+                        help="Справочник со страной и популярностью (cars_fixed.csv)")
+    parser.add_argument("--output-dir", default="reconcile", help="Каталог CSV-файлов с наборами сверки")
+    parser.add_argument("--tolerance", type=int, default=1, help="Допуск сравнения годов выпуска в годах")
+    parser.add_argument("--all-brands", action="store_true",
+                        help="Считать отсутствующими модели всех брендов справочника, а не только найденных")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    reference = load_reference(args.csv, args.fixed_csv)
+    scraped = scraped_frame(read_result(args.input))
+    sets = reconcile(scraped, reference, tolerance=args.tolerance, all_brands=args.all_brands)
+    paths = write_report(sets, args.output_dir)
+
+    print(f"Моделей на сайте: {len(scraped)}, в справочнике: {len(reference)}")
+    print(f"Совпало: {len(sets['matched'])}, расходятся годы: {len(sets['conflicts'])}, "
+          f"новых: {len(sets['new'])}, отсутствуют на сайте: {len(sets['missing'])}")
+    print(f"Сверка выполнена за {time.perf_counter() - started:.2f} с, "
+          f"отчеты: {', '.join(str(path) for path in paths)}")
+
+
+if __name__ == "__main__":
+    main()
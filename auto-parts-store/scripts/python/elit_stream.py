@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Потоковый вывод результатов полного обхода elit.ro.
+Вместо одного вложенного словаря, который записывается в конце работы, каждая
+запись бренда, модели и двигателя сразу дописывается в NDJSON-файл отдельной
+плоской строкой. Команда fold собирает поток обратно в прежний вложенный JSON.
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List
+
+# Служебные поля записи двигателя, не входящие в сам двигатель
+_ENGINE_META_FIELDS = ("type", "model_seq", "brand", "model")
+
+
+class CatalogSink:
+    """Приемник записей обхода: бренды, модели и двигатели по мере получения"""
+
+    def add_brand(self, brand: Dict[str, str]) -> None:
+        """Добавляет бренд
+
+        Args:
+            brand (Dict[str, str]): Информация о бренде
+        """
+        raise NotImplementedError
+
+    def add_model(self, brand: Dict[str, str], model: Dict[str, Any]) -> None:
+        """Добавляет модель бренда (двигатели пока пустые)
+
+        Args:
+            brand (Dict[str, str]): Информация о бренде
+            model (Dict[str, Any]): Информация о модели
+        """
+        raise NotImplementedError
+
+    def add_engines(self, brand: Dict[str, str], model: Dict[str, Any], engines: List[Dict[str, Any]]) -> None:
+        """Добавляет двигатели модели
+
+        Args:
+            brand (Dict[str, str]): Информация о бренде
+            model (Dict[str, Any]): Информация о модели (тот же объект, что и в add_model)
+            engines (List[Dict[str, Any]]): Список двигателей
+        """
+        raise NotImplementedError
+
+    def result(self) -> Dict[str, Any]:
+        """Возвращает накопленный результат (пустой словарь, если результат не хранится в памяти)"""
+        return {}
+
+    def close(self) -> None:
+        """Завершает запись"""
+
+
+class DictSink(CatalogSink):
+    """Накопление результата в памяти в формате бренд -> модели -> двигатели"""
+
+    def __init__(self, brand_entry: Callable[[Dict[str, str]], Dict[str, Any]],
+                 model_entry: Callable[..., Dict[str, Any]]):
+        """Инициализация приемника
+
+        Args:
+            brand_entry (Callable): Функция формирования записи бренда
+            model_entry (Callable): Функция формирования записи модели
+        """
+        self.brand_entry = brand_entry
+        self.model_entry = model_entry
+        self._result: Dict[str, Any] = {}
+
+    def add_brand(self, brand: Dict[str, str]) -> None:
+        self._result[brand["name"]] = self.brand_entry(brand)
+
+    def add_model(self, brand: Dict[str, str], model: Dict[str, Any]) -> None:
+        self._result[brand["name"]]["models"][model["name"]] = self.model_entry(model)
+
+    def add_engines(self, brand: Dict[str, str], model: Dict[str, Any], engines: List[Dict[str, Any]]) -> None:
+        self._result[brand["name"]]["models"][model["name"]]["engines"] = engines
+
+    def result(self) -> Dict[str, Any]:
+        return self._result
+
+
+class NdjsonWriter(CatalogSink):
+    """Запись плоских записей в NDJSON-файл с пакетным сбросом на диск (fsync)
+
+    Порядковые номера brand_seq/model_seq связывают записи между собой, поэтому
+    поток можно свернуть в тот же результат, что и последовательный обход, даже
+    если записи разных брендов и моделей перемешаны (асинхронный обход).
+    """
+
+    def __init__(self, path: str, fsync_every: int = 100, fsync_interval: float = 2.0):
+        """Открывает файл потока
+
+        Args:
+            path (str): Путь к NDJSON-файлу
+            fsync_every (int): Сбрасывать файл на диск каждые N записей
+            fsync_interval (float): Сбрасывать файл на диск не реже, чем раз в N секунд
+        """
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self.records = 0
+        self._file = open(path, "w", encoding="utf-8")
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._next_seq = 0
+        self._seq: Dict[int, int] = {}
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.records += 1
+        self._pending += 1
+        if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self._sync()
+
+    def _sync(self) -> None:
+        """Сбрасывает накопленные записи на диск"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _assign_seq(self, obj: Dict[str, Any]) -> int:
+        seq = self._next_seq
+        self._next_seq += 1
+        self._seq[id(obj)] = seq
+        return seq
+
+    def add_brand(self, brand: Dict[str, str]) -> None:
+        seq = self._assign_seq(brand)
+        self._write({
+            "type": "brand",
+            "seq": seq,
+            "brand": brand["name"],
+            "id": brand["id"],
+            "country": brand["country"]
+        })
+
+    def add_model(self, brand: Dict[str, str], model: Dict[str, Any]) -> None:
+        seq = self._assign_seq(model)
+        self._write({
+            "type": "model",
+            "seq": seq,
+            "brand_seq": self._seq[id(brand)],
+            "brand": brand["name"],
+            "model": model["name"],
+            "id": model["id"],
+            "bodyType": model["body_type"],
+            "yearStart": model["year_start"],
+            "yearEnd": model["year_end"]
+        })
+
+    def add_engines(self, brand: Dict[str, str], model: Dict[str, Any], engines: List[Dict[str, Any]]) -> None:
+        model_seq = self._seq.pop(id(model))
+        for engine in engines:
+            record = {"type": "engine", "model_seq": model_seq, "brand": brand["name"], "model": model["name"]}
+            record.update(engine)
+            self._write(record)
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._sync()
+            self._file.close()
+        print(f"Записано в поток {self.path}: {self.records} записей")
+
+
+def fold_stream(path: str) -> Dict[str, Any]:
+    """Сворачивает NDJSON-поток в формат бренд -> модели -> двигатели
+
+    Незавершенная последняя строка (поток еще пишется) пропускается.
+
+    Args:
+        path (str): Путь к NDJSON-файлу
+
+    Returns:
+        Dict[str, Any]: Результат в прежнем вложенном формате
+    """
+    result: Dict[str, Any] = {}
+    brand_seq: Dict[str, int] = {}
+    model_seq: Dict[tuple, int] = {}
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            record_type = record.get("type")
+            brand = record.get("brand")
+
+            if record_type == "brand":
+                # Повторный бренд с тем же названием заменяет предыдущий, как при обходе
+                result[brand] = {"info": {"country": record["country"]}, "models": {}}
+                brand_seq[brand] = record["seq"]
+
+            elif record_type == "model":
+                if brand_seq.get(brand) != record["brand_seq"]:
+                    continue
+                result[brand]["models"][record["model"]] = {
+                    "info": {
+                        "bodyType": record["bodyType"],
+                        "yearStart": record["yearStart"],
+                        "yearEnd": record["yearEnd"]
+                    },
+                    "engines": []
+                }
+                model_seq[(brand, record["model"])] = record["seq"]
+
+            elif record_type == "engine":
+                if model_seq.get((brand, record["model"])) != record["model_seq"]:
+                    continue
+                engine = {k: v for k, v in record.items() if k not in _ENGINE_META_FIELDS}
+                result[brand]["models"][record["model"]]["engines"].append(engine)
+
+    return result
+
+
+def main():
+    """Сворачивает NDJSON-поток парсера в JSON-файл прежнего формата"""
+    parser = argparse.ArgumentParser(description="Свертка NDJSON-потока парсера elit.ro во вложенный JSON")
+    parser.add_argument("stream", help="Путь к NDJSON-файлу потока")
+    parser.add_argument("output", help="Путь для сохранения выходного JSON файла")
+    args = parser.parse_args()
+
+    result = fold_stream(args.stream)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print(f"Результаты сохранены в файл {args.output}")
+
+
+if __name__ == "__main__":
+    main()
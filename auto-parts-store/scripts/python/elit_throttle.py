@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Адаптивное ограничение частоты запросов и повторы при ошибках загрузки.
+AdaptiveThrottle меняет допустимую частоту запросов по принципу AIMD:
+при быстрых ответах без ошибок частота растет на постоянный шаг, при
+таймаутах, ответах 429/5xx и медленных ответах уменьшается в несколько раз.
+RetryPolicy повторяет временные ошибки с экспоненциальной задержкой со
+случайным разбросом в пределах общего бюджета повторов, а FailedUnits
+собирает единицы работы, которые так и не удалось получить.
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from elit_fetch import FetchError
+
+# Коды HTTP, при которых запрос имеет смысл повторить
+RETRYABLE_STATUS = (408, 425, 429, 500, 502, 503, 504)
+
+# Сетевые ошибки браузера, после которых страница может загрузиться при повторе
+_RETRYABLE_BROWSER_ERRORS = ("net::ERR_CONNECTION", "net::ERR_TIMED_OUT", "net::ERR_NETWORK",
+                             "net::ERR_EMPTY_RESPONSE", "net::ERR_HTTP2", "net::ERR_SOCKET")
+
+
+def _loaded_errors(module: str, *names: str) -> Tuple[type, ...]:
+    """Возвращает классы ошибок модуля, если он уже загружен
+
+    Незагруженный модуль (requests, Playwright, asyncio) не мог выбросить свою ошибку,
+    поэтому проверка ошибки не загружает тяжелые модули.
+    """
+    loaded = sys.modules.get(module)
+    return tuple(getattr(loaded, name) for name in names) if loaded is not None else ()
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Определяет, временная ли ошибка загрузки (таймаут, разрыв соединения, 429 или 5xx)
+
+    Отсутствие страницы, ошибки разбора, исчерпанный лимит запросов и страница
+    без данных при повторе не исправятся, поэтому не повторяются.
+
+    Args:
+        error (BaseException): Ошибка загрузки
+
+    Returns:
+        bool: True, если запрос стоит повторить
+    """
+    if isinstance(error, FetchError):
+        if error.status is not None:
+            return error.status in RETRYABLE_STATUS
+        return isinstance(error.__cause__, _loaded_errors("requests", "Timeout", "ConnectionError"))
+    # Ошибки Playwright общие для синхронного и асинхронного API
+    playwright = "playwright.sync_api" if "playwright.sync_api" in sys.modules else "playwright.async_api"
+    if isinstance(error, (TimeoutError, ConnectionError) + _loaded_errors(playwright, "TimeoutError")
+                  + _loaded_errors("asyncio", "TimeoutError")):
+        return True
+    if isinstance(error, _loaded_errors(playwright, "Error")):
+        return any(marker in str(error) for marker in _RETRYABLE_BROWSER_ERRORS)
+    return False
+
+
+class HostBudgetExceeded(RuntimeError):
+    """Исчерпан лимит запросов к хосту"""
+
+
+class AdaptiveThrottle:
+    """Допустимая частота запросов к сайту, подстраиваемая по задержке ответов и ошибкам (AIMD)"""
+
+    def __init__(self, rate: float = 1.0, min_rate: float = 0.2, max_rate: float = 5.0,
+                 increase: float = 0.1, decrease: float = 0.5, target_latency: float = 5.0):
+        """Инициализация регулятора
+
+        Args:
+            rate (float): Начальная частота запросов в секунду (0 - без ограничения и без подстройки)
+            min_rate (float): Минимальная частота запросов в секунду
+            max_rate (float): Максимальная частота запросов в секунду
+            increase (float): Прибавка к частоте после успешного быстрого ответа
+            decrease (float): Множитель частоты после временной ошибки или медленного ответа
+            target_latency (float): Время ответа в секундах, выше которого частота снижается
+        """
+        self.enabled = rate > 0
+        self.min_rate = min(min_rate, rate) if self.enabled else min_rate
+        self.max_rate = max(max_rate, rate)
+        self.rate = rate
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self.stats = {"increases": 0, "decreases": 0, "min_rate": rate, "max_rate": rate}
+
+        self._lock = threading.Lock()
+        self._last_decrease = 0.0
+
+    def interval(self) -> float:
+        """Возвращает текущий минимальный интервал между запросами в секундах"""
+        with self._lock:
+            return 1.0 / self.rate if self.enabled else 0.0
+
+    def on_success(self, latency: float) -> None:
+        """Учитывает успешный ответ
+
+        Args:
+            latency (float): Время ответа в секундах
+        """
+        if latency > self.target_latency:
+            self._slow_down()
+            return
+        if not self.enabled:
+            return
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+                self.stats["increases"] += 1
+                self.stats["max_rate"] = max(self.stats["max_rate"], self.rate)
+
+    def on_failure(self, error: BaseException) -> None:
+        """Учитывает ошибку загрузки: временные ошибки снижают частоту
+
+        Args:
+            error (BaseException): Ошибка загрузки
+        """
+        if is_retryable(error):
+            self._slow_down()
+
+    def _slow_down(self) -> None:
+        """Снижает частоту не чаще одного раза за текущий интервал, чтобы одновременные
+        ошибки нескольких загрузчиков не обрушили ее до минимума"""
+        if not self.enabled:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease < 1.0 / self.rate:
+                return
+            self._last_decrease = now
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.stats["decreases"] += 1
+            self.stats["min_rate"] = min(self.stats["min_rate"], self.rate)
+
+    def summary(self) -> Dict[str, Any]:
+        """Возвращает текущую частоту и статистику подстройки"""
+        with self._lock:
+            return dict(self.stats, rate=round(self.rate, 3),
+                        min_rate=round(self.stats["min_rate"], 3), max_rate=round(self.stats["max_rate"], 3))
+
+
+class RetryPolicy:
+    """Повторы временных ошибок с экспоненциальной задержкой и общим бюджетом повторов
+
+    Бюджет ограничивает долю повторов от числа запросов (не меньше min_budget),
+    чтобы при недоступности сайта обход не умножал нагрузку на него.
+    """
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 1.0, max_delay: float = 30.0,
+                 budget_ratio: float = 0.2, min_budget: int = 10):
+        """Инициализация политики
+
+        Args:
+            max_attempts (int): Максимальное число попыток загрузки одной страницы (1 - без повторов)
+            base_delay (float): Базовая задержка перед первым повтором в секундах
+            max_delay (float): Максимальная задержка перед повтором в секундах
+            budget_ratio (float): Допустимая доля повторов от числа запросов
+            min_budget (int): Число повторов, доступных независимо от числа запросов
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.min_budget = min_budget
+        self.stats = {"requests": 0, "retries": 0, "budget_exhausted": 0}
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        """Учитывает попытку запроса (пополняет бюджет повторов)"""
+        with self._lock:
+            self.stats["requests"] += 1
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """Решает, повторять ли запрос после ошибки, и списывает повтор из бюджета
+
+        Args:
+            error (BaseException): Ошибка загрузки
+            attempt (int): Номер неудачной попытки, начиная с 1
+
+        Returns:
+            bool: True, если запрос нужно повторить
+        """
+        if attempt >= self.max_attempts or not is_retryable(error):
+            return False
+        with self._lock:
+            budget = max(self.min_budget, self.budget_ratio * self.stats["requests"])
+            if self.stats["retries"] >= budget:
+                self.stats["budget_exhausted"] += 1
+                return False
+            self.stats["retries"] += 1
+            return True
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Возвращает задержку перед повтором: случайная величина от 0 до base_delay * 2^(attempt-1)
+
+        Args:
+            attempt (int): Номер неудачной попытки, начиная с 1
+            error (Optional[BaseException]): Ошибка загрузки (учитывается заголовок Retry-After)
+
+        Returns:
+            float: Задержка в секундах
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            delay = max(delay, min(self.max_delay, retry_after))
+        return delay
+
+    def summary(self) -> Dict[str, int]:
+        """Возвращает статистику запросов и повторов"""
+        with self._lock:
+            return dict(self.stats)
+
+
+class FailedUnits:
+    """Единицы работы (страницы моделей и двигателей), которые не удалось получить"""
+
+    def __init__(self):
+        self.units: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, kind: str, url: str, error: BaseException, **context: Any) -> None:
+        """Добавляет неудачную единицу работы
+
+        Args:
+            kind (str): Тип страницы ('models', 'engines')
+            url (str): URL страницы
+            error (BaseException): Последняя ошибка
+            **context: Бренд, модель и другие данные для отчета
+        """
+        unit = {"kind": kind, "url": url, "error": str(error), "retryable": is_retryable(error)}
+        unit.update(context)
+        with self._lock:
+            self.units.append(unit)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.units)
+
+    def report(self, output_path: Union[str, Path]) -> Optional[Path]:
+        """Выводит неудачные единицы работы и записывает их в <output>.failed.json
+
+        Args:
+            output_path (Union[str, Path]): Путь к выходному файлу парсера
+
+        Returns:
+            Optional[Path]: Путь к файлу отчета (None, если неудач не было)
+        """
+        with self._lock:
+            units = list(self.units)
+        path = Path(f"{output_path}.failed.json")
+        if not units:
+            # Отчет прошлого запуска больше не соответствует результату
+            path.unlink(missing_ok=True)
+            return None
+
+        print(f"Не удалось получить единиц работы: {len(units)}")
+        for unit in units:
+            where = " / ".join(str(unit[key]) for key in ("brand", "model") if unit.get(key))
+            print(f"  {unit['kind']} {where}: {unit['error']}")
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(units, f, ensure_ascii=False, indent=2)
+        return path
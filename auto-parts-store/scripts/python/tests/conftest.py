@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+
+"""
+Общие настройки тестов скриптов парсера: модули elit_*.py лежат в каталоге
+scripts/python и импортируются как модули верхнего уровня.
+"""
+
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+Бюджет хоста, пул страниц и однократная загрузка URL асинхронного обхода (elit_async).
+"""
+
+import asyncio
+
+import pytest
+
+from elit_async import AsyncElitCrawler, HostBudget
+from elit_frontier import UrlFrontier
+from elit_parser import ElitRoParser
+from elit_throttle import HostBudgetExceeded
+
+URL = "https://www.elit.ro/Catalog/autoturism-identificare-vehicul-audi"
+OTHER_HOST = "https://cdn.elit.ro/Catalog/autoturism-identificare-vehicul-audi"
+
+
+class FakeFetcher:
+    """Загрузчик, который считает вызовы и отвечает с задержкой"""
+
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def fetch(self, url):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [{"url": url}]
+
+
+@pytest.fixture
+def crawler(tmp_path):
+    parser = ElitRoParser(str(tmp_path / "result.json"))
+    parser.frontier = UrlFrontier()
+    return AsyncElitCrawler(parser, concurrency=2)
+
+
+def test_budget_spaces_requests_to_one_host():
+    async def run():
+        budget = HostBudget(rate=20)
+        loop = asyncio.get_running_loop()
+        times = []
+
+        async def request(url):
+            await budget.acquire(url)
+            times.append((url, loop.time()))
+
+        await asyncio.gather(*(request(URL) for _ in range(4)), request(OTHER_HOST))
+        return times
+
+    times = asyncio.run(run())
+    same_host = sorted(t for url, t in times if url == URL)
+    gaps = [b - a for a, b in zip(same_host, same_host[1:])]
+    assert min(gaps) >= 0.045
+    # Другой хост не ждет очереди первого
+    other = next(t for url, t in times if url == OTHER_HOST)
+    assert other - same_host[0] < 0.045
+
+
+def test_budget_caps_requests_per_host():
+    async def run():
+        budget = HostBudget(rate=0, max_requests=2)
+        await budget.acquire(URL)
+        await budget.acquire(URL)
+        await budget.acquire(OTHER_HOST)
+        with pytest.raises(HostBudgetExceeded):
+            await budget.acquire(URL)
+        return budget.counts
+
+    assert asyncio.run(run()) == {"www.elit.ro": 2, "cdn.elit.ro": 1}
+
+
+def test_page_pool_caps_concurrent_loads(crawler):
+    active = []
+    peak = []
+
+    async def load():
+        async with crawler._page() as page:
+            active.append(page)
+            peak.append(len(active))
+            await asyncio.sleep(0.01)
+            active.remove(page)
+
+    async def run():
+        crawler._pool_lock = asyncio.Lock()
+        crawler._pages = asyncio.Queue()
+        for page in ("page-1", "page-2"):
+            crawler._pages.put_nowait(page)
+        await asyncio.gather(*(load() for _ in range(6)))
+
+    asyncio.run(run())
+    assert max(peak) == 2
+
+
+def test_same_url_is_fetched_once(crawler):
+    fetcher = FakeFetcher()
+
+    async def run():
+        return await asyncio.gather(*(crawler._fetch_once(URL, "models", lambda: fetcher.fetch(URL))
+                                      for _ in range(3)))
+
+    results = asyncio.run(run())
+    assert fetcher.calls == 1
+    assert sorted(fetched for _, fetched in results) == [False, False, True]
+    assert all(records == [{"url": URL}] for records, _ in results)
+
+
+def test_shared_fetch_error_reaches_every_waiter(crawler):
+    fetcher = FakeFetcher(error=RuntimeError("HTTP 503"))
+
+    async def run():
+        return await asyncio.gather(*(crawler._fetch_once(URL, "models", lambda: fetcher.fetch(URL))
+                                      for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert fetcher.calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+"""
+Разбор фикстур бенчмарка парсером и проверки регрессий elit_bench без
+замеров времени.
+"""
+
+import json
+
+import pytest
+
+from elit_bench import DEFAULT_BASELINE, aggregate, check_baseline, check_import
+from elit_fixtures import fixture_page, load_fixtures, parse_fixture, synthetic_fixtures
+from elit_parser import ElitRoParser
+from elit_parsers import PARSER_BACKENDS
+
+KINDS = ("brands", "models", "engines")
+
+
+@pytest.fixture(params=PARSER_BACKENDS)
+def parser(request, tmp_path):
+    pytest.importorskip("lxml" if request.param == "lxml" else "bs4")
+    limit = 10 ** 9
+    return ElitRoParser(str(tmp_path / "bench.json"), max_brands=limit, max_models=limit, max_engines=limit,
+                        parser_backend=request.param, artifacts="off")
+
+
+def _result(backend, kind, seconds):
+    return {"backend": backend, "kind": kind, "seconds_per_page": seconds}
+
+
+def test_synthetic_fixtures_parse_every_record(parser):
+    for fixture in synthetic_fixtures(brands=50, models=40, engines=30):
+        records = parse_fixture(parser, fixture_page(parser, fixture), fixture)
+        assert len(records) == int(fixture.name.rsplit("_", 1)[1]), fixture.name
+
+
+def test_recorded_brands_page_is_parsed(parser):
+    fixtures = [fixture for fixture in load_fixtures() if fixture.kind == "brands"]
+    if not fixtures:
+        pytest.skip("нет сохраненной страницы брендов")
+    for fixture in fixtures:
+        records = parse_fixture(parser, fixture_page(parser, fixture), fixture)
+        assert records
+        assert all(record["id"] and record["name"] for record in records)
+
+
+def test_aggregate_sums_time_per_backend_and_kind():
+    results = [_result("lxml", "models", 0.01), _result("lxml", "models", 0.03), _result("soup", "models", 0.1)]
+    assert aggregate(results) == pytest.approx({"lxml/models": 50.0, "soup/models": 10.0})
+
+
+def test_check_baseline_reports_drops_beyond_tolerance():
+    baseline = {"lxml/models": 100.0, "lxml/engines": 10.0}
+    throughput = {"lxml/models": 71.0, "lxml/engines": 6.9, "soup/models": 1.0}
+    regressions = check_baseline(throughput, baseline, tolerance=0.3)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("lxml/engines")
+
+
+def test_check_import_reports_budget_and_heavy_modules():
+    assert check_import({"seconds": 0.05, "loaded": []}, 100) == []
+    problems = check_import({"seconds": 0.2, "loaded": ["playwright"]}, 100)
+    assert len(problems) == 2
+    assert "playwright" in problems[1]
+
+
+def test_baseline_covers_every_backend_and_kind():
+    with open(DEFAULT_BASELINE, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    assert set(baseline) == {f"{backend}/{kind}" for backend in PARSER_BACKENDS for kind in KINDS}
+    assert all(value > 0 for value in baseline.values())
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""
+Дисковый кэш страниц (elit_cache.PageCache).
+"""
+
+import pytest
+
+from elit_cache import PageCache
+
+URL = "https://www.elit.ro/Catalog/autoturism-identificare-vehicul-audi"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PageCache(str(tmp_path / "cache"), ttl=60)
+    yield cache
+    cache.close()
+
+
+def test_put_and_get(cache):
+    assert cache.get(URL) is None
+    cache.put(URL, "<html>audi</html>", etag='"1"')
+    entry = cache.get(URL)
+    assert (entry.content, entry.etag, entry.fresh) == ("<html>audi</html>", '"1"', True)
+    assert cache.summary()["hits"] == 1
+    assert cache.summary()["misses"] == 1
+
+
+def test_missing_blob_removes_pages_and_blob_rows(cache):
+    cache.put(URL, "<html>same</html>")
+    cache.put(URL + "/", "<html>same</html>")
+    assert cache.total_bytes() > 0
+
+    for path in cache.blobs_dir.rglob("*.html.gz"):
+        path.unlink()
+    assert cache.get(URL) is None
+    assert cache.get(URL + "/") is None
+    assert cache.total_bytes() == 0
+    assert cache.summary()["misses"] == 2
+
+    # Страница снова сохраняется в кэш и читается
+    cache.put(URL, "<html>same</html>")
+    assert cache.get(URL).content == "<html>same</html>"
+
+
+def test_eviction_keeps_size_under_limit(tmp_path):
+    cache = PageCache(str(tmp_path / "cache"), max_bytes=1)
+    try:
+        cache.put(URL, "<html>one</html>")
+        cache.put(URL + "-2", "<html>two</html>")
+        assert cache.summary()["evicted"] == 2
+        assert cache.total_bytes() == 0
+    finally:
+        cache.close()
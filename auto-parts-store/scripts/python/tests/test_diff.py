@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+"""
+Сравнение снимков каталога (elit_diff).
+"""
+
+import copy
+import sqlite3
+
+from elit_catalog import CatalogStore
+from elit_diff import (CrawlScope, crawl_scope, delta_result, diff_snapshots, engine_keys, import_catalog_changes,
+                       load_changes, summarize)
+from elit_loader import load_result
+
+
+def _engine(description, code, hp):
+    return {"description": description, "code": code, "hp": hp, "yearStart": "01/10", "yearEnd": "-"}
+
+
+SNAPSHOT = {
+    "AUDI": {
+        "info": {"country": "Германия"},
+        "models": {
+            "A4": {"info": {"bodyType": "Седан", "yearStart": "2008", "yearEnd": "2015"},
+                   "engines": [_engine("2.0 TDI", "CAGA", 143), _engine("1.8 TFSI", "CDHA", 120)]},
+            "A6": {"info": {"bodyType": "Седан", "yearStart": "2011", "yearEnd": "2018"}, "engines": []}
+        }
+    },
+    "BMW": {"info": {"country": "Германия"}, "models": {}}
+}
+
+
+def test_identical_snapshots_have_no_changes():
+    assert diff_snapshots(SNAPSHOT, copy.deepcopy(SNAPSHOT)) == []
+
+
+def test_changes_at_every_level():
+    new = copy.deepcopy(SNAPSHOT)
+    audi = new["AUDI"]
+    audi["info"]["country"] = "Germany"
+    audi["models"]["A4"]["engines"][0]["hp"] = 150
+    del audi["models"]["A4"]["engines"][1]
+    audi["models"]["A4"]["engines"].append(_engine("3.0 TDI", "CDUC", 245))
+    del audi["models"]["A6"]
+    audi["models"]["Q5"] = {"info": {"bodyType": "Кроссовер", "yearStart": "2008", "yearEnd": "-"}, "engines": []}
+    del new["BMW"]
+    new["CHERY"] = {"info": {"country": "Китай"}, "models": {}}
+
+    changes = diff_snapshots(SNAPSHOT, new)
+    events = [(change["op"], change["level"], change.get("model"), change.get("key")) for change in changes]
+    assert events == [
+        ("modify", "brand", None, None),
+        ("modify", "engine", "A4", "2.0 TDI|CAGA"),
+        ("add", "engine", "A4", "3.0 TDI|CDUC"),
+        ("remove", "engine", "A4", "1.8 TFSI|CDHA"),
+        ("add", "model", "Q5", None),
+        ("remove", "model", "A6", None),
+        ("add", "brand", None, None),
+        ("remove", "brand", None, None),
+    ]
+    assert changes[0]["changes"] == {"country": ["Германия", "Germany"]}
+    assert changes[1]["changes"] == {"hp": [143, 150]}
+    assert summarize(changes) == {"brand.add": 1, "brand.modify": 1, "brand.remove": 1, "engine.add": 1,
+                                  "engine.modify": 1, "engine.remove": 1, "model.add": 1, "model.remove": 1}
+
+
+def test_engine_order_does_not_matter():
+    new = copy.deepcopy(SNAPSHOT)
+    new["AUDI"]["models"]["A4"]["engines"].reverse()
+    assert diff_snapshots(SNAPSHOT, new) == []
+
+
+def test_duplicate_engine_keys_are_numbered():
+    engines = [_engine("1.6", "", 100), _engine("1.6", "", 105)]
+    assert engine_keys(engines) == ["1.6|", "1.6|#2"]
+
+
+def test_delta_result_contains_only_changed_records():
+    new = copy.deepcopy(SNAPSHOT)
+    new["AUDI"]["models"]["A4"]["engines"][0]["hp"] = 150
+    delta = delta_result(diff_snapshots(SNAPSHOT, new))
+    assert list(delta) == ["AUDI"]
+    assert list(delta["AUDI"]["models"]) == ["A4"]
+    assert [engine["hp"] for engine in delta["AUDI"]["models"]["A4"]["engines"]] == [150]
+
+
+def _removals(changes):
+    return [(change["level"], change["brand"], change.get("model"), change.get("key"))
+            for change in changes if change["op"] == "remove"]
+
+
+def test_scope_keeps_records_of_failed_pages():
+    new = copy.deepcopy(SNAPSHOT)
+    new["AUDI"]["models"]["A4"]["engines"] = []
+    new["BMW"]["models"] = {}
+    old = copy.deepcopy(SNAPSHOT)
+    old["BMW"]["models"]["X5"] = {"info": {}, "engines": []}
+    failures = [{"kind": "engines", "brand": "AUDI", "model": "A4"}, {"kind": "models", "brand": "BMW"}]
+
+    assert len(_removals(diff_snapshots(old, new))) == 3
+    assert _removals(diff_snapshots(old, new, crawl_scope(failures))) == []
+
+
+def test_scope_keeps_brands_outside_filter_and_limit():
+    new = {"AUDI": SNAPSHOT["AUDI"]}
+    assert _removals(diff_snapshots(SNAPSHOT, new)) == [("brand", "BMW", None, None)]
+    # Бренд вне фильтра и бренд, отброшенный ограничением количества, не удаляются
+    assert _removals(diff_snapshots(SNAPSHOT, new, crawl_scope([], brands_filter=["audi"]))) == []
+    assert _removals(diff_snapshots(SNAPSHOT, new, CrawlScope(max_brands=1))) == []
+    assert _removals(diff_snapshots(SNAPSHOT, new, CrawlScope(max_brands=10))) == [("brand", "BMW", None, None)]
+    assert _removals(diff_snapshots(SNAPSHOT, new, CrawlScope(brands_filter=("BMW",)))) == \
+        [("brand", "BMW", None, None)]
+
+
+def test_scope_keeps_models_and_engines_beyond_limits():
+    new = copy.deepcopy(SNAPSHOT)
+    del new["AUDI"]["models"]["A6"]
+    del new["AUDI"]["models"]["A4"]["engines"][1]
+    assert _removals(diff_snapshots(SNAPSHOT, new, CrawlScope(max_models=1, max_engines=1))) == []
+    assert len(_removals(diff_snapshots(SNAPSHOT, new, CrawlScope(max_models=5, max_engines=5)))) == 2
+
+
+def test_removals_are_applied_only_on_request(tmp_path):
+    url = f"sqlite:///{tmp_path / 'catalog.db'}"
+    load_result(SNAPSHOT, url)
+    changes = diff_snapshots(SNAPSHOT, {"AUDI": SNAPSHOT["AUDI"]})
+
+    def brands():
+        with sqlite3.connect(str(tmp_path / "catalog.db")) as conn:
+            return [row[0] for row in conn.execute("SELECT slug FROM car_brands ORDER BY slug")]
+
+    load_changes(changes, url)
+    assert brands() == ["audi", "bmw"]
+    load_changes(changes, url, apply_removals=True)
+    assert brands() == ["audi"]
+
+
+def test_catalog_keeps_stored_models_without_removals(tmp_path):
+    path = str(tmp_path / "store.db")
+    import_catalog_changes(SNAPSHOT, diff_snapshots({}, SNAPSHOT), path)
+
+    new = copy.deepcopy(SNAPSHOT)
+    new["AUDI"]["info"]["country"] = "Germany"
+    del new["AUDI"]["models"]["A6"]
+    new["AUDI"]["models"]["A4"]["engines"] = []
+    import_catalog_changes(new, diff_snapshots(SNAPSHOT, new), path)
+
+    store = CatalogStore(path)
+    try:
+        audi = store.export(["AUDI"])["AUDI"]
+    finally:
+        store.close()
+    assert audi["info"]["country"] == "Germany"
+    assert sorted(audi["models"]) == ["A4", "A6"]
+    assert len(audi["models"]["A4"]["engines"]) == 2
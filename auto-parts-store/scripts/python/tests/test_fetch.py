@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+Переход на резервный загрузчик (elit_fetch.FallbackFetcher) и загрузка через кэш (elit_fetch.CachingFetcher).
+"""
+
+import pytest
+
+from elit_fetch import CachingFetcher, FallbackFetcher, FetchError, Fetcher, PageIncomplete
+from elit_parser import ElitRoParser
+
+URL = "https://www.elit.ro/Catalog/autoturism-identificare-vehicul-audi"
+
+
+class FakeFetcher(Fetcher):
+    def __init__(self, name, error=None):
+        self.name = name
+        self.error = error
+        self.calls = 0
+
+    def fetch(self, url, kind, **context):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return f"<html>{self.name}</html>"
+
+
+def test_incomplete_page_goes_to_fallback():
+    primary = FakeFetcher("http", PageIncomplete("нет данных"))
+    fallback = FakeFetcher("browser")
+    fetcher = FallbackFetcher(primary, fallback)
+
+    assert fetcher.fetch(URL, "models") == "<html>browser</html>"
+    assert fetcher.fetch_conditional(URL, "models").content == "<html>browser</html>"
+    assert fetcher.stats == {"http": 0, "browser": 2}
+
+
+@pytest.mark.parametrize("method", ["fetch", "fetch_conditional"])
+def test_other_errors_are_raised(method):
+    primary = FakeFetcher("http", FetchError("HTTP 503", status=503, retry_after=5))
+    fallback = FakeFetcher("browser")
+    fetcher = FallbackFetcher(primary, fallback)
+
+    with pytest.raises(FetchError) as info:
+        getattr(fetcher, method)(URL, "models")
+    assert info.value.status == 503
+    assert fallback.calls == 0
+
+
+class RecordingBudget:
+    def __init__(self):
+        self.urls = []
+
+    def acquire(self, url):
+        self.urls.append(url)
+
+
+def test_cache_hits_skip_budget_and_throttle(tmp_path, monkeypatch):
+    parser = ElitRoParser(str(tmp_path / "result.json"), fetch_backend="http", cache_dir=str(tmp_path / "cache"))
+    inner = FakeFetcher("http")
+    parser.fetcher = CachingFetcher(inner, parser.cache)
+    parser.budget = RecordingBudget()
+    latencies = []
+    monkeypatch.setattr(parser.throttle, "on_success", latencies.append)
+
+    assert parser._load_page(None, URL, "models", "models_audi") == "<html>http</html>"
+    assert parser._load_page(None, URL, "models", "models_audi") == "<html>http</html>"
+    assert inner.calls == 1
+    assert parser.budget.urls == [URL]
+    assert len(latencies) == 1
+    assert parser.cache.summary()["hits"] == 1
+    assert parser.cache.summary()["misses"] == 1
+    parser.cache.close()
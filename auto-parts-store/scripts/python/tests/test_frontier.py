@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""
+Канонизация URL и граница обхода (elit_frontier).
+"""
+
+import pytest
+
+from elit_frontier import UrlFrontier, canonicalize_url
+
+CATALOG = "https://elit.ro/catalog/autoturism-identificare-vehicul-audi"
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.elit.ro/Catalog/autoturism-identificare-vehicul-audi",
+    "http://WWW.ELIT.RO:80/Catalog/autoturism-identificare-vehicul-AUDI/",
+    "https://www.elit.ro:443//Catalog//autoturism-identificare-vehicul-audi#top",
+    "/Catalog/autoturism-identificare-vehicul-audi?utm_source=mail&gclid=1",
+    " Catalog/autoturism-identificare-vehicul-audi ",
+])
+def test_equivalent_urls_share_canonical_form(url):
+    assert canonicalize_url(url) == CATALOG
+
+
+def test_query_is_sorted_and_decoded():
+    assert canonicalize_url("https://elit.ro/a?b=2&a=1") == "https://elit.ro/a?a=1&b=2"
+    assert canonicalize_url("https://elit.ro/a%3Bjsessionid=1") == "https://elit.ro/a;jsessionid=1"
+
+
+def test_non_catalog_path_keeps_case_and_custom_port():
+    assert canonicalize_url("https://elit.ro/Search/Q") == "https://elit.ro/Search/Q"
+    assert canonicalize_url("http://127.0.0.1:8080/x/") == "https://127.0.0.1:8080/x"
+    assert canonicalize_url("/x", base_url="http://127.0.0.1:8080") == "https://127.0.0.1:8080/x"
+
+
+def test_frontier_claims_url_once():
+    frontier = UrlFrontier()
+    try:
+        assert frontier.claim(CATALOG)
+        assert not frontier.claim(CATALOG.upper().replace("HTTPS://", "https://www."))
+        frontier.release(CATALOG)
+        assert frontier.claim(CATALOG)
+    finally:
+        frontier.close()
+
+
+def test_frontier_remembers_fetched_urls_between_runs(tmp_path):
+    path = str(tmp_path / "frontier.db")
+    frontier = UrlFrontier(path)
+    frontier.claim(CATALOG)
+    frontier.complete(CATALOG, "models", [{"id": "a4"}])
+    assert frontier.result(CATALOG + "/") == [{"id": "a4"}]
+    frontier.close()
+
+    frontier = UrlFrontier(path)
+    try:
+        assert frontier.last_fetch(CATALOG) is not None
+        assert frontier.claim(CATALOG)
+        assert frontier.summary()["known"] == 1
+    finally:
+        frontier.close()
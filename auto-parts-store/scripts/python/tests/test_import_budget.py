@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+"""
+Импорт elit_parser в новом интерпретаторе не должен загружать тяжелые
+зависимости и должен укладываться в бюджет elit_bench.
+"""
+
+from elit_bench import HEAVY_MODULES, IMPORT_BUDGET_MS, check_import, measure_import
+
+
+def test_parser_import_skips_heavy_modules():
+    measured = measure_import("elit_parser", repeat=1)
+    assert measured["loaded"] == [], f"загружены модули: {measured['loaded']} (из {HEAVY_MODULES})"
+
+
+def test_parser_import_within_budget():
+    measured = measure_import("elit_parser", repeat=3)
+    assert check_import(measured, IMPORT_BUDGET_MS) == []
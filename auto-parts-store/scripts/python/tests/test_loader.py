@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""
+Нормализация результата парсера и upsert в базу (elit_loader, SQLite).
+"""
+
+import copy
+import sqlite3
+
+import pytest
+
+from elit_loader import SqliteLoader, normalize_catalog, normalize_volume, normalize_year, slugify
+
+RESULT = {
+    "AUDI": {
+        "info": {"country": "Германия"},
+        "models": {
+            "A4 B8": {
+                "info": {"bodyType": "Седан", "yearStart": "11/07", "yearEnd": "12/15"},
+                "engines": [{"description": "2.0 TDI", "code": "CAGA", "kw": 105, "hp": 143, "ccm": 1968,
+                             "fuelType": "Diesel", "yearStart": "11/07", "yearEnd": "12/15"}]
+            }
+        }
+    }
+}
+
+
+@pytest.fixture
+def database(tmp_path):
+    return str(tmp_path / "catalog.db")
+
+
+def _load(path, result):
+    loader = SqliteLoader(path)
+    try:
+        return loader.load(*normalize_catalog(result))
+    finally:
+        loader.close()
+
+
+def _rows(path, sql):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(sql).fetchall()
+
+
+def test_normalizers():
+    assert slugify("Mercedes-Benz  A_Klasse (W168)") == "mercedes-benz-a-klasse-w168"
+    assert normalize_year("01/94", pivot=30) == 1994
+    assert normalize_year("10/03", pivot=30) == 2003
+    assert normalize_year("2003") == 2003
+    assert normalize_year("-") is None
+    assert normalize_volume("1598") == "1.6"
+    assert normalize_volume("") is None
+
+
+def test_first_load_inserts_rows(database):
+    stats = _load(database, RESULT)
+    assert {table: stats[table]["inserted"] for table in stats} == \
+        {"car_brands": 1, "car_models": 1, "car_engines": 1}
+    assert _rows(database, "SELECT slug, country FROM car_brands") == [("audi", "Германия")]
+    assert _rows(database, "SELECT slug, year_start, year_end FROM car_models") == [("audi-a4-b8", 2007, 2015)]
+    assert _rows(database, "SELECT volume, power FROM car_engines") == [("2.0", 143)]
+
+
+def test_reload_updates_in_place_and_keeps_filled_fields(database):
+    _load(database, RESULT)
+    ids = _rows(database, "SELECT id FROM car_engines")
+
+    changed = copy.deepcopy(RESULT)
+    changed["AUDI"]["info"]["country"] = "Неизвестно"
+    model = changed["AUDI"]["models"]["A4 B8"]
+    model["info"]["bodyType"] = None
+    model["engines"][0]["yearEnd"] = "-"
+    stats = _load(database, changed)
+
+    assert stats["car_engines"] == {"staged": 1, "inserted": 0, "updated": 1, "deleted": 0, "orphaned": 0}
+    assert _rows(database, "SELECT id FROM car_engines") == ids
+    # Пустые значения из парсера не затирают заполненные поля, кроме года окончания двигателя
+    assert _rows(database, "SELECT country FROM car_brands") == [("Германия",)]
+    assert _rows(database, "SELECT body_type FROM car_models") == [("Седан",)]
+    assert _rows(database, "SELECT year_end FROM car_engines") == [(None,)]
+
+
+def test_removed_rows_cascade(database):
+    _load(database, RESULT)
+    loader = SqliteLoader(database)
+    try:
+        stats = loader.load([], [], [], removed={"car_brands": ["audi"]})
+    finally:
+        loader.close()
+    assert stats["car_brands"]["deleted"] == 1
+    assert _rows(database, "SELECT COUNT(*) FROM car_engines") == [(0,)]
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""
+Учет памяти браузера по сессиям (elit_memory.BrowserSession).
+"""
+
+import subprocess
+import sys
+import types
+
+import pytest
+
+from elit_memory import BrowserSession, MemoryMonitor, RecyclePolicy, tree_rss
+
+_MB = 1024 * 1024
+
+
+class FakePage:
+    def evaluate(self, script):
+        return None
+
+
+class FakeContext:
+    def new_page(self):
+        return FakePage()
+
+    def storage_state(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+class FakeBrowser:
+    def new_context(self, **options):
+        return FakeContext()
+
+    def close(self):
+        pass
+
+
+class FakePlaywright:
+    """Вместо драйвера Playwright запускает процесс, занимающий mb мегабайт"""
+
+    def __init__(self, mb):
+        self.mb = mb
+        self.proc = None
+        self.launches = 0
+        self.chromium = self
+
+    def start(self):
+        script = f"import sys, time; data = b'x' * {self.mb * _MB}; print(1, flush=True); time.sleep(60)"
+        self.proc = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE)
+        self.proc.stdout.readline()
+        return self
+
+    def launch(self, headless=True):
+        self.launches += 1
+        return FakeBrowser()
+
+    def stop(self):
+        self.proc.kill()
+        self.proc.wait()
+
+
+class FakeProfile:
+    def attach(self, page):
+        pass
+
+
+@pytest.fixture
+def drivers(monkeypatch):
+    if not MemoryMonitor().available:
+        pytest.skip("память процессов нельзя измерить")
+
+    queue = [FakePlaywright(96), FakePlaywright(4)]
+    started = list(queue)
+    sync_api = types.ModuleType("playwright.sync_api")
+    sync_api.sync_playwright = lambda: queue.pop(0)
+    package = types.ModuleType("playwright")
+    package.sync_api = sync_api
+    monkeypatch.setitem(sys.modules, "playwright", package)
+    monkeypatch.setitem(sys.modules, "playwright.sync_api", sync_api)
+    yield started
+    for driver in started:
+        if driver.proc is not None and driver.proc.poll() is None:
+            driver.stop()
+
+
+def test_sessions_measure_only_their_own_processes(drivers):
+    big_driver, small_driver = drivers
+    policy = RecyclePolicy(0, memory_limit_mb=48, check_every=1)
+    big = BrowserSession({}, FakeProfile(), policy)
+    small = BrowserSession({}, FakeProfile(), policy)
+    big.page
+    small.page
+
+    assert big.pids == [big_driver.proc.pid]
+    assert small.pids == [small_driver.proc.pid]
+    assert tree_rss(big.pids) >= 96 * _MB
+    assert tree_rss(small.pids) < 48 * _MB
+
+    # Порог превышает только сессия с большим процессом, соседняя не перезапускается
+    small.navigated()
+    big.navigated()
+    assert (small.browser_restarts, big.browser_restarts) == (0, 1)
+    assert (small_driver.launches, big_driver.launches) == (1, 2)
+    assert small.monitor.peak_browser_rss < 48 * _MB
+
+    big.close()
+    small.close()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+"""
+Бэкенды разбора lxml и soup должны возвращать одинаковые записи на всех
+фикстурах, включая пустые страницы и страницы с XML-объявлением.
+"""
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("lxml")
+
+from elit_fixtures import Fixture, load_fixtures, synthetic_fixtures  # noqa: E402
+from elit_parsers import LxmlParser, SoupParser  # noqa: E402
+
+_XML_BRANDS = ('<?xml version="1.0" encoding="utf-8"?>\n<html><body>'
+               '<a href="/Catalog/autoturism-identificare-vehicul-audi">AUDI</a></body></html>')
+
+EDGE_FIXTURES = [
+    Fixture(name, kind, content, "audi" if kind == "models" else None)
+    for kind in ("brands", "models", "engines")
+    for name, content in ((f"empty_{kind}", ""), (f"blank_{kind}", "  \n\t"), (f"xml_{kind}", _XML_BRANDS))
+]
+
+FIXTURES = load_fixtures() + synthetic_fixtures(brands=50, models=50, engines=50) + EDGE_FIXTURES
+
+
+def _parse(parser, fixture: Fixture):
+    if fixture.kind == "brands":
+        return parser.parse_brands(fixture.content)
+    if fixture.kind == "models":
+        return parser.parse_models(fixture.content, fixture.brand_id)
+    return parser.parse_engines(fixture.content)
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=[fixture.name for fixture in FIXTURES])
+def test_backends_return_same_records(fixture):
+    assert _parse(LxmlParser(), fixture) == _parse(SoupParser(), fixture)
+
+
+def test_xml_declaration_is_parsed():
+    assert LxmlParser().parse_brands(_XML_BRANDS) == [{"id": "audi", "name": "AUDI"}]
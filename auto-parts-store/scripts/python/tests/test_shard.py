@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""
+Очередь единиц работы с арендой (elit_shard.LeaseQueue).
+"""
+
+import pytest
+
+from elit_shard import LeaseQueue
+
+BRANDS = [{"id": "audi", "name": "AUDI"}, {"id": "bmw", "name": "BMW"}]
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def make(**kwargs):
+        queue = LeaseQueue(str(tmp_path / "queue.db"), **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def test_enqueue_skips_duplicates(make_queue):
+    queue = make_queue()
+    assert queue.enqueue(BRANDS) == 2
+    assert queue.enqueue(BRANDS + [{"id": "chery", "name": "CHERY"}]) == 1
+    assert queue.status()["units"]["pending"] == 3
+
+
+def test_claim_in_order_and_complete(make_queue):
+    queue = make_queue()
+    queue.enqueue(BRANDS)
+
+    first = queue.claim("w1")
+    second = queue.claim("w2")
+    assert (first["id"], first["attempts"]) == ("audi", 1)
+    assert second["id"] == "bmw"
+    assert queue.claim("w3") is None
+
+    # Результат принимается только от владельца аренды
+    assert not queue.complete("audi", "w2", {"AUDI": {}})
+    assert queue.complete("audi", "w1", {"AUDI": {}})
+    assert queue.complete("bmw", "w2", {"BMW": {}}, failures=[{"kind": "models"}])
+    assert queue.finished()
+    assert [item["brand"]["id"] for item in queue.results()] == ["audi", "bmw"]
+    assert queue.results()[1]["failures"] == [{"kind": "models"}]
+
+
+def test_expired_lease_is_claimed_by_another_worker(make_queue):
+    queue = make_queue(lease_seconds=-1)
+    queue.enqueue(BRANDS[:1])
+
+    assert queue.claim("w1")["attempts"] == 1
+    unit = queue.claim("w2")
+    assert (unit["id"], unit["attempts"]) == ("audi", 2)
+    assert not queue.heartbeat("audi", "w1")
+    assert not queue.complete("audi", "w1", {})
+
+
+def test_failures_exhaust_attempts(make_queue):
+    queue = make_queue(max_attempts=2)
+    queue.enqueue(BRANDS[:1])
+
+    for _ in range(2):
+        unit = queue.claim("w1")
+        queue.fail(unit["id"], "w1", "boom")
+    assert queue.claim("w1") is None
+    status = queue.status()
+    assert status["units"]["failed"] == 1
+    assert status["failed"] == [{"brand": "AUDI", "attempts": 2, "error": "boom"}]
+
+    assert queue.retry_failed() == 1
+    assert queue.claim("w1")["attempts"] == 1
+
+
+def test_release_does_not_count_attempt(make_queue):
+    queue = make_queue()
+    queue.enqueue(BRANDS[:1])
+
+    queue.release(queue.claim("w1")["id"], "w1")
+    assert queue.claim("w2")["attempts"] == 1
+
+
+def test_params_are_shared(make_queue):
+    queue = make_queue()
+    queue.set_params({"max_models": 5, "brands": ["AUDI"]})
+    assert make_queue().get_params() == {"max_models": 5, "brands": ["AUDI"]}
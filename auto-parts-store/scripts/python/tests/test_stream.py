@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""
+Запись NDJSON-потока и его свертка во вложенный результат (elit_stream).
+"""
+
+from elit_parser import ElitRoParser
+from elit_stream import DictSink, NdjsonWriter, fold_stream
+
+AUDI = {"id": "audi", "name": "AUDI", "country": "Германия"}
+BMW = {"id": "bmw", "name": "BMW", "country": "Германия"}
+A4 = {"id": "audi-a4", "name": "A4", "body_type": "Седан", "year_start": "2008", "year_end": "2015"}
+A6 = {"id": "audi-a6", "name": "A6", "body_type": "Универсал", "year_start": "2011", "year_end": "-"}
+X5 = {"id": "bmw-x5", "name": "X5", "body_type": "Кроссовер", "year_start": "2007", "year_end": "2013"}
+ENGINES = {
+    "A4": [{"description": "2.0 TDI", "code": "CAGA", "hp": 143}],
+    "A6": [{"description": "3.0 TDI", "code": "CDUC", "hp": 245}, {"description": "2.0 TFSI", "code": "", "hp": 180}],
+    "X5": []
+}
+
+
+def _write_interleaved(sink):
+    """Записи брендов и моделей перемешаны, как при асинхронном обходе"""
+    sink.add_brand(AUDI)
+    sink.add_brand(BMW)
+    sink.add_model(AUDI, A4)
+    sink.add_model(BMW, X5)
+    sink.add_model(AUDI, A6)
+    sink.add_engines(AUDI, A6, ENGINES["A6"])
+    sink.add_engines(BMW, X5, ENGINES["X5"])
+    sink.add_engines(AUDI, A4, ENGINES["A4"])
+
+
+def _expected():
+    sink = DictSink(ElitRoParser.brand_entry, ElitRoParser.model_entry)
+    _write_interleaved(sink)
+    return sink.result()
+
+
+def test_fold_matches_in_memory_result(tmp_path):
+    path = str(tmp_path / "result.ndjson")
+    writer = NdjsonWriter(path, fsync_every=2)
+    _write_interleaved(writer)
+    writer.close()
+
+    assert writer.records == 2 + 3 + 3
+    assert fold_stream(path) == _expected()
+
+
+def test_fold_skips_truncated_last_line(tmp_path):
+    path = tmp_path / "result.ndjson"
+    writer = NdjsonWriter(str(path))
+    _write_interleaved(writer)
+    writer.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "engine", "model_seq": 2, "brand": "AUD')
+
+    assert fold_stream(str(path)) == _expected()
+
+
+def test_repeated_brand_replaces_previous_records(tmp_path):
+    path = str(tmp_path / "result.ndjson")
+    writer = NdjsonWriter(path)
+    writer.add_brand(AUDI)
+    writer.add_model(AUDI, A4)
+    writer.add_engines(AUDI, A4, ENGINES["A4"])
+    # Бренд с тем же названием снова: его модели заменяют записи первого
+    again = dict(AUDI)
+    writer.add_brand(again)
+    writer.add_model(again, A6)
+    writer.add_engines(again, A6, ENGINES["A6"])
+    writer.close()
+
+    result = fold_stream(path)
+    assert list(result["AUDI"]["models"]) == ["A6"]
+    assert result["AUDI"]["models"]["A6"]["engines"] == ENGINES["A6"]
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""
+Подстройка частоты запросов (AIMD) и бюджет повторов (elit_throttle).
+"""
+
+import pytest
+
+from elit_fetch import FetchError
+from elit_throttle import AdaptiveThrottle, FailedUnits, RetryPolicy, is_retryable
+
+
+def test_is_retryable():
+    assert is_retryable(FetchError("HTTP 503", status=503))
+    assert is_retryable(FetchError("HTTP 429", status=429))
+    assert not is_retryable(FetchError("HTTP 404", status=404))
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(ValueError("bad page"))
+
+
+def test_throttle_increases_additively():
+    throttle = AdaptiveThrottle(rate=1.0, max_rate=1.25, increase=0.1)
+    throttle.on_success(0.1)
+    assert throttle.rate == pytest.approx(1.1)
+    for _ in range(5):
+        throttle.on_success(0.1)
+    assert throttle.rate == 1.25
+    assert throttle.interval() == pytest.approx(0.8)
+
+
+def test_throttle_decreases_multiplicatively_once_per_interval():
+    throttle = AdaptiveThrottle(rate=2.0, min_rate=0.3, decrease=0.5)
+    error = FetchError("HTTP 503", status=503)
+    throttle.on_failure(error)
+    # Одновременные ошибки в пределах текущего интервала снижают частоту один раз
+    throttle.on_failure(error)
+    assert throttle.rate == 1.0
+    assert throttle.summary()["decreases"] == 1
+
+    throttle._last_decrease = 0.0
+    throttle.on_failure(error)
+    throttle._last_decrease = 0.0
+    throttle.on_failure(error)
+    assert throttle.rate == 0.3
+
+
+def test_throttle_ignores_permanent_errors_and_slows_on_latency():
+    throttle = AdaptiveThrottle(rate=1.0, target_latency=2.0)
+    throttle.on_failure(FetchError("HTTP 404", status=404))
+    assert throttle.rate == 1.0
+    throttle.on_success(3.0)
+    assert throttle.rate == 0.5
+
+
+def test_disabled_throttle():
+    throttle = AdaptiveThrottle(rate=0)
+    throttle.on_success(0.1)
+    throttle.on_failure(TimeoutError())
+    assert throttle.interval() == 0.0
+    assert throttle.rate == 0
+
+
+def test_retry_budget():
+    policy = RetryPolicy(max_attempts=5, budget_ratio=0.5, min_budget=2)
+    error = TimeoutError()
+    assert policy.should_retry(error, 1)
+    assert policy.should_retry(error, 1)
+    assert not policy.should_retry(error, 1)
+    assert policy.summary()["budget_exhausted"] == 1
+
+    # Запросы пополняют бюджет пропорционально budget_ratio
+    for _ in range(6):
+        policy.record_request()
+    assert policy.should_retry(error, 1)
+    assert not policy.should_retry(error, 1)
+
+
+def test_retry_limits_attempts_and_permanent_errors():
+    policy = RetryPolicy(max_attempts=3)
+    assert not policy.should_retry(TimeoutError(), 3)
+    assert not policy.should_retry(FetchError("HTTP 404", status=404), 1)
+    assert policy.summary()["retries"] == 0
+
+
+def test_backoff_respects_retry_after():
+    policy = RetryPolicy(base_delay=1.0, max_delay=10.0)
+    assert 0 <= policy.backoff(3) <= 4.0
+    assert policy.backoff(1, FetchError("HTTP 429", status=429, retry_after=7)) == 7
+    assert policy.backoff(1, FetchError("HTTP 429", status=429, retry_after=60)) == 10.0
+
+
+def test_failed_units_report(tmp_path, capsys):
+    output = tmp_path / "result.json"
+    failures = FailedUnits()
+    failures.add("models", "https://www.elit.ro/x", FetchError("HTTP 503", status=503), brand="AUDI")
+    path = failures.report(output)
+    assert path.exists()
+
+    # Успешный повторный запуск удаляет отчет прошлого запуска
+    assert FailedUnits().report(output) is None
+    assert not path.exists()